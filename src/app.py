@@ -1,99 +1,769 @@
 import argparse
-from flask import Flask, abort, redirect, render_template, request, send_from_directory, url_for
+import asyncio
+from flask import (
+    Flask,
+    abort,
+    current_app,
+    g,
+    make_response,
+    redirect,
+    render_template,
+    request,
+    send_from_directory,
+    url_for,
+)
+import functools
 import math
+import mimetypes
 import os
+import re
+import signal
 import sqlite3
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from urllib.error import HTTPError
+
+from werkzeug.security import safe_join
+from werkzeug.serving import make_server
+from werkzeug.wsgi import ClosingIterator
+
+from miss_thumb import article_url, resolve_streams, viewer_context
 
+from get_missav_titles import (
+    THUMB_FORMATS,
+    THUMB_WIDTHS,
+    HttpClient,
+    SeekPack,
+    adjust_tag_counts,
+    bump_generation,
+    connect_sqlite,
+    ensure_schema,
+    fetch_bytes,
+    is_fresh_thumbnail,
+    load_stream_metadata,
+    save_stream_metadata,
+    make_thumbnails,
+    seek_pack_path,
+    thumbnail_filename,
+    thumbnails_dir,
+    write_cover_file,
+)
 
-app = Flask(__name__)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-COVERS_DIR = os.path.join(BASE_DIR, "covers")
-DB_PATH = os.getenv("MISSAV_DB_PATH", os.path.join(BASE_DIR, "missav_title.db"))
+DEFAULT_COVERS_DIR = os.getenv("MISSAV_COVERS_DIR", os.path.join(BASE_DIR, "covers"))
+THUMB_NAME_PATTERN = re.compile(r"^(.+)-(\d+)\.([a-z]+)$")
+DEFAULT_DB_PATH = os.getenv("MISSAV_DB_PATH", os.path.join(BASE_DIR, "missav_title.db"))
+DEFAULT_SEEKS_DIR = os.getenv("MISSAV_SEEKS_DIR", os.path.join(BASE_DIR, "seeks"))
 PER_PAGE = 24
+# Trigram search needs at least three characters; shorter queries use LIKE.
+FTS_MIN_QUERY = 3
+# bm25 weights for articles_fts columns: id, title, description, tags.
+FTS_RANK = "bm25(articles_fts, 10.0, 4.0, 1.0, 2.0)"
 
-DOWNLOADED_WHERE = """
-(
-    a.description IS NOT NULL
-    OR EXISTS (SELECT 1 FROM article_tags at WHERE at.article_id = a.id)
-    OR (a.title IS NOT NULL AND a.title <> a.id)
-)
-"""
+DOWNLOADED_WHERE = "a.downloaded = 1"
+READ_MMAP_SIZE = 256 * 1024 * 1024
+READ_CACHE_KIB = 64 * 1024
+# Keyset seek for the listing order (id NOCASE, then exact id so the cursor
+# is unique). Spelled out rather than as a row value, which SQLite will not
+# use as an index range on idx_articles_listing.
+LISTING_SEEK = "a.id COLLATE NOCASE {op}= ? AND (a.id COLLATE NOCASE {op} ? OR a.id {op} ?)"
+# Rendered pages and listing totals are cached per library generation
+# (bumped by the crawler and the dislike toggle); the TTL only bounds
+# staleness from changes made outside those writers.
+PAGE_CACHE_SIZE = 512
+PAGE_CACHE_TTL = 300
+QUERY_CACHE_SIZE = 256
+# Cover and thumbnail URLs carry ?v=<mtime>, so a given URL never changes
+# content and browsers may keep it for a year without revalidating.
+COVER_MAX_AGE = 365 * 86400
+COVER_RESCAN_INTERVAL = 5.0
+# Background stream resolution for /article/<id>/viewer.
+RESOLVE_TABS = 2
+RESOLVE_TIMEOUT_MS = 15000
+VIEWER_POLL_SECONDS = 3
+# Local cache of seek sheets for the viewer: total size cap, and how many
+# sheets on each side of a requested one are fetched ahead.
+SEEK_CACHE_BYTES = 1024 * 1024 * 1024
+SEEK_PREFETCH = 4
+SEEK_FETCH_WORKERS = 4
+SEEK_NAME_PATTERN = re.compile(r"^_(\d+)\.jpg$")
 
+class LRUCache:
+    """Thread-safe LRU mapping with a per-entry time to live."""
 
-def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class CoverIndex:
+    """Cover filename -> version token, kept in memory.
+
+    Replaces a stat per rendered card. covers/ is rescanned only when its
+    own mtime moves (covers are written by rename, which always touches
+    it); that is checked at most every COVER_RESCAN_INTERVAL seconds, and
+    at once when the library generation changes.
+    """
+
+    def __init__(self, covers_dir):
+        self.covers_dir = covers_dir
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._dir_mtime = None
+        self._generation = None
+        self._next_check = 0.0
+
+    def version(self, filename, generation=None):
+        now = time.monotonic()
+        if generation != self._generation or now >= self._next_check:
+            self._refresh(generation, now)
+        return self._versions.get(filename)
+
+    def _refresh(self, generation, now):
+        # One thread rescans; the others keep using the previous map.
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._generation = generation
+            self._next_check = now + COVER_RESCAN_INTERVAL
+            try:
+                dir_mtime = os.stat(self.covers_dir).st_mtime_ns
+            except OSError:
+                dir_mtime = None
+            if dir_mtime == self._dir_mtime:
+                return
+            versions = {}
+            if dir_mtime is not None:
+                with os.scandir(self.covers_dir) as entries:
+                    for entry in entries:
+                        if entry.is_file() and not entry.name.endswith(".part"):
+                            versions[entry.name] = f"{int(entry.stat().st_mtime):x}"
+            self._versions = versions
+            self._dir_mtime = dir_mtime
+        finally:
+            self._lock.release()
+
+
+class StreamResolver:
+    """Resolves stream metadata for the viewer off the request path.
+
+    Requested ids are queued; one daemon thread drains the queue in
+    batches, each through a single shared browser (miss_thumb's
+    resolve_streams), and stores what it finds in stream_metadata. The
+    viewer page polls until the row appears or an error is recorded.
+    """
+
+    def __init__(self, db_path, tabs=RESOLVE_TABS, timeout_ms=RESOLVE_TIMEOUT_MS):
+        self.db_path = db_path
+        self.tabs = tabs
+        self.timeout_ms = timeout_ms
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._queue = []
+        self._pending = set()
+        self._errors = {}
+        self._thread = None
+        self._closed = False
+
+    def request(self, article_id):
+        with self._lock:
+            if self._closed or article_id in self._pending:
+                return
+            self._errors.pop(article_id, None)
+            self._pending.add(article_id)
+            self._queue.append(article_id)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="stream-resolver", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def status(self, article_id):
+        """("pending", None), ("failed", message) or (None, None)."""
+        with self._lock:
+            if article_id in self._pending:
+                return "pending", None
+            if article_id in self._errors:
+                return "failed", self._errors[article_id]
+        return None, None
+
+    def _finish(self, article_id, error=None):
+        with self._lock:
+            self._pending.discard(article_id)
+            if error:
+                self._errors[article_id] = error
+
+    def close(self):
+        # A batch already in the browser finishes; nothing new is started.
+        with self._lock:
+            self._closed = True
+            self._queue = []
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                if self._closed:
+                    return
+                batch, self._queue = self._queue, []
+            if batch:
+                self._resolve(batch)
+
+    def _resolve(self, batch):
+        conn = connect_sqlite(self.db_path)
+
+        def on_result(article_id, url, stream, error, elapsed):
+            if stream is not None:
+                try:
+                    save_stream_metadata(
+                        conn,
+                        article_id,
+                        stream["uuid"],
+                        stream["resolution"],
+                        stream["m3u8_url"],
+                        stream["duration_seconds"],
+                    )
+                    bump_generation(conn)
+                    conn.commit()
+                except sqlite3.Error as e:
+                    error = f"Could not store stream metadata: {e}"
+            self._finish(article_id, error)
+
+        try:
+            asyncio.run(resolve_streams(batch, on_result, self.tabs, self.timeout_ms))
+        except Exception as e:
+            print(f"[WARN] Stream resolution failed: {e}")
+            for article_id in batch:
+                self._finish(article_id, str(e))
+        finally:
+            conn.close()
+            # Anything resolve_streams did not report on is not left pending.
+            for article_id in batch:
+                self._finish(article_id)
+
+
+class SeekSpriteCache:
+    """Seek sheets kept on disk as <cache_dir>/<uuid>/_<n>.jpg, LRU by bytes.
+
+    A sheet is fetched from the stream's seek base the first time it is
+    asked for; prefetch() then fetches its neighbours in the background so
+    stepping through a video finds them local. Each process keeps its own
+    LRU order over the shared directory, rebuilt from file mtimes.
+
+    Videos downloaded with `get_missav_titles.py prefetch-seeks` sit next
+    to it as <cache_dir>/<uuid>.pack; packed() serves those directly and
+    they are never evicted.
+    """
+
+    def __init__(
+        self, cache_dir, max_bytes=SEEK_CACHE_BYTES, prefetch_count=SEEK_PREFETCH, workers=SEEK_FETCH_WORKERS
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.prefetch_count = prefetch_count
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._loaded = False
+        self._inflight = {}
+        self._queued = set()
+        self._executor = None
+        self._client = None
+        self._packs = {}
+        self.hits = 0
+        self.fetches = 0
+
+    def path(self, uuid, index):
+        return os.path.join(self.cache_dir, uuid, f"_{index}.jpg")
+
+    def _pack(self, uuid):
+        path = seek_pack_path(self.cache_dir, uuid)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        # A pack only grows; reread its index when it changes on disk.
+        signature = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            cached = self._packs.get(uuid)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        pack = SeekPack.load(path)
+        with self._lock:
+            self._packs[uuid] = (signature, pack)
+        return pack
+
+    def packed(self, uuid, index):
+        """Bytes of sheet `index` from the video's pack, or None.
+
+        b"" means the pack recorded that the seek host has no such sheet.
+        """
+        pack = self._pack(uuid)
+        if pack is None or index not in pack:
+            return None
+        try:
+            return pack.read(index)
+        except OSError:
+            return None
+
+    def _load(self):
+        found = []
+        if os.path.isdir(self.cache_dir):
+            with os.scandir(self.cache_dir) as videos:
+                for video in videos:
+                    if not video.is_dir():
+                        continue
+                    with os.scandir(video.path) as sheets:
+                        for sheet in sheets:
+                            match = SEEK_NAME_PATTERN.match(sheet.name)
+                            if match:
+                                st = sheet.stat()
+                                found.append((st.st_mtime, (video.name, int(match.group(1))), st.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._bytes += size
+        self._loaded = True
+        self._evict()
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            (uuid, index), size = self._entries.popitem(last=False)
+            self._bytes -= size
+            try:
+                os.remove(self.path(uuid, index))
+            except OSError:
+                pass
+
+    def _http(self):
+        with self._lock:
+            if self._client is None:
+                self._client = HttpClient(cover_concurrency=self.workers)
+            return self._client
+
+    def get(self, uuid, seek_base, index):
+        """Local path of sheet `index`, fetching it first if needed."""
+        key = (uuid, index)
+        path = self.path(uuid, index)
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if key in self._entries and os.path.isfile(path):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return path
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = self._inflight[key] = threading.Event()
+        if not owner:
+            # Someone else (often a prefetch) is already fetching it.
+            event.wait(60)
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    return path
+            raise LookupError(f"seek sheet {index} of {uuid} could not be fetched")
+        try:
+            data = fetch_bytes(f"{seek_base}/_{index}.jpg", client=self._http())
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_cover_file(path, data)
+            with self._lock:
+                self.fetches += 1
+                if key in self._entries:
+                    self._bytes -= self._entries[key]
+                self._entries[key] = len(data)
+                self._bytes += len(data)
+                self._evict()
+            return path
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def prefetch(self, uuid, seek_base, index, total):
+        pack = self._pack(uuid)
+        wanted = []
+        with self._lock:
+            for step in range(1, self.prefetch_count + 1):
+                for neighbour in (index + step, index - step):
+                    key = (uuid, neighbour)
+                    if not 0 <= neighbour < total or (pack is not None and neighbour in pack):
+                        continue
+                    if key not in self._entries and key not in self._inflight:
+                        if key not in self._queued:
+                            self._queued.add(key)
+                            wanted.append(neighbour)
+            if wanted and self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="seek-prefetch")
+        for neighbour in wanted:
+            self._executor.submit(self._prefetch_one, uuid, seek_base, neighbour)
 
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            client, self._client = self._client, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if client is not None:
+            client.close()
 
-def ensure_schema(conn):
-    conn.executescript(
+    def _prefetch_one(self, uuid, seek_base, index):
+        try:
+            self.get(uuid, seek_base, index)
+        except Exception as e:
+            print(f"[WARN] Seek prefetch failed for {uuid} _{index}.jpg: {e}")
+        finally:
+            with self._lock:
+                self._queued.discard((uuid, index))
+
+
+class Library:
+    """Per-app database handle and caches, kept in app.extensions["missav"].
+
+    Everything here belongs to one DB path and covers dir, so two apps in
+    one process (or an app and its reloaded successor) never share cached
+    pages or connections.
+    """
+
+    def __init__(
+        self, db_path, covers_dir, seeks_dir, seek_cache_bytes=SEEK_CACHE_BYTES, seek_prefetch=SEEK_PREFETCH
+    ):
+        self.db_path = db_path
+        self.covers_dir = covers_dir
+        self.thumbs_dir = thumbnails_dir(covers_dir)
+        self.page_cache = LRUCache(PAGE_CACHE_SIZE, PAGE_CACHE_TTL)
+        self.query_cache = LRUCache(QUERY_CACHE_SIZE, PAGE_CACHE_TTL)
+        self.cover_index = CoverIndex(covers_dir)
+        self.stream_resolver = StreamResolver(db_path)
+        self.seek_cache = SeekSpriteCache(seeks_dir, seek_cache_bytes, seek_prefetch)
+        self._local = threading.local()
+        self._read_conns = []
+        self._conns_lock = threading.Lock()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def prepare_database(self):
+        # Migrations run once per app, not per request.
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if not self._schema_ready:
+                with closing(connect_sqlite(self.db_path)) as conn:
+                    ensure_schema(conn)
+                self._schema_ready = True
+
+    def read_connection(self):
+        """Thread-local read-only connection, reused across requests.
+
+        query_only keeps it from ever taking the write lock, so reads run
+        next to a live crawler under WAL. Reuse also keeps sqlite3's
+        per-connection prepared-statement cache warm.
         """
-        CREATE TABLE IF NOT EXISTS articles (
-            id TEXT PRIMARY KEY,
-            title TEXT NOT NULL,
-            description TEXT,
-            cover TEXT
-        );
-
-        CREATE TABLE IF NOT EXISTS article_refs (
-            from_article_id TEXT REFERENCES articles(id) ON DELETE CASCADE,
-            to_article_id TEXT REFERENCES articles(id) ON DELETE CASCADE,
-            PRIMARY KEY (from_article_id, to_article_id)
-        );
-
-        CREATE INDEX IF NOT EXISTS idx_refs_to ON article_refs(to_article_id);
-
-        CREATE TABLE IF NOT EXISTS tags (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL UNIQUE
-        );
-
-        CREATE TABLE IF NOT EXISTS article_tags (
-            article_id TEXT NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
-            tag_id INTEGER NOT NULL REFERENCES tags(id) ON DELETE CASCADE,
-            PRIMARY KEY (article_id, tag_id)
-        );
-
-        CREATE INDEX IF NOT EXISTS idx_article_tags_article ON article_tags(article_id);
-        CREATE INDEX IF NOT EXISTS idx_article_tags_tag ON article_tags(tag_id);
+        self.prepare_database()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        # Only its own thread uses it; close() may run on another thread.
+        conn = sqlite3.connect(self.db_path, timeout=30, cached_statements=256, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA mmap_size = {READ_MMAP_SIZE}")
+        conn.execute(f"PRAGMA cache_size = -{READ_CACHE_KIB}")
+        conn.execute("PRAGMA query_only = ON")
+        self._local.conn = conn
+        with self._conns_lock:
+            self._read_conns.append(conn)
+        return conn
+
+    def write_connection(self):
+        self.prepare_database()
+        conn = connect_sqlite(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def close(self):
+        """Stop background work and close read connections.
+
+        Call once no request is running on this library any more.
         """
-    )
-    cols = conn.execute("PRAGMA table_info(articles)").fetchall()
-    col_names = {c["name"] for c in cols}
-    if "dislike" not in col_names:
-        conn.execute("ALTER TABLE articles ADD COLUMN dislike INTEGER NOT NULL DEFAULT 0")
-        conn.commit()
+        self.stream_resolver.close()
+        self.seek_cache.close()
+        with self._conns_lock:
+            conns, self._read_conns = self._read_conns, []
+        for conn in conns:
+            conn.close()
+
+
+def library():
+    return current_app.extensions["missav"]
+
+
+def get_db_connection():
+    return library().read_connection()
+
+
+def get_write_connection():
+    return library().write_connection()
+
+
+def library_generation(conn):
+    row = conn.execute("SELECT generation FROM library_generation WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+
+def cached_count(conn, sql, params):
+    # Paging through a large listing does not re-count it on every click.
+    key = (sql, tuple(params), g.get("generation"))
+    total = library().query_cache.get(key)
+    if total is None:
+        row = conn.execute(sql, params).fetchone()
+        total = int(row[0] or 0) if row else 0
+        library().query_cache.put(key, total)
+    return total
+
+
+def get_hot_tags(conn):
+    # Shared by every index page of one generation, whatever its filters.
+    key = ("hot_tags", allow_dislike(), g.get("generation"))
+    hot_tags = library().query_cache.get(key)
+    if hot_tags is None:
+        # tag_counts is maintained by the crawler and the dislike toggle;
+        # `visible` leaves out disliked articles.
+        count_col = "tc.articles" if allow_dislike() else "tc.visible"
+        rows = conn.execute(
+            f"""
+            SELECT t.name, {count_col} AS cnt
+            FROM tag_counts tc
+            JOIN tags t ON t.id = tc.tag_id
+            WHERE {count_col} > 0
+            ORDER BY cnt DESC, t.name COLLATE NOCASE ASC
+            """
+        ).fetchall()
+        hot_tags = [{"name": r["name"], "count": int(r["cnt"])} for r in rows]
+        library().query_cache.put(key, hot_tags)
+    return hot_tags
+
+
+def cached_page(view):
+    """Serve a GET view from page_cache, with an ETag for 304 revalidation.
+
+    The key is the endpoint, its arguments, the normalised query string,
+    the dislike mode and the library generation, so any library write
+    makes every older entry (and ETag) unreachable.
+    """
+
+    @functools.wraps(view)
+    def wrapper(**kwargs):
+        g.generation = library_generation(get_db_connection())
+        key = (
+            request.endpoint,
+            tuple(sorted(kwargs.items())),
+            tuple(sorted((k, v) for k, v in request.args.items(multi=True) if v)),
+            allow_dislike(),
+            g.generation,
+        )
+        etag = f"{g.generation}-{zlib.crc32(repr(key[:4]).encode('utf-8')):08x}"
+        if etag in request.if_none_match:
+            response = make_response("", 304)
+        else:
+            body = library().page_cache.get(key)
+            if body is None:
+                body = view(**kwargs)
+                library().page_cache.put(key, body)
+            response = make_response(body)
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    return wrapper
+
+
+def tag_article_count(conn, tag):
+    count_col = "tc.articles" if allow_dislike() else "tc.visible"
+    rows = conn.execute(
+        f"""
+        SELECT {count_col}
+        FROM tags t
+        LEFT JOIN tag_counts tc ON tc.tag_id = t.id
+        WHERE t.name = ? COLLATE NOCASE
+        """,
+        (tag,),
+    ).fetchall()
+    if len(rows) <= 1:
+        return int(rows[0][0] or 0) if rows else 0
+
+    # Tags that differ only in case can sit on the same article; summing
+    # their counts would count it twice, so count distinct articles.
+    dislike_sql = "" if allow_dislike() else " AND a.dislike = 0"
+    row = conn.execute(
+        f"""
+        SELECT COUNT(DISTINCT at.article_id)
+        FROM tags t
+        JOIN article_tags at ON at.tag_id = t.id
+        JOIN articles a ON a.id = at.article_id
+        WHERE t.name = ? COLLATE NOCASE
+          AND {DOWNLOADED_WHERE}{dislike_sql}
+        """,
+        (tag,),
+    ).fetchone()
+    return int(row[0] or 0)
+
+
+def fts_match_query(q):
+    # One quoted phrase, so the trigram index matches q as a substring of
+    # any column, like the LIKE fallback does.
+    return '"' + q.replace('"', '""') + '"'
 
 
 def allow_dislike():
-    return bool(app.config.get("SHOW_DISLIKE", False))
+    return bool(current_app.config.get("SHOW_DISLIKE", False))
+
 
+def abort_unless_visible(conn, article_id):
+    # 404 for unknown articles, and for disliked ones unless they are shown.
+    row = conn.execute("SELECT COALESCE(dislike, 0) AS dislike FROM articles WHERE id = ?", (article_id,)).fetchone()
+    if not row or (row["dislike"] and not allow_dislike()):
+        abort(404)
 
-def cover_src(filename):
+
+def cover_version(filename):
     if not filename:
         return None
-    full_path = os.path.join(COVERS_DIR, filename)
-    if not os.path.exists(full_path):
-        return None
-    return url_for("cover_file", filename=filename)
+    return library().cover_index.version(filename, g.get("generation"))
+
+
+def cover_src(filename, version):
+    return url_for("cover_file", filename=filename, v=version)
+
+
+def thumb_srcsets(filename, version):
+    # {format: "url 240w, url 480w"}; derivatives are made on first request.
+    return {
+        fmt: ", ".join(
+            f"{url_for('thumbnail_file', filename=thumbnail_filename(filename, width, fmt), v=version)} {width}w"
+            for width in THUMB_WIDTHS
+        )
+        for fmt in THUMB_FORMATS
+    }
 
 
 def normalize_article_row(row):
     item = dict(row)
     item["keywords_list"] = item.get("keywords_list", [])
-    item["cover_url"] = cover_src(item.get("cover"))
+    version = cover_version(item.get("cover"))
+    item["cover_url"] = cover_src(item["cover"], version) if version else None
+    item["thumb_srcset"] = thumb_srcsets(item["cover"], version) if version else None
     item["dislike"] = bool(item.get("dislike", 0))
     return item
 
 
-@app.route("/covers/<path:filename>")
+_routes = []
+
+
+def route(rule, **options):
+    # Views are collected here and registered on each app by create_app().
+    def decorator(view):
+        _routes.append((rule, view, options))
+        return view
+
+    return decorator
+
+
+def send_cover(directory, filename, version):
+    """Send a file under covers/ with long-lived caching when versioned.
+
+    Only a ?v= matching `version`, the source cover's current version, is
+    cached as immutable; a stale or made-up one revalidates like no ?v=.
+
+    With COVERS_ACCEL_PREFIX set (an nginx `internal` location aliased to
+    covers/), only an X-Accel-Redirect header is sent and nginx serves the
+    bytes; USE_X_SENDFILE does the same for Apache/lighttpd through
+    send_from_directory. Otherwise Flask sends the file with an ETag and
+    answers If-None-Match with 304.
+    """
+    accel_prefix = current_app.config.get("COVERS_ACCEL_PREFIX")
+    if accel_prefix:
+        full_path = safe_join(directory, filename)
+        if full_path is None or not os.path.isfile(full_path):
+            abort(404)
+        response = make_response("")
+        response.headers["X-Accel-Redirect"] = (
+            accel_prefix.rstrip("/") + "/" + os.path.relpath(full_path, library().covers_dir).replace(os.sep, "/")
+        )
+        response.headers["Content-Type"] = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    else:
+        response = send_from_directory(directory, filename)
+    if version and request.args.get("v") == version:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = COVER_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+
+@route("/covers/<path:filename>")
 def cover_file(filename):
-    return send_from_directory(COVERS_DIR, filename)
+    return send_cover(library().covers_dir, filename, cover_version(filename))
 
 
-@app.route("/")
+@route("/thumbs/<filename>")
+def thumbnail_file(filename):
+    match = THUMB_NAME_PATTERN.match(filename)
+    if not match or int(match.group(2)) not in THUMB_WIDTHS or match.group(3) not in THUMB_FORMATS:
+        abort(404)
+    covers_dir, thumbs_dir = library().covers_dir, library().thumbs_dir
+    cover = f"{match.group(1)}.jpg"
+    cover_path = os.path.join(covers_dir, cover)
+    if not os.path.exists(cover_path):
+        abort(404)
+    if not is_fresh_thumbnail(os.path.join(thumbs_dir, filename), os.path.getmtime(cover_path)):
+        try:
+            make_thumbnails(covers_dir, cover)
+        except RuntimeError:
+            # No Pillow here: the full-size cover still renders.
+            return redirect(url_for("cover_file", filename=cover, v=request.args.get("v")))
+    return send_cover(thumbs_dir, filename, cover_version(cover))
+
+
+@route("/")
+@cached_page
 def index():
     try:
         page = int(request.args.get("page", "1"))
@@ -102,16 +772,28 @@ def index():
     page = max(page, 1)
     q = request.args.get("q", "").strip()
     tag = request.args.get("tag", "").strip()
+    after = request.args.get("after", "").strip()
+    before = request.args.get("before", "").strip()
+    last = request.args.get("last") == "1"
 
     with get_db_connection() as conn:
-        ensure_schema(conn)
         where_clauses = [DOWNLOADED_WHERE]
         params = []
+        from_sql = "articles a"
+        order_sql = "a.id COLLATE NOCASE ASC"
+
+        ranked = False
 
         if not allow_dislike():
-            where_clauses.append("COALESCE(a.dislike, 0) = 0")
+            where_clauses.append("a.dislike = 0")
 
-        if q:
+        if q and len(q) >= FTS_MIN_QUERY:
+            ranked = True
+            from_sql = "articles_fts JOIN articles a ON a.id = articles_fts.article_id"
+            order_sql = f"{FTS_RANK}, a.id COLLATE NOCASE ASC"
+            where_clauses.insert(0, "articles_fts MATCH ?")
+            params.append(fts_match_query(q))
+        elif q:
             like_q = f"%{q}%"
             where_clauses.append(
                 """
@@ -146,48 +828,63 @@ def index():
 
         where_sql = " AND ".join(f"({w})" for w in where_clauses)
 
-        count_row = conn.execute(
-            f"SELECT COUNT(*) AS total FROM articles a WHERE {where_sql}",
-            params,
-        ).fetchone()
-        total_items = int(count_row["total"] if count_row else 0)
+        if tag and not q:
+            total_items = tag_article_count(conn, tag)
+        else:
+            total_items = cached_count(conn, f"SELECT COUNT(*) FROM {from_sql} WHERE {where_sql}", params)
         total_pages = max(1, math.ceil(total_items / PER_PAGE))
+        page = min(page, total_pages)
 
-        if page > total_pages:
-            page = total_pages
+        select_sql = f"SELECT a.id, a.title, a.cover, COALESCE(a.dislike, 0) AS dislike FROM {from_sql}"
+        prev_cursor = next_cursor = None
+        if ranked or (page > 1 and not (after or before or last)):
+            # Ranked search results and explicit page jumps are positional.
+            rows = conn.execute(
+                f"{select_sql} WHERE {where_sql} ORDER BY {order_sql} LIMIT ? OFFSET ?",
+                [*params, PER_PAGE + 1, (page - 1) * PER_PAGE],
+            ).fetchall()
+            has_prev, has_more = page > 1, len(rows) > PER_PAGE
+            rows = rows[:PER_PAGE]
+            if not ranked and rows:
+                prev_cursor = rows[0]["id"] if has_prev else None
+                next_cursor = rows[-1]["id"] if has_more else None
+        else:
+            # Keyset pagination: seek to the cursor through the listing
+            # index, so any page costs the same as the first. `before` and
+            # `last` read backwards and flip the rows afterwards.
+            backwards = bool(before) or (last and not after)
+            cursor = before or after
+            seek_sql = ""
+            seek_params = []
+            if cursor:
+                seek_sql = " AND " + LISTING_SEEK.format(op="<" if backwards else ">")
+                seek_params = [cursor, cursor, cursor]
+            direction = "DESC" if backwards else "ASC"
+            rows = conn.execute(
+                f"""
+                {select_sql}
+                WHERE {where_sql}{seek_sql}
+                ORDER BY a.id COLLATE NOCASE {direction}, a.id {direction}
+                LIMIT ?
+                """,
+                [*params, *seek_params, PER_PAGE + 1],
+            ).fetchall()
+            has_more = len(rows) > PER_PAGE
+            rows = rows[:PER_PAGE]
+            if backwards:
+                rows.reverse()
+                has_prev, has_next = has_more, bool(before)
+            else:
+                has_prev, has_next = bool(after), has_more
+            if last and not cursor:
+                page = total_pages
+            if rows:
+                prev_cursor = rows[0]["id"] if has_prev else None
+                next_cursor = rows[-1]["id"] if has_next else None
 
-        offset = (page - 1) * PER_PAGE
-        rows = conn.execute(
-            f"""
-            SELECT a.id, a.title, a.cover, COALESCE(a.dislike, 0) AS dislike
-            FROM articles a
-            WHERE {where_sql}
-            ORDER BY a.id COLLATE NOCASE ASC
-            LIMIT ? OFFSET ?
-            """,
-            [*params, PER_PAGE, offset],
-        ).fetchall()
-
-        tag_where = [DOWNLOADED_WHERE]
-        tag_params = []
-        if not allow_dislike():
-            tag_where.append("COALESCE(a.dislike, 0) = 0")
-        tag_where_sql = " AND ".join(f"({w})" for w in tag_where)
-        tag_rows = conn.execute(
-            f"""
-            SELECT t.name, COUNT(*) AS cnt
-            FROM tags t
-            JOIN article_tags at ON at.tag_id = t.id
-            JOIN articles a ON a.id = at.article_id
-            WHERE {tag_where_sql}
-            GROUP BY t.id, t.name
-            ORDER BY cnt DESC, t.name COLLATE NOCASE ASC
-            """,
-            tag_params,
-        ).fetchall()
+        hot_tags = get_hot_tags(conn)
 
     articles = [normalize_article_row(r) for r in rows]
-    hot_tags = [{"name": r["name"], "count": int(r["cnt"])} for r in tag_rows]
 
     return render_template(
         "index.html",
@@ -195,16 +892,19 @@ def index():
         page=page,
         total_pages=total_pages,
         total_items=total_items,
+        ranked=ranked,
+        prev_cursor=prev_cursor,
+        next_cursor=next_cursor,
         q=q,
         active_tag=tag,
         hot_tags=hot_tags,
     )
 
 
-@app.route("/article/<article_id>")
+@route("/article/<article_id>")
+@cached_page
 def article_detail(article_id):
     with get_db_connection() as conn:
-        ensure_schema(conn)
         article_row = conn.execute(
             """
             SELECT id, title, description, cover, COALESCE(dislike, 0) AS dislike
@@ -226,11 +926,7 @@ def article_detail(article_id):
                 a.title,
                 a.cover,
                 COALESCE(a.dislike, 0) AS dislike,
-                CASE WHEN (
-                    a.description IS NOT NULL
-                    OR EXISTS (SELECT 1 FROM article_tags at WHERE at.article_id = a.id)
-                    OR (a.title IS NOT NULL AND a.title <> a.id)
-                ) THEN 1 ELSE 0 END AS is_downloaded
+                a.downloaded AS is_downloaded
             FROM article_refs r
             JOIN articles a ON a.id = r.to_article_id
             WHERE r.from_article_id = ? {ref_dislike_filter}
@@ -250,36 +946,301 @@ def article_detail(article_id):
             (article_id,),
         ).fetchall()
 
+        # Resolved by miss_thumb.py; shown whatever its age.
+        stream = load_stream_metadata(conn, article_id, max_age=None)
+
     article = normalize_article_row(article_row)
     article["keywords_list"] = [r["name"] for r in keyword_rows]
     refs = [normalize_article_row(r) for r in refs_rows]
 
-    return render_template("article.html", article=article, refs=refs, show_dislike=allow_dislike())
+    return render_template(
+        "article.html", article=article, refs=refs, stream=stream, show_dislike=allow_dislike()
+    )
 
 
-@app.post("/article/<article_id>/dislike")
+@route("/article/<article_id>/viewer")
+def article_viewer(article_id):
+    conn = get_db_connection()
+    abort_unless_visible(conn, article_id)
+    stream = load_stream_metadata(conn, article_id, max_age=None)
+    if stream is not None:
+        context = viewer_context(
+            article_id, article_url(article_id), stream, back_url=url_for("article_detail", article_id=article_id)
+        )
+        # Sheets come through the local cache; the template appends /_<n>.jpg.
+        context["seek_base"] = url_for("seek_sheet", article_id=article_id, index=0).rsplit("/", 1)[0]
+        return render_template("viewer.html", **context)
+
+    # Not resolved yet: hand it to the background resolver and poll.
+    resolver = library().stream_resolver
+    state, error = resolver.status(article_id)
+    if state is None or (state == "failed" and request.args.get("retry")):
+        resolver.request(article_id)
+        state, error = "pending", None
+    response = make_response(
+        render_template(
+            "viewer_pending.html",
+            article_id=article_id,
+            error=error,
+            poll_seconds=VIEWER_POLL_SECONDS if state == "pending" else None,
+        ),
+        202 if state == "pending" else 200,
+    )
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+@route("/article/<article_id>/seek/_<int:index>.jpg")
+def seek_sheet(article_id, index):
+    conn = get_db_connection()
+    abort_unless_visible(conn, article_id)
+    stream = load_stream_metadata(conn, article_id, max_age=None)
+    total = (stream or {}).get("snapshots") or 0
+    if stream is None or index >= total:
+        abort(404)
+    cache = library().seek_cache
+    data = cache.packed(stream["uuid"], index)
+    if data == b"":
+        abort(404)
+    if data is not None:
+        response = make_response(data)
+        response.mimetype = "image/jpeg"
+        response.cache_control.max_age = COVER_MAX_AGE
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        cache.prefetch(stream["uuid"], stream["seek_base"], index, total)
+        return response
+    try:
+        path = cache.get(stream["uuid"], stream["seek_base"], index)
+    except HTTPError as e:
+        abort(404 if e.code == 404 else 502)
+    except (OSError, LookupError):
+        abort(502)
+    cache.prefetch(stream["uuid"], stream["seek_base"], index, total)
+    # A sheet never changes for a given uuid.
+    response = send_from_directory(os.path.dirname(path), os.path.basename(path), max_age=COVER_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+@route("/article/<article_id>/dislike", methods=["POST"])
 def set_article_dislike(article_id):
     dislike = 1 if request.form.get("dislike") == "on" else 0
-    with get_db_connection() as conn:
-        ensure_schema(conn)
-        exists = conn.execute("SELECT 1 FROM articles WHERE id = ?", (article_id,)).fetchone()
-        if not exists:
+    with closing(get_write_connection()) as conn:
+        row = conn.execute(
+            "SELECT downloaded, COALESCE(dislike, 0) AS dislike FROM articles WHERE id = ?", (article_id,)
+        ).fetchone()
+        if not row:
             abort(404)
-        conn.execute("UPDATE articles SET dislike = ? WHERE id = ?", (dislike, article_id))
+        if dislike != row["dislike"]:
+            conn.execute("UPDATE articles SET dislike = ? WHERE id = ?", (dislike, article_id))
+            if row["downloaded"]:
+                adjust_tag_counts(conn, article_id, 0, row["dislike"] - dislike)
+            bump_generation(conn)
         conn.commit()
     if dislike and not allow_dislike():
         return redirect(url_for("index"))
     return redirect(url_for("article_detail", article_id=article_id))
 
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Run MissAV library web app.")
+def create_app(db_path=None, covers_dir=None, show_dislike=False, seeks_dir=None, **config):
+    """Build a library app.
+
+    db_path, covers_dir and seeks_dir default to MISSAV_DB_PATH,
+    MISSAV_COVERS_DIR and MISSAV_SEEKS_DIR, else the files next to this
+    script. Other keyword arguments go into app.config (USE_X_SENDFILE,
+    COVERS_ACCEL_PREFIX, SEEK_CACHE_BYTES, SEEK_PREFETCH, ...). Under an
+    external WSGI server:
+
+        gunicorn -w 4 --threads 8 -k gthread 'app:create_app()'
+    """
+    app = Flask(__name__)
+    app.config["SHOW_DISLIKE"] = bool(show_dislike)
+    app.config.update(config)
+    app.extensions["missav"] = Library(
+        db_path or DEFAULT_DB_PATH,
+        covers_dir or DEFAULT_COVERS_DIR,
+        seeks_dir or DEFAULT_SEEKS_DIR,
+        app.config.get("SEEK_CACHE_BYTES", SEEK_CACHE_BYTES),
+        app.config.get("SEEK_PREFETCH", SEEK_PREFETCH),
+    )
+    for rule, view, options in _routes:
+        app.add_url_rule(rule, view_func=view, **options)
+    return app
+
+
+app = create_app()
+
+
+def load_gunicorn():
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        return None
+    return BaseApplication
+
+
+def serve_gunicorn(BaseApplication, app_options, host, port, workers, threads, timeout):
+    class LibraryServer(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("threads", threads)
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("timeout", timeout)
+            self.cfg.set("graceful_timeout", timeout)
+
+        def load(self):
+            # Called in each worker after the fork, so workers share no
+            # connections or caches; on SIGHUP the new workers build a
+            # fresh app while the old ones finish their requests.
+            return create_app(**app_options)
+
+    print(
+        f"[INFO] Serving http://{host}:{port} with {workers} workers x {threads} threads "
+        f"(kill -HUP {os.getpid()} reloads workers gracefully)"
+    )
+    LibraryServer().run()
+
+
+class ReloadableApp:
+    """WSGI callable that swaps in a freshly built app on reload().
+
+    Requests already running finish on the app they started with; the
+    old app's Library is closed once the last of them is done.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.app = factory()
+        self._lock = threading.Lock()
+        self._active = {}
+
+    def reload(self):
+        new_app = self.factory()
+        with self._lock:
+            old_app, self.app = self.app, new_app
+            idle = not self._active.get(old_app)
+        if idle:
+            old_app.extensions["missav"].close()
+
+    def _release(self, app):
+        with self._lock:
+            self._active[app] -= 1
+            retired = self._active[app] == 0 and app is not self.app
+            if self._active[app] == 0:
+                del self._active[app]
+        if retired:
+            app.extensions["missav"].close()
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            app = self.app
+            self._active[app] = self._active.get(app, 0) + 1
+        try:
+            body = app(environ, start_response)
+        except BaseException:
+            self._release(app)
+            raise
+        # The response body may still read files or the DB while it is sent.
+        return ClosingIterator(body, lambda: self._release(app))
+
+
+def serve_threaded(app_options, host, port):
+    wsgi_app = ReloadableApp(lambda: create_app(**app_options))
+    server = make_server(host, port, wsgi_app, threaded=True)
+    if hasattr(signal, "SIGHUP"):
+
+        def on_hup(signum, frame):
+            wsgi_app.reload()
+            print("[INFO] Reloaded app")
+
+        signal.signal(signal.SIGHUP, on_hup)
+        print(f"[INFO] Serving http://{host}:{port} threaded (kill -HUP {os.getpid()} reloads the app)")
+    else:
+        print(f"[INFO] Serving http://{host}:{port} threaded")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        description="Run MissAV library web app.",
+        epilog=(
+            "Serves with gunicorn (several worker processes, each with a thread pool) when it is "
+            "installed, else with a threaded server in one process. --debug runs Flask's dev server."
+        ),
+    )
     parser.add_argument(
         "--dislike",
         action="store_true",
         help="Show disliked articles in list/ref pages.",
     )
-    args = parser.parse_args()
-    app.config["SHOW_DISLIKE"] = bool(args.dislike)
-    print("Starting server at http://127.0.0.1:5000")
-    app.run(debug=True, port=5000)
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=5000, help="Port to bind (default: 5000)")
+    parser.add_argument("--db", help="SQLite library (default: MISSAV_DB_PATH or missav_title.db)")
+    parser.add_argument("--covers-dir", help="Cover directory (default: MISSAV_COVERS_DIR or covers/)")
+    parser.add_argument("--seeks-dir", help="Seek sheet cache (default: MISSAV_SEEKS_DIR or seeks/)")
+    parser.add_argument(
+        "--seek-cache-mb",
+        type=int,
+        default=SEEK_CACHE_BYTES // (1024 * 1024),
+        help=f"Size cap of the seek sheet cache in MiB (default: {SEEK_CACHE_BYTES // (1024 * 1024)})",
+    )
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn worker processes (default: 4)")
+    parser.add_argument("--threads", type=int, default=8, help="Threads per gunicorn worker (default: 8)")
+    parser.add_argument(
+        "--timeout",
+        type=int,
+        default=30,
+        help="Seconds a worker may spend on one request, and on finishing requests at reload (default: 30)",
+    )
+    parser.add_argument("--debug", action="store_true", help="Run Flask's dev server with debugger and reloader.")
+    parser.add_argument(
+        "--x-sendfile",
+        action="store_true",
+        help="Hand cover files to the front server with X-Sendfile (Apache/lighttpd).",
+    )
+    parser.add_argument(
+        "--x-accel-prefix",
+        default=os.getenv("MISSAV_X_ACCEL_PREFIX"),
+        help="nginx internal location aliased to covers/; covers are sent with X-Accel-Redirect.",
+    )
+    return parser
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    if args.workers < 1 or args.threads < 1:
+        print("[ERROR] --workers and --threads must be >= 1")
+        sys.exit(1)
+    app_options = {
+        "db_path": args.db,
+        "covers_dir": args.covers_dir,
+        "seeks_dir": args.seeks_dir,
+        "show_dislike": args.dislike,
+        "SEEK_CACHE_BYTES": args.seek_cache_mb * 1024 * 1024,
+        "USE_X_SENDFILE": bool(args.x_sendfile),
+        "COVERS_ACCEL_PREFIX": args.x_accel_prefix,
+    }
+
+    if args.debug:
+        print(f"Starting server at http://{args.host}:{args.port}")
+        create_app(**app_options).run(host=args.host, port=args.port, debug=True)
+        return
+
+    BaseApplication = load_gunicorn()
+    if BaseApplication is None:
+        print("[WARN] gunicorn is not installed (uv pip install gunicorn); serving from one process")
+        serve_threaded(app_options, args.host, args.port)
+    else:
+        serve_gunicorn(BaseApplication, app_options, args.host, args.port, args.workers, args.threads, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
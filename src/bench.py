@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the crawler/library code paths.
+
+    python bench.py writes [--articles 2000] [--commit-every 1,20,200]
+    python bench.py parse [--dir debug] [--iterations 50]
+    python bench.py serve [--articles 100000] [--db big.db] [--workers 4] [--concurrency 16]
+
+Every benchmark runs against scratch data in a temporary directory and never
+touches missav_title.db.
+"""
+import argparse
+import glob
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.client import HTTPConnection
+from urllib.parse import quote, urlsplit
+
+import get_missav_titles as crawler
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Share of each request kind in the `serve` replay.
+REQUEST_MIX = (("index", 35), ("search", 20), ("tag", 20), ("article", 25))
+
+def legacy_write(conn, article_id, title, description, cover, keywords, refs):
+    # The pre-batching writer: one statement (plus a lookup) per tag and two
+    # statements per ref. Kept here as the baseline.
+    crawler.upsert_article(conn, article_id, title, description, cover)
+    conn.execute("DELETE FROM article_tags WHERE article_id = ?", (article_id,))
+    for kw in keywords:
+        conn.execute("INSERT OR IGNORE INTO tags (name) VALUES (?)", (kw,))
+        tag_row = conn.execute("SELECT id FROM tags WHERE name = ?", (kw,)).fetchone()
+        conn.execute(
+            "INSERT OR IGNORE INTO article_tags (article_id, tag_id) VALUES (?, ?)",
+            (article_id, tag_row[0]),
+        )
+    for to_id in refs:
+        conn.execute(
+            "INSERT INTO articles (id, title, dislike) VALUES (?, ?, 0) ON CONFLICT (id) DO NOTHING",
+            (to_id, to_id),
+        )
+        conn.execute(
+            "INSERT INTO article_refs (from_article_id, to_article_id) VALUES (?, ?) ON CONFLICT DO NOTHING",
+            (article_id, to_id),
+        )
+
+
+def synthetic_articles(count, tags_per, refs_per, tag_pool, seed=1):
+    rng = random.Random(seed)
+    tag_names = [f"タグ{i:04d}" for i in range(tag_pool)]
+    for i in range(count):
+        article_id = f"bench-{i:06d}"
+        keywords = rng.sample(tag_names, tags_per)
+        refs = [f"bench-{rng.randrange(count * 4):06d}" for _ in range(refs_per)]
+        yield article_id, f"BENCH-{i} title", "description " * 20, f"{article_id}.jpg", keywords, refs
+
+
+def run_write_case(workdir, label, articles, commit_every, legacy):
+    db_path = os.path.join(workdir, f"{label}.db")
+    conn = crawler.connect_sqlite(db_path)
+    crawler.ensure_schema(conn)
+    tag_cache = crawler.TagIdCache()
+    batcher = crawler.CommitBatcher(conn, every=commit_every, interval=float("inf"))
+
+    started = time.perf_counter()
+    for article_id, title, description, cover, keywords, refs in articles:
+        if legacy:
+            legacy_write(conn, article_id, title, description, cover, keywords, refs)
+            conn.commit()
+        else:
+            # Same path as crawl_single: one savepoint per article inside the batch.
+            with crawler.savepoint(conn):
+                crawler.write_article(conn, article_id, title, description, cover, keywords, refs, tag_cache)
+            batcher.note()
+    batcher.commit()
+    elapsed = time.perf_counter() - started
+    conn.close()
+    return elapsed
+
+
+def bench_writes(args):
+    articles = list(synthetic_articles(args.articles, args.tags_per, args.refs_per, args.tag_pool))
+    cases = [("legacy", 1, True)]
+    cases += [(f"batched-every-{n}", n, False) for n in args.commit_every]
+
+    print(
+        f"articles={len(articles)} tags/article={args.tags_per} refs/article={args.refs_per} "
+        f"tag_pool={args.tag_pool}"
+    )
+    with tempfile.TemporaryDirectory(prefix="missav-bench-") as workdir:
+        baseline = None
+        for label, commit_every, legacy in cases:
+            elapsed = run_write_case(workdir, label, articles, commit_every, legacy)
+            rate = len(articles) / elapsed
+            baseline = baseline or rate
+            print(f"{label:<22} {elapsed:8.2f}s {rate:10.1f} articles/s  x{rate / baseline:.1f}")
+
+
+def bench_parse(args):
+    paths = sorted(glob.glob(os.path.join(args.dir, "*.html")))
+    if not paths:
+        raise SystemExit(f"No .html files in {args.dir}")
+    pages = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            pages.append((os.path.basename(path), f.read()))
+
+    # Parity first: the fast extractor must return exactly what the
+    # HTMLParser version returns for every fixture.
+    mismatches = 0
+    for name, html in pages:
+        fast = crawler.parse_page(html)
+        reference = crawler.parse_page_htmlparser(html)
+        if fast != reference:
+            mismatches += 1
+            fields = ("title", "description", "cover_url", "keywords", "refs")
+            diff = [f for f, a, b in zip(fields, fast, reference) if a != b]
+            print(f"MISMATCH {name}: {', '.join(diff)}")
+    print(f"parity: {len(pages) - mismatches}/{len(pages)} fixtures identical")
+
+    total_bytes = sum(len(html.encode("utf-8")) for _, html in pages)
+    results = {}
+    for label, func in (("htmlparser", crawler.parse_page_htmlparser), ("fast", crawler.parse_page)):
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            for _, html in pages:
+                func(html)
+        elapsed = time.perf_counter() - started
+        per_page = elapsed / (args.iterations * len(pages))
+        results[label] = per_page
+        print(
+            f"{label:<12} {per_page * 1000:8.3f} ms/page "
+            f"{total_bytes * args.iterations / elapsed / 1e6:8.1f} MB/s"
+        )
+    print(f"speedup: x{results['htmlparser'] / results['fast']:.1f}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+def build_library(db_path, count, tags_per, refs_per, tag_pool):
+    conn = crawler.connect_sqlite(db_path)
+    try:
+        crawler.ensure_schema(conn)
+        have = conn.execute("SELECT COUNT(*) FROM articles WHERE downloaded = 1").fetchone()[0]
+        if have >= count:
+            print(f"[INFO] Reusing {db_path} ({have} articles)")
+            return
+        print(f"[INFO] Writing {count} synthetic articles to {db_path}")
+        tag_cache = crawler.TagIdCache()
+        batcher = crawler.CommitBatcher(conn, every=500, interval=float("inf"))
+        started = time.perf_counter()
+        for n, article in enumerate(synthetic_articles(count, tags_per, refs_per, tag_pool), 1):
+            crawler.write_article(conn, *article, tag_cache)
+            batcher.note()
+            if n % 10000 == 0:
+                print(f"[INFO] {n}/{count} articles ({n / (time.perf_counter() - started):.0f}/s)")
+        batcher.commit()
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def request_paths(count, tag_pool, total, seed):
+    # The same seed replays the same request sequence.
+    rng = random.Random(seed)
+    kinds = [kind for kind, _ in REQUEST_MIX]
+    weights = [weight for _, weight in REQUEST_MIX]
+    tag = lambda: f"タグ{rng.randrange(tag_pool):04d}"
+    article = lambda: f"bench-{rng.randrange(count):06d}"
+    for _ in range(total):
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "index":
+            choice = rng.random()
+            if choice < 0.4:
+                path = "/"
+            elif choice < 0.8:
+                path = f"/?after={article()}"
+            else:
+                path = f"/?page={rng.randint(2, 200)}"
+        elif kind == "search":
+            term = f"BENCH-{rng.randrange(count) // 10}" if rng.random() < 0.7 else tag()
+            path = f"/?q={quote(term)}"
+        elif kind == "tag":
+            path = f"/?tag={quote(tag())}" + (f"&page={rng.randint(2, 20)}" if rng.random() < 0.3 else "")
+        else:
+            path = f"/article/{article()}"
+        yield kind, path
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(host, port, proc, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise SystemExit(f"app.py exited with code {proc.returncode}")
+        try:
+            conn = HTTPConnection(host, port, timeout=30)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f"Server at {host}:{port} did not come up in {timeout:.0f}s")
+
+
+def replay(host, port, requests, concurrency):
+    # Keep-alive client threads pull from one shared sequence.
+    lock = threading.Lock()
+    source = iter(requests)
+    results = []
+
+    def client():
+        conn = HTTPConnection(host, port, timeout=60)
+        local = []
+        while True:
+            with lock:
+                item = next(source, None)
+            if item is None:
+                break
+            kind, path = item
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 200
+            except OSError:
+                conn.close()
+                conn = HTTPConnection(host, port, timeout=60)
+                ok = False
+            local.append((kind, time.perf_counter() - started, ok))
+        conn.close()
+        with lock:
+            results.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, time.perf_counter() - started
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))]
+
+
+def report_latencies(results, elapsed, concurrency):
+    print(f"{'kind':<10} {'requests':>9} {'errors':>7} {'p50 ms':>9} {'p99 ms':>9}")
+    for kind in [k for k, _ in REQUEST_MIX] + ["all"]:
+        rows = [r for r in results if kind == "all" or r[0] == kind]
+        latencies = sorted(r[1] for r in rows)
+        errors = sum(1 for r in rows if not r[2])
+        print(
+            f"{kind:<10} {len(rows):>9} {errors:>7} "
+            f"{percentile(latencies, 50) * 1000:>9.2f} {percentile(latencies, 99) * 1000:>9.2f}"
+        )
+    print(f"throughput: {len(results) / elapsed:.1f} req/s over {elapsed:.1f}s (concurrency {concurrency})")
+
+
+def bench_serve(args):
+    with tempfile.TemporaryDirectory(prefix="missav-bench-") as workdir:
+        proc = None
+        if args.url:
+            parts = urlsplit(args.url)
+            host, port = parts.hostname, parts.port or 80
+        else:
+            db_path = args.db or os.path.join(workdir, "library.db")
+            build_library(db_path, args.articles, args.tags_per, args.refs_per, args.tag_pool)
+            host, port = "127.0.0.1", free_port()
+            command = [
+                sys.executable,
+                os.path.join(BASE_DIR, "app.py"),
+                "--db", db_path,
+                "--covers-dir", os.path.join(workdir, "covers"),
+                "--port", str(port),
+                "--workers", str(args.workers),
+                "--threads", str(args.threads),
+            ]
+            print(f"[INFO] Starting app.py with {args.workers} workers x {args.threads} threads")
+            proc = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_server(host, port, proc)
+            if args.warmup:
+                warmup = request_paths(args.articles, args.tag_pool, args.warmup, args.seed + 1)
+                replay(host, port, warmup, args.concurrency)
+            requests = list(request_paths(args.articles, args.tag_pool, args.requests, args.seed))
+            results, elapsed = replay(host, port, requests, args.concurrency)
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait(timeout=30)
+    report_latencies(results, elapsed, args.concurrency)
+
+
+def int_list(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Benchmarks for the MissAV crawler and library.")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    writes = sub.add_parser("writes", help="Articles written per second into a scratch DB")
+    writes.add_argument("--articles", type=int, default=2000)
+    writes.add_argument("--tags-per", type=int, default=20)
+    writes.add_argument("--refs-per", type=int, default=30)
+    writes.add_argument("--tag-pool", type=int, default=800)
+    writes.add_argument(
+        "--commit-every",
+        type=int_list,
+        default=[1, 20, 200],
+        help="Comma-separated commit intervals to compare (default: 1,20,200)",
+    )
+    writes.set_defaults(func=bench_writes)
+
+    parse = sub.add_parser("parse", help="Parity check and speed of parse_page vs the HTMLParser version")
+    parse.add_argument("--dir", default=os.path.join(BASE_DIR, "debug"))
+    parse.add_argument("--iterations", type=int, default=50)
+    parse.set_defaults(func=bench_parse)
+
+    serve = sub.add_parser(
+        "serve", help="Replay index/search/tag/article requests against app.py; p50/p99 latency and req/s"
+    )
+    serve.add_argument("--articles", type=int, default=100000, help="Synthetic library size (default: 100000)")
+    serve.add_argument("--tags-per", type=int, default=8)
+    serve.add_argument("--refs-per", type=int, default=12)
+    serve.add_argument("--tag-pool", type=int, default=400)
+    serve.add_argument("--db", help="Build (or reuse) the synthetic library at this path instead of a temp dir")
+    serve.add_argument("--url", help="Benchmark an already running server instead of starting app.py")
+    serve.add_argument("--workers", type=int, default=4, help="app.py --workers (default: 4)")
+    serve.add_argument("--threads", type=int, default=8, help="app.py --threads (default: 8)")
+    serve.add_argument("--concurrency", type=int, default=16, help="Client connections (default: 16)")
+    serve.add_argument("--requests", type=int, default=5000, help="Measured requests (default: 5000)")
+    serve.add_argument("--warmup", type=int, default=500, help="Unmeasured requests first (default: 500)")
+    serve.add_argument("--seed", type=int, default=1)
+    serve.set_defaults(func=bench_serve)
+    return parser
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Local stand-in for missav.ai/fourhoi.com serving saved debug pages.
+
+Serves debug/debug_missing_{id}.html at /ja/{id}, covers at
+/covers/{id}/cover-n.jpg and seek sheets at /{uuid}/seek/_{n}.jpg over
+keep-alive HTTP/1.1, so the crawler can be run end to end without touching
+the network:
+
+    python fixture_server.py --port 8765
+    python get_missav_titles.py --fetch-mode http --base-url http://127.0.0.1:8765/ja hunta-881
+"""
+import argparse
+import hashlib
+import os
+import re
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from get_missav_titles import safe_id_for_filename
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SEEK_SHEET_PATTERN = re.compile(r"^_(\d+)\.jpg$")
+OG_IMAGE_PATTERN = re.compile(
+    r'(<meta\s+property="og:image"\s+content=")https://fourhoi\.com/([^/"]+)/([^"]+)"',
+    re.IGNORECASE,
+)
+# Smallest valid JPEG (1x1 grey) for ids without a saved cover.
+PLACEHOLDER_JPG = bytes.fromhex(
+    "ffd8ffe000104a46494600010100000100010000ffdb004300080606070605080707070909080a0c140d0c0b0b0c1912130f"
+    "141d1a1f1e1d1a1c1c20242e2720222c231c1c2837292c30313434341f27393d38323c2e333432ffc0000b080001000101"
+    "011100ffc4001f0000010501010101010100000000000000000102030405060708090a0bffc400b5100002010303020403"
+    "050504040000017d01020300041105122131410613516107227114328191a1082342b1c11552d1f02433627282090a1617"
+    "18191a25262728292a3435363738393a434445464748494a535455565758595a636465666768696a737475767778797a83"
+    "8485868788898a92939495969798999aa2a3a4a5a6a7a8a9aab2b3b4b5b6b7b8b9bac2c3c4c5c6c7c8c9cad2d3d4d5d6d7"
+    "d8d9dae1e2e3e4e5e6e7e8e9eaf1f2f3f4f5f6f7f8f9faffda0008010100003f00fbd3ffd9"
+)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MissAVFixture/1.0"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def send_body(self, status, body, content_type, mtime=None):
+        # Pages and covers carry ETag/Last-Modified and honour conditional
+        # requests, like the real CDN, so refresh runs can be exercised.
+        if status == 200:
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            last_modified = formatdate(mtime or time.time(), usegmt=True)
+            if self.not_modified(etag, mtime):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", last_modified)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if status == 200:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def not_modified(self, etag, mtime):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            return etag in [t.strip() for t in if_none_match.split(",")] or if_none_match.strip() == "*"
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since and mtime:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def do_GET(self):
+        if self.server.delay:
+            time.sleep(self.server.delay)
+
+        parts = [p for p in self.path.split("?", 1)[0].split("/") if p]
+        if len(parts) == 2 and parts[0] == "ja":
+            self.serve_page(parts[1])
+        elif len(parts) == 3 and parts[0] == "covers":
+            self.serve_cover(parts[1])
+        elif len(parts) == 3 and parts[1] == "seek" and SEEK_SHEET_PATTERN.match(parts[2]):
+            self.serve_seek_sheet(parts[0], int(SEEK_SHEET_PATTERN.match(parts[2]).group(1)))
+        else:
+            self.send_body(404, b"not found", "text/plain")
+
+    def serve_page(self, article_id):
+        path = os.path.join(self.server.debug_dir, f"debug_missing_{safe_id_for_filename(article_id)}.html")
+        if not os.path.exists(path):
+            self.send_body(404, b"not found", "text/plain")
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+        # Point og:image at this server; refs stay on fourhoi.com so the
+        # crawler still recognises them.
+        host = self.headers.get("Host") or f"127.0.0.1:{self.server.server_port}"
+        html = OG_IMAGE_PATTERN.sub(lambda m: f'{m.group(1)}http://{host}/covers/{m.group(2)}/{m.group(3)}"', html)
+        self.send_body(200, html.encode("utf-8"), "text/html; charset=utf-8", os.path.getmtime(path))
+
+    def serve_cover(self, article_id):
+        path = os.path.join(self.server.covers_dir, f"{safe_id_for_filename(article_id)}.jpg")
+        mtime = None
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                body = f.read()
+            mtime = os.path.getmtime(path)
+        else:
+            body = PLACEHOLDER_JPG
+        self.send_body(200, body, "image/jpeg", mtime)
+
+    def serve_seek_sheet(self, uuid, index):
+        # Sheets past the last one are 404, like the real seek host.
+        status = self.server.seek_errors.get(index)
+        if status is None and index >= self.server.seek_sheets:
+            status = 404
+        if status is not None:
+            self.send_body(status, b"error", "text/plain")
+            return
+        # The placeholder plus a trailer after EOI, so every sheet differs.
+        self.send_body(200, PLACEHOLDER_JPG + f"{uuid}/_{index}".encode("ascii"), "image/jpeg")
+
+
+def make_server(
+    host="127.0.0.1", port=8765, debug_dir=None, covers_dir=None, delay=0.0, verbose=False, seek_sheets=100
+):
+    server = ThreadingHTTPServer((host, port), FixtureHandler)
+    server.daemon_threads = True
+    server.debug_dir = debug_dir or os.path.join(BASE_DIR, "debug")
+    server.covers_dir = covers_dir or os.path.join(BASE_DIR, "covers")
+    server.delay = delay
+    server.verbose = verbose
+    server.seek_sheets = seek_sheets
+    # {sheet index: status} to answer instead, for exercising failures.
+    server.seek_errors = {}
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve saved debug pages as a local MissAV stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--debug-dir", help="Directory of debug_missing_{id}.html files (default: debug/)")
+    parser.add_argument("--covers-dir", help="Directory of {id}.jpg covers (default: covers/)")
+    parser.add_argument("--delay", type=float, default=0.0, help="Artificial latency per request in seconds")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    parser.add_argument("--seek-sheets", type=int, default=100, help="Seek sheets per video (default: 100)")
+    args = parser.parse_args()
+
+    server = make_server(
+        args.host, args.port, args.debug_dir, args.covers_dir, args.delay, args.verbose, args.seek_sheets
+    )
+    print(f"Serving fixtures at http://{args.host}:{server.server_port}/ja/<id>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,30 @@
 #!/usr/bin/env python3
 import argparse
+import gzip
+import hashlib
+import io
 import json
 import os
+import random
 import re
 import sqlite3
+import struct
 import sys
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
 from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from email.utils import formatdate
 from html import unescape
 from html.parser import HTMLParser
+from http.client import HTTPConnection, HTTPSConnection, RemoteDisconnected
+from queue import Empty, Queue
 from urllib.error import HTTPError
-from urllib.parse import urlparse
+from urllib.parse import urljoin, urlparse, urlsplit
 from urllib.request import Request, urlopen
 
 
@@ -19,7 +34,48 @@ USER_AGENT = (
     "Chrome/128.0.0.0 Safari/537.36"
 )
 
+DEFAULT_BASE_URL = "https://missav.ai/ja"
+
+# Bounded hand-off to the cover workers; the rest waits in cover_queue.
+COVER_QUEUE_SIZE = 64
+MAX_COVER_ATTEMPTS = 5
+
+# Failed article fetches are retried with exponential backoff and jitter.
+MAX_PAGE_ATTEMPTS = 6
+RETRY_BASE_DELAY = 30.0
+RETRY_MAX_DELAY = 6 * 3600.0
+# At the end of a run, wait for retries that are due within this window.
+RETRY_WAIT_LIMIT = 60.0
+RETRY_POLL_INTERVAL = 5.0
+# Statuses worth retrying: throttling and timeouts. 5xx is always retried;
+# any other 4xx (404/410 for an id the site does not have) fails at once.
+RETRYABLE_STATUS = {403, 408, 425, 429}
+
+# Pending ids are claimed from crawl_frontier in batches of this size.
+FRONTIER_BATCH = 200
+FRONTIER_SEED_PRIORITY = 10
+
+SECONDS_PER_SHEET = 72
+# Stream locations are stable per video; re-resolve only after this long.
+STREAM_METADATA_TTL = 30 * 86400
+REFRESH_KINDS = ("page", "cover")
+# Time before `refresh` first revisits a freshly downloaded page or cover.
+DEFAULT_MIN_AGE = 86400.0
+
+ARCHIVE_SEGMENT_BYTES = 256 * 1024 * 1024
+
+# Card-sized cover derivatives: widths for srcset, and Pillow save options.
+THUMB_WIDTHS = (240, 480)
+THUMB_FORMATS = {
+    "webp": ("WEBP", {"quality": 78, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
 REF_PATTERN = re.compile(r"https://fourhoi\.com/([^/\s\"'`<>]+)/cover-t\.jpg", re.IGNORECASE)
+HEAD_END_PATTERN = re.compile(r"</head\s*>", re.IGNORECASE)
+HEAD_SKIP_PATTERN = re.compile(r"<script\b.*?</script\s*>|<!--.*?-->", re.IGNORECASE | re.DOTALL)
+META_TAG_PATTERN = re.compile(r"""<meta\b((?:[^>"']|"[^"]*"|'[^']*')*)>""", re.IGNORECASE)
+META_ATTR_PATTERN = re.compile(r"""([^\s=/>"']+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>"']+)))?""")
 
 
 class MetaParser(HTMLParser):
@@ -55,20 +111,236 @@ def safe_id_for_filename(video_id):
     return safe or "unknown"
 
 
-def fetch_text(url, timeout=30):
+class HttpResponse:
+    def __init__(self, url, status, headers, body):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def text(self):
+        charset = self.headers.get_content_charset() or "utf-8"
+        return self.body.decode(charset, errors="replace")
+
+
+class HttpClient:
+    """Keep-alive HTTP(S) client shared by all crawl workers.
+
+    Idle connections are pooled per (scheme, host, port) and reused across
+    requests, so covers no longer pay a TLS handshake each. Concurrency is
+    capped per host and per kind ("page" or "cover") independently.
+    """
+
+    def __init__(self, page_concurrency=4, cover_concurrency=8, timeout=30):
+        self.timeout = timeout
+        self._limits = {"page": max(1, page_concurrency), "cover": max(1, cover_concurrency)}
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._semaphores = {}
+
+    def _semaphore(self, kind, host):
+        key = (kind, host)
+        with self._lock:
+            sem = self._semaphores.get(key)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self._limits.get(kind, 1))
+                self._semaphores[key] = sem
+            return sem
+
+    def _checkout(self, key, timeout):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        scheme, host, port = key
+        conn_cls = HTTPSConnection if scheme == "https" else HTTPConnection
+        return conn_cls(host, port, timeout=timeout), False
+
+    def _checkin(self, key, conn):
+        with self._lock:
+            self._idle.setdefault(key, []).append(conn)
+
+    def _send(self, url, headers, timeout):
+        parts = urlsplit(url)
+        scheme = (parts.scheme or "http").lower()
+        key = (scheme, parts.hostname or "", parts.port or (443 if scheme == "https" else 80))
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        while True:
+            conn, reused = self._checkout(key, timeout)
+            try:
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            except (RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                conn.close()
+                if reused:
+                    # The server dropped an idle keep-alive socket; retry fresh.
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._checkin(key, conn)
+            return resp, body
+
+    def request(self, url, kind="page", headers=None, timeout=None):
+        timeout = timeout or self.timeout
+        req_headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip"}
+        req_headers.update(headers or {})
+
+        for _ in range(5):
+            host = (urlsplit(url).hostname or "").lower()
+            with self._semaphore(kind, host):
+                resp, body = self._send(url, req_headers, timeout)
+            location = resp.headers.get("Location")
+            if resp.status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                continue
+            if resp.headers.get("Content-Encoding", "").lower() == "gzip":
+                body = gzip.decompress(body)
+            if resp.status >= 400:
+                raise HTTPError(url, resp.status, resp.reason, resp.headers, None)
+            return HttpResponse(url, resp.status, resp.headers, body)
+        raise HTTPError(url, 310, "Too many redirects", resp.headers, None)
+
+    def close(self):
+        with self._lock:
+            idle = self._idle
+            self._idle = {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+class HostRateLimiter:
+    """Adaptive token bucket per hostname.
+
+    Each host starts at `rate` requests/second and callers are given send
+    slots in arrival order (a token bucket with burst 1), so waiting
+    workers keep their BFS order. Throttling responses (429/403) halve the
+    rate and honour Retry-After; successes faster than `target_latency`
+    raise it additively up to `max_rate`, slow ones ease it down.
+    """
+
+    def __init__(self, rate=2.0, min_rate=0.1, max_rate=8.0, target_latency=5.0):
+        self.initial_rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max(rate, max_rate)
+        self.target_latency = target_latency
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = {"rate": self.initial_rate, "next_slot": 0.0, "ok": 0, "throttled": 0}
+            self._hosts[host] = state
+        return state
+
+    def acquire(self, host):
+        with self._lock:
+            state = self._state(host)
+            now = time.monotonic()
+            slot = max(now, state["next_slot"])
+            state["next_slot"] = slot + 1.0 / state["rate"]
+        if slot > now:
+            time.sleep(slot - now)
+
+    def record(self, host, latency, status=None, retry_after=None):
+        with self._lock:
+            state = self._state(host)
+            if status in (403, 429):
+                state["throttled"] += 1
+                state["rate"] = max(self.min_rate, state["rate"] / 2)
+                pause = retry_after if retry_after is not None else 1.0 / state["rate"]
+                state["next_slot"] = max(state["next_slot"], time.monotonic() + pause)
+                return
+            if status is None:
+                state["ok"] += 1
+            if latency > self.target_latency:
+                state["rate"] = max(self.min_rate, state["rate"] * 0.9)
+            elif status is None:
+                state["rate"] = min(self.max_rate, state["rate"] + 0.1)
+
+    def summary(self):
+        with self._lock:
+            return ", ".join(
+                f"{host}: {st['rate']:.2f}/s ok={st['ok']} throttled={st['throttled']}"
+                for host, st in sorted(self._hosts.items())
+            )
+
+
+def parse_retry_after(headers):
+    value = headers.get("Retry-After") if headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+@contextmanager
+def rate_limited(limiter, url):
+    if limiter is None:
+        yield
+        return
+    host = (urlparse(url).hostname or "").lower()
+    limiter.acquire(host)
+    started = time.monotonic()
+    try:
+        yield
+    except HTTPError as e:
+        limiter.record(host, time.monotonic() - started, status=e.code, retry_after=parse_retry_after(e.headers))
+        raise
+    except Exception:
+        limiter.record(host, time.monotonic() - started, status=0)
+        raise
+    limiter.record(host, time.monotonic() - started)
+
+
+def retry_delay(attempts):
+    # Exponential backoff with jitter in [0.5, 1.5) of the step.
+    step = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** max(0, attempts - 1)))
+    return step * (0.5 + random.random())
+
+
+def fetch_text(url, timeout=30, client=None):
+    return fetch_text_with_validators(url, timeout=timeout, client=client)[0]
+
+
+def fetch_text_with_validators(url, timeout=30, client=None):
+    # (text, etag, last_modified); the validators seed `refresh`.
+    if client is not None:
+        resp = client.request(url, kind="page", timeout=timeout)
+        return resp.text(), resp.headers.get("ETag"), resp.headers.get("Last-Modified")
     req = Request(url, headers={"User-Agent": USER_AGENT})
     with urlopen(req, timeout=timeout) as resp:
         content_type = resp.headers.get_content_charset() or "utf-8"
-        return resp.read().decode(content_type, errors="replace")
+        text = resp.read().decode(content_type, errors="replace")
+        return text, resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+
 
+def fetch_bytes(url, timeout=30, client=None):
+    return fetch_bytes_with_validators(url, timeout=timeout, client=client)[0]
 
-def fetch_bytes(url, timeout=30):
+
+def fetch_bytes_with_validators(url, timeout=30, client=None):
+    if client is not None:
+        resp = client.request(url, kind="cover", timeout=timeout)
+        return resp.body, resp.headers.get("ETag"), resp.headers.get("Last-Modified")
     req = Request(url, headers={"User-Agent": USER_AGENT})
     with urlopen(req, timeout=timeout) as resp:
-        return resp.read()
+        return resp.read(), resp.headers.get("ETag"), resp.headers.get("Last-Modified")
 
 
-def fetch_text_with_playwright(url, timeout_ms=45000):
+def load_playwright():
     try:
         from playwright.sync_api import sync_playwright
     except Exception as e:
@@ -83,6 +355,166 @@ def fetch_text_with_playwright(url, timeout_ms=45000):
         stealth_cls = Stealth
     except Exception:
         stealth_cls = None
+    return sync_playwright, stealth_cls
+
+
+def load_page_content(page, url, timeout_ms):
+    # Error statuses are raised as HTTPError, like the HTTP client does, so
+    # the rate limiter and retry classification see browser fetches too.
+    response = page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
+    status = response.status if response is not None else 200
+    if status >= 400 and status != 403:
+        raise HTTPError(url, status, response.status_text, response.headers, None)
+    try:
+        page.wait_for_load_state("networkidle", timeout=12000)
+    except Exception:
+        pass
+    content = page.content()
+    # A 403 is usually a challenge page that clears itself while loading;
+    # only one that is still there is throttling.
+    if status == 403 and "og:title" not in content:
+        raise HTTPError(url, 403, response.status_text, response.headers, None)
+    return content
+
+
+class BrowserSession:
+    def __init__(self, playwright, browser, context):
+        self.playwright = playwright
+        self.browser = browser
+        self.context = context
+        self.page = None
+        self.navigations = 0
+        self.crashed = False
+
+
+class BrowserPool:
+    """Reusable Playwright browsers that live for a whole crawl.
+
+    The sync API is bound to the thread that started it, so each worker
+    thread lazily launches its own Chromium and context once and keeps it
+    until close_thread(). Pages are recycled after max_navigations uses or
+    after a crash/failed navigation.
+    """
+
+    def __init__(self, max_navigations=50):
+        self.max_navigations = max(1, max_navigations)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.launches = 0
+        self.recycles = 0
+        self.timings = []
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is not None and not session.browser.is_connected():
+            self.close_thread()
+            session = None
+        if session is None:
+            sync_playwright, _ = load_playwright()
+            playwright = sync_playwright().start()
+            try:
+                browser = playwright.chromium.launch(
+                    headless=True,
+                    args=["--disable-blink-features=AutomationControlled"],
+                )
+                context = browser.new_context(user_agent=USER_AGENT)
+            except Exception:
+                playwright.stop()
+                raise
+            session = BrowserSession(playwright, browser, context)
+            self._local.session = session
+            with self._lock:
+                self.launches += 1
+            print(f"[INFO] Launched Chromium for {threading.current_thread().name}")
+        return session
+
+    def _new_page(self, session):
+        self._close_page(session)
+        _, stealth_cls = load_playwright()
+        page = session.context.new_page()
+        if stealth_cls:
+            stealth_cls().apply_stealth_sync(page)
+
+        def on_crash(_page):
+            session.crashed = True
+
+        page.on("crash", on_crash)
+        session.page = page
+        session.navigations = 0
+        session.crashed = False
+
+    def _close_page(self, session):
+        if session.page is None:
+            return
+        try:
+            session.page.close()
+        except Exception:
+            pass
+        session.page = None
+        with self._lock:
+            self.recycles += 1
+
+    @contextmanager
+    def page(self):
+        session = self._session()
+        if session.page is None or session.crashed or session.navigations >= self.max_navigations:
+            self._new_page(session)
+        session.navigations += 1
+        try:
+            yield session.page
+        except HTTPError:
+            # The site answered with an error status; the page itself is fine.
+            raise
+        except Exception:
+            self._close_page(session)
+            raise
+        if session.crashed:
+            self._close_page(session)
+
+    def fetch(self, url, timeout_ms=45000):
+        started = time.perf_counter()
+        ok = False
+        try:
+            with self.page() as page:
+                html = load_page_content(page, url, timeout_ms)
+            ok = True
+            return html
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.timings.append((url, elapsed, ok))
+            print(f"[INFO] Playwright fetch {'ok' if ok else 'failed'} in {elapsed:.2f}s: {url}")
+
+    def close_thread(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            return
+        self._local.session = None
+        for close in (session.context.close, session.browser.close, session.playwright.stop):
+            try:
+                close()
+            except Exception:
+                pass
+
+    def summary(self):
+        with self._lock:
+            durations = sorted(t for _, t, _ in self.timings)
+            failures = sum(1 for _, _, ok in self.timings if not ok)
+        if not durations:
+            return f"launches={self.launches}, fetches=0"
+        p50 = durations[len(durations) // 2]
+        return (
+            f"launches={self.launches}, page_recycles={self.recycles}, "
+            f"fetches={len(durations)}, failed={failures}, "
+            f"avg={sum(durations) / len(durations):.2f}s, p50={p50:.2f}s, max={durations[-1]:.2f}s"
+        )
+
+
+def fetch_text_with_playwright(url, timeout_ms=45000, pool=None):
+    if pool is not None:
+        return pool.fetch(url, timeout_ms=timeout_ms)
+
+    sync_playwright, stealth_cls = load_playwright()
 
     with sync_playwright() as p:
         browser = p.chromium.launch(
@@ -95,49 +527,84 @@ def fetch_text_with_playwright(url, timeout_ms=45000):
             stealth_cls().apply_stealth_sync(page)
 
         try:
-            page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
-            try:
-                page.wait_for_load_state("networkidle", timeout=12000)
-            except Exception:
-                pass
-            return page.content()
+            return load_page_content(page, url, timeout_ms)
         finally:
             browser.close()
 
 
-def fetch_page_html(url, fetch_mode):
+def is_protected_host(url):
+    hostname = (urlparse(url).hostname or "").lower()
+    return hostname == "missav.ai" or hostname.endswith(".missav.ai")
+
+
+def fetch_page_html(url, fetch_mode, pool=None, client=None):
+    """Fetch one article page; returns (html, etag, last_modified).
+
+    Browser fetches carry no validators, so both are None for them.
+    """
     if fetch_mode == "http":
-        return fetch_text(url)
+        return fetch_text_with_validators(url, client=client)
     if fetch_mode == "playwright":
-        return fetch_text_with_playwright(url)
+        return fetch_text_with_playwright(url, pool=pool), None, None
 
     # auto mode:
     # - missav.ai is always protected, so go Playwright directly
     # - for other domains, try HTTP first then fallback to Playwright
-    hostname = (urlparse(url).hostname or "").lower()
-    if hostname == "missav.ai" or hostname.endswith(".missav.ai"):
-        return fetch_text_with_playwright(url)
+    if is_protected_host(url):
+        return fetch_text_with_playwright(url, pool=pool), None, None
 
     try:
-        return fetch_text(url)
+        return fetch_text_with_validators(url, client=client)
     except HTTPError as e:
-        if e.code in (401, 403, 429):
+        # 429 is left to the rate limiter and retry queue; a browser retry
+        # would only hit the origin again immediately.
+        if e.code in (401, 403):
             print(f"[INFO] HTTP {e.code} for {url}, retrying with Playwright...")
-            return fetch_text_with_playwright(url)
+            return fetch_text_with_playwright(url, pool=pool), None, None
         raise
     except Exception:
         print(f"[INFO] HTTP fetch failed for {url}, retrying with Playwright...")
-        return fetch_text_with_playwright(url)
+        return fetch_text_with_playwright(url, pool=pool), None, None
 
 
-def parse_page(html):
-    parser = MetaParser()
-    parser.feed(html)
+def conditional_headers(etag, last_modified):
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
 
-    title = unescape(parser.meta.get("og:title", "")).strip()
-    description = unescape(parser.meta.get("og:description", "")).strip()
-    cover_url = unescape(parser.meta.get("og:image", "")).strip()
-    keywords_raw = unescape(parser.meta.get("keywords", "")).strip()
+
+def fetch_conditional(url, kind, etag=None, last_modified=None, fetch_mode="http", pool=None, client=None):
+    """Fetch `url` unless it is unchanged since the given validators.
+
+    Returns (status, content, etag, last_modified); content is text for
+    pages, bytes for covers and None on 304. Browser fetches cannot be made
+    conditional, so they always come back as 200 without validators and are
+    compared by content hash instead.
+    """
+    if kind == "page" and (fetch_mode == "playwright" or (fetch_mode == "auto" and is_protected_host(url))):
+        return 200, fetch_text_with_playwright(url, pool=pool), None, None
+
+    try:
+        resp = client.request(url, kind=kind, headers=conditional_headers(etag, last_modified))
+    except HTTPError as e:
+        if kind == "page" and fetch_mode == "auto" and e.code in (401, 403):
+            print(f"[INFO] HTTP {e.code} for {url}, retrying with Playwright...")
+            return 200, fetch_text_with_playwright(url, pool=pool), None, None
+        raise
+    if resp.status == 304:
+        return 304, None, resp.headers.get("ETag") or etag, resp.headers.get("Last-Modified") or last_modified
+    content = resp.text() if kind == "page" else resp.body
+    return resp.status, content, resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+
+
+def page_fields(meta, html):
+    title = unescape(meta.get("og:title", "")).strip()
+    description = unescape(meta.get("og:description", "")).strip()
+    cover_url = unescape(meta.get("og:image", "")).strip()
+    keywords_raw = unescape(meta.get("keywords", "")).strip()
 
     keywords = []
     if keywords_raw:
@@ -147,6 +614,45 @@ def parse_page(html):
     return title, description, cover_url, keywords, refs
 
 
+def extract_head_meta(html):
+    # Only <head> carries the og:/keywords meta tags, so stop at </head>
+    # instead of tokenising the whole document. Scripts and comments are
+    # dropped first, as HTMLParser would not see tags inside them either.
+    head_end = HEAD_END_PATTERN.search(html)
+    head = html[: head_end.start()] if head_end else html
+    head = HEAD_SKIP_PATTERN.sub("", head)
+
+    meta = {}
+    for tag in META_TAG_PATTERN.finditer(head):
+        attr_map = {}
+        for attr in META_ATTR_PATTERN.finditer(tag.group(1)):
+            value = attr.group(2)
+            if value is None:
+                value = attr.group(3) if attr.group(3) is not None else attr.group(4)
+            if value:
+                # HTMLParser unescapes attribute values; match it.
+                attr_map[attr.group(1).lower()] = unescape(value)
+        content = attr_map.get("content")
+        if not content:
+            continue
+        key = attr_map.get("property") or attr_map.get("name")
+        if key:
+            meta[key.lower()] = content
+    return meta
+
+
+def parse_page(html):
+    return page_fields(extract_head_meta(html), html)
+
+
+def parse_page_htmlparser(html):
+    # Full-document HTMLParser version; kept as the reference for parity
+    # checks (bench.py parse).
+    parser = MetaParser()
+    parser.feed(html)
+    return page_fields(parser.meta, html)
+
+
 def save_debug_html(base_dir, article_id, html):
     debug_dir = os.path.join(base_dir, "debug")
     os.makedirs(debug_dir, exist_ok=True)
@@ -157,6 +663,297 @@ def save_debug_html(base_dir, article_id, html):
     return path
 
 
+def load_zstd():
+    try:
+        import zstandard
+    except Exception:
+        return None
+    return zstandard
+
+
+class EncodedPage:
+    def __init__(self, content_hash, codec, blob, raw_size, fetched_at):
+        self.content_hash = content_hash
+        self.codec = codec
+        self.blob = blob
+        self.raw_size = raw_size
+        self.fetched_at = fetched_at
+
+
+class PageArchive:
+    """Append-only store of compressed raw pages, indexed in SQLite.
+
+    Records go into archive/pages-NNNNNN.seg segment files, rolled over at
+    `segment_bytes`. Each record is self-describing (header, article id,
+    payload) and is located through the page_archive table by article id
+    and fetch time. A page whose content hash matches the latest stored
+    copy is not written again. zstd is used when the `zstandard` package
+    is installed, gzip otherwise; the codec is stored per record.
+    """
+
+    MAGIC = b"MPA1"
+    HEADER = struct.Struct("<4sBHdI32s")
+    CODECS = {1: "gzip", 2: "zstd"}
+
+    def __init__(self, archive_dir, segment_bytes=ARCHIVE_SEGMENT_BYTES):
+        self.archive_dir = archive_dir
+        self.segment_bytes = segment_bytes
+        self._zstd = load_zstd()
+        self._segment = None
+        self._handle = None
+        self.written = 0
+        self.unchanged = 0
+        self.bytes_written = 0
+
+    def encode(self, html, fetched_at=None):
+        # CPU-heavy part; safe to call from worker threads.
+        raw = html.encode("utf-8")
+        content_hash = hashlib.sha256(raw).hexdigest()
+        if self._zstd is not None:
+            blob = self._zstd.ZstdCompressor(level=10).compress(raw)
+            codec = "zstd"
+        else:
+            blob = gzip.compress(raw, compresslevel=6)
+            codec = "gzip"
+        return EncodedPage(content_hash, codec, blob, len(raw), fetched_at or time.time())
+
+    def decode(self, codec, blob):
+        if codec == "zstd":
+            if self._zstd is None:
+                raise RuntimeError("zstandard is required to read zstd archive records: uv pip install zstandard")
+            return self._zstd.ZstdDecompressor().decompress(blob).decode("utf-8", errors="replace")
+        return gzip.decompress(blob).decode("utf-8", errors="replace")
+
+    def latest(self, conn, article_id):
+        return conn.execute(
+            """
+            SELECT fetched_at, content_hash, segment, offset, length, codec
+            FROM page_archive
+            WHERE article_id = ?
+            ORDER BY fetched_at DESC
+            LIMIT 1
+            """,
+            (article_id,),
+        ).fetchone()
+
+    def _open_segment(self, size):
+        if self._handle is not None and self._handle.tell() + size <= self.segment_bytes:
+            return
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        os.makedirs(self.archive_dir, exist_ok=True)
+        existing = sorted(n for n in os.listdir(self.archive_dir) if n.startswith("pages-") and n.endswith(".seg"))
+        name = existing[-1] if existing else "pages-000001.seg"
+        path = os.path.join(self.archive_dir, name)
+        if os.path.exists(path) and os.path.getsize(path) + size > self.segment_bytes:
+            number = int(name[len("pages-") : -len(".seg")]) + 1
+            name = f"pages-{number:06d}.seg"
+            path = os.path.join(self.archive_dir, name)
+        self._segment = name
+        self._handle = open(path, "ab")
+
+    def append(self, conn, article_id, page):
+        """Store `page` unless it is identical to the latest copy.
+
+        Returns True when a new record was written. The index row joins the
+        caller's transaction; bytes of a rolled-back record stay in the
+        segment unreferenced.
+        """
+        latest = self.latest(conn, article_id)
+        if latest and latest[1] == page.content_hash:
+            self.unchanged += 1
+            return False
+
+        id_bytes = article_id.encode("utf-8")
+        codec_id = next(k for k, v in self.CODECS.items() if v == page.codec)
+        header = self.HEADER.pack(
+            self.MAGIC, codec_id, len(id_bytes), page.fetched_at, len(page.blob), bytes.fromhex(page.content_hash)
+        )
+        record_size = len(header) + len(id_bytes) + len(page.blob)
+        self._open_segment(record_size)
+        offset = self._handle.tell() + len(header) + len(id_bytes)
+        self._handle.write(header + id_bytes + page.blob)
+        self._handle.flush()
+
+        conn.execute(
+            """
+            INSERT INTO page_archive
+                (article_id, fetched_at, content_hash, segment, offset, length, codec, raw_size)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                article_id,
+                page.fetched_at,
+                page.content_hash,
+                self._segment,
+                offset,
+                len(page.blob),
+                page.codec,
+                page.raw_size,
+            ),
+        )
+        self.written += 1
+        self.bytes_written += record_size
+        return True
+
+    def read_blob(self, segment, offset, length):
+        with open(os.path.join(self.archive_dir, segment), "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def read(self, conn, article_id):
+        row = self.latest(conn, article_id)
+        if not row:
+            return None
+        _, _, segment, offset, length, codec = row
+        return self.decode(codec, self.read_blob(segment, offset, length))
+
+    def iter_latest(self, conn):
+        """Yield (article_id, codec, blob) for the newest copy of every page."""
+        rows = conn.execute(
+            """
+            SELECT p.article_id, p.segment, p.offset, p.length, p.codec
+            FROM page_archive p
+            WHERE p.fetched_at = (
+                SELECT MAX(p2.fetched_at) FROM page_archive p2 WHERE p2.article_id = p.article_id
+            )
+            ORDER BY p.segment, p.offset
+            """
+        ).fetchall()
+        handles = {}
+        try:
+            for article_id, segment, offset, length, codec in rows:
+                handle = handles.get(segment)
+                if handle is None:
+                    handle = open(os.path.join(self.archive_dir, segment), "rb")
+                    handles[segment] = handle
+                handle.seek(offset)
+                yield article_id, codec, handle.read(length)
+        finally:
+            for handle in handles.values():
+                handle.close()
+
+    def summary(self):
+        return f"written={self.written}, unchanged={self.unchanged}, bytes={self.bytes_written}"
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+def get_archive_dir(base_dir):
+    return os.getenv("MISSAV_ARCHIVE_DIR", os.path.join(base_dir, "archive"))
+
+
+class SeekPack:
+    """All downloaded seek sheets of one video in a single <uuid>.pack file.
+
+    Sheets are appended as records (header, jpg bytes) in any order. On
+    close an index of (sheet, offset, length) and a trailer pointing at it
+    are written after the last record; reopening for append truncates that
+    index and writes a new one when done. A pack whose writer never closed
+    it has no trailer and is indexed by walking its records, ignoring a
+    torn last one, so an interrupted download resumes where it stopped.
+    An estimated last sheet the seek host does not have is stored as an
+    empty record, so reruns do not ask for it again.
+    """
+
+    MAGIC = b"MSK1"
+    RECORD = struct.Struct("<4sII")
+    ENTRY = struct.Struct("<III")
+    TRAILER = struct.Struct("<QI4s")
+    TRAILER_MAGIC = b"MSKI"
+
+    def __init__(self, path):
+        self.path = path
+        self.index = {}
+        self.data_end = 0
+        self._handle = None
+        self.written = 0
+        self.bytes_written = 0
+
+    @classmethod
+    def load(cls, path):
+        """The pack at `path` with its index read, or None if there is none."""
+        pack = cls(path)
+        try:
+            with open(path, "rb") as f:
+                pack._read_index(f)
+        except FileNotFoundError:
+            return None
+        return pack
+
+    def _read_index(self, f):
+        self.index = {}
+        size = f.seek(0, os.SEEK_END)
+        if size >= self.TRAILER.size:
+            f.seek(size - self.TRAILER.size)
+            index_offset, count, magic = self.TRAILER.unpack(f.read(self.TRAILER.size))
+            if magic == self.TRAILER_MAGIC and index_offset + count * self.ENTRY.size + self.TRAILER.size == size:
+                f.seek(index_offset)
+                entries = f.read(count * self.ENTRY.size)
+                for sheet, offset, length in self.ENTRY.iter_unpack(entries):
+                    self.index[sheet] = (offset, length)
+                self.data_end = index_offset
+                return
+        offset = 0
+        f.seek(0)
+        while offset + self.RECORD.size <= size:
+            magic, sheet, length = self.RECORD.unpack(f.read(self.RECORD.size))
+            end = offset + self.RECORD.size + length
+            if magic != self.MAGIC or end > size:
+                break
+            self.index[sheet] = (offset + self.RECORD.size, length)
+            offset = end
+            f.seek(offset)
+        self.data_end = offset
+
+    def __contains__(self, sheet):
+        return sheet in self.index
+
+    def read(self, sheet):
+        offset, length = self.index[sheet]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def open_append(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._handle = open(self.path, "r+b" if os.path.exists(self.path) else "w+b")
+        self._read_index(self._handle)
+        # Drops the old index and any torn record; sheet offsets stay put.
+        self._handle.truncate(self.data_end)
+        self._handle.seek(self.data_end)
+
+    def append(self, sheet, data):
+        if sheet in self.index:
+            return False
+        self._handle.write(self.RECORD.pack(self.MAGIC, sheet, len(data)) + data)
+        self.index[sheet] = (self.data_end + self.RECORD.size, len(data))
+        self.data_end += self.RECORD.size + len(data)
+        self.written += 1
+        self.bytes_written += len(data)
+        return True
+
+    def close(self):
+        if self._handle is None:
+            return
+        entries = b"".join(self.ENTRY.pack(sheet, *self.index[sheet]) for sheet in sorted(self.index))
+        self._handle.write(entries + self.TRAILER.pack(self.data_end, len(self.index), self.TRAILER_MAGIC))
+        self._handle.close()
+        self._handle = None
+
+
+def get_seeks_dir(base_dir):
+    return os.getenv("MISSAV_SEEKS_DIR", os.path.join(base_dir, "seeks"))
+
+
+def seek_pack_path(seeks_dir, uuid):
+    return os.path.join(seeks_dir, f"{uuid}.pack")
+
+
 def cover_filename(article_id):
     safe_id = safe_id_for_filename(article_id)
     return f"{safe_id}.jpg"
@@ -168,19 +965,140 @@ def cover_full_path(base_dir, article_id):
     return os.path.join(covers_dir, cover_filename(article_id))
 
 
-def download_cover_jpg(base_dir, article_id, cover_url):
-    if not cover_url:
-        return None
+def default_cover_url(article_id):
+    return f"https://fourhoi.com/{article_id}/cover-n.jpg"
+
+
+def seek_base_url(uuid):
+    # Seek sprites are {base}/_{n}.jpg, one 6x6 sheet per SECONDS_PER_SHEET.
+    return f"https://nineyu.com/{uuid}/seek"
+
+
+def snapshot_count(duration_seconds):
+    # Sheets start at _0.jpg, so a partial last sheet still counts.
+    return int(duration_seconds / SECONDS_PER_SHEET) + 1
 
+
+def format_duration(seconds):
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def save_cover_jpg(base_dir, article_id, cover_url, client=None, limiter=None):
+    """Download a missing cover; returns (filename, validators).
+
+    validators is (etag, last_modified, content_hash) of the download, or
+    None when the file was already on disk and nothing was fetched.
+    """
     full_path = cover_full_path(base_dir, article_id)
     if os.path.exists(full_path):
-        return cover_filename(article_id)
+        return cover_filename(article_id), None
 
+    with rate_limited(limiter, cover_url):
+        data, etag, last_modified = fetch_bytes_with_validators(cover_url, client=client)
+    write_cover_file(full_path, data)
+    return cover_filename(article_id), (etag, last_modified, hashlib.sha256(data).hexdigest())
+
+
+def write_cover_file(full_path, data):
+    # Write next to the target and rename, so readers never see a partial jpg.
+    # mkstemp names are unique across processes (app workers, thumbnail pool).
+    directory, name = os.path.split(full_path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".part")
     try:
-        data = fetch_bytes(cover_url)
-        with open(full_path, "wb") as f:
+        with os.fdopen(fd, "wb") as f:
             f.write(data)
-        return cover_filename(article_id)
+        # mkstemp creates 0600; covers may be served by another user (nginx).
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, full_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_pillow():
+    try:
+        from PIL import Image
+    except Exception:
+        return None
+    return Image
+
+
+def thumbnail_filename(filename, width, fmt):
+    stem = os.path.splitext(filename)[0]
+    return f"{stem}-{width}.{fmt}"
+
+
+def thumbnails_dir(covers_dir):
+    return os.path.join(covers_dir, "thumbs")
+
+
+def is_fresh_thumbnail(path, source_mtime):
+    try:
+        return os.path.getmtime(path) >= source_mtime
+    except OSError:
+        return False
+
+
+def thumbnail_draft_size(size, width):
+    # JPEG draft picks the smallest scale that keeps both sides at least
+    # this big, so ask for the proportional size of the widest thumbnail.
+    # Covers narrower than twice that width still decode at full size.
+    source_width, source_height = size
+    width = min(width, source_width)
+    return width, max(1, width * source_height // source_width)
+
+
+def make_thumbnails(covers_dir, filename, widths=THUMB_WIDTHS, formats=THUMB_FORMATS):
+    """Write the missing card-sized derivatives of covers/<filename>.
+
+    Each width is produced in every format under covers/thumbs/ as
+    {stem}-{width}.{fmt}; existing files are left alone unless the cover
+    was replaced after them. Returns the number of files written.
+    """
+    Image = load_pillow()
+    if Image is None:
+        raise RuntimeError("Pillow is required for thumbnails: uv pip install pillow")
+    out_dir = thumbnails_dir(covers_dir)
+    source_mtime = os.path.getmtime(os.path.join(covers_dir, filename))
+    missing = [
+        (width, fmt)
+        for width in widths
+        for fmt in formats
+        if not is_fresh_thumbnail(os.path.join(out_dir, thumbnail_filename(filename, width, fmt)), source_mtime)
+    ]
+    if not missing:
+        return 0
+
+    os.makedirs(out_dir, exist_ok=True)
+    with Image.open(os.path.join(covers_dir, filename)) as source:
+        # Let the JPEG decoder downscale by 1/2..1/8 first when it can.
+        source.draft("RGB", thumbnail_draft_size(source.size, max(widths)))
+        image = source.convert("RGB")
+    resized = {}
+    for width, fmt in missing:
+        if width not in resized:
+            w = min(width, image.width)
+            resized[width] = image.resize((w, max(1, round(image.height * w / image.width))), Image.LANCZOS)
+        pillow_format, options = formats[fmt]
+        buf = io.BytesIO()
+        resized[width].save(buf, pillow_format, **options)
+        write_cover_file(os.path.join(out_dir, thumbnail_filename(filename, width, fmt)), buf.getvalue())
+    return len(missing)
+
+
+def file_sha256(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def download_cover_jpg(base_dir, article_id, cover_url, client=None):
+    if not cover_url:
+        return None
+
+    try:
+        return save_cover_jpg(base_dir, article_id, cover_url, client=client)[0]
     except Exception as e:
         print(f"[WARN] Cover download failed for {article_id}: {e}")
         return None
@@ -198,7 +1116,12 @@ def connect_sqlite(db_path):
     return conn
 
 
-def ensure_schema(conn):
+def migrate_initial_schema(conn):
+    # Everything up to the introduction of schema_migrations. Written to be
+    # idempotent, since older code applied it piecemeal on every start.
+    has_search_index = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'"
+    ).fetchone()
     conn.executescript(
         """
         CREATE TABLE IF NOT EXISTS articles (
@@ -229,13 +1152,263 @@ def ensure_schema(conn):
 
         CREATE INDEX IF NOT EXISTS idx_article_tags_article ON article_tags(article_id);
         CREATE INDEX IF NOT EXISTS idx_article_tags_tag ON article_tags(tag_id);
+
+        CREATE TABLE IF NOT EXISTS cover_queue (
+            article_id TEXT PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE,
+            url TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            queued_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS crawl_frontier (
+            article_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL DEFAULT 'pending',
+            depth INTEGER NOT NULL DEFAULT 0,
+            priority INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            next_attempt_at REAL NOT NULL DEFAULT 0,
+            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_crawl_frontier_next
+            ON crawl_frontier(status, priority DESC, depth, next_attempt_at);
+
+        CREATE TABLE IF NOT EXISTS page_archive (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            article_id TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            content_hash TEXT NOT NULL,
+            segment TEXT NOT NULL,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            codec TEXT NOT NULL,
+            raw_size INTEGER
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_page_archive_article ON page_archive(article_id, fetched_at DESC);
+
+        CREATE TABLE IF NOT EXISTS fetch_state (
+            article_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            url TEXT NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            content_hash TEXT,
+            checked_at REAL NOT NULL,
+            changed_at REAL,
+            unchanged_count INTEGER NOT NULL DEFAULT 0,
+            next_check_at REAL NOT NULL DEFAULT 0,
+            last_error TEXT,
+            PRIMARY KEY (article_id, kind)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_fetch_state_next ON fetch_state(kind, next_check_at);
+
+        CREATE TABLE IF NOT EXISTS tag_counts (
+            tag_id INTEGER PRIMARY KEY REFERENCES tags(id) ON DELETE CASCADE,
+            articles INTEGER NOT NULL DEFAULT 0,
+            visible INTEGER NOT NULL DEFAULT 0
+        );
+
+        -- Search index for the web app. Trigram tokens match Japanese
+        -- titles and tags by substring, case-insensitively.
+        CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+            article_id, title, description, tags, tokenize = 'trigram'
+        );
         """
     )
+    # crawl_retry was folded into crawl_frontier; carry over pending retries.
+    has_retry_table = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'crawl_retry'"
+    ).fetchone()
+    if has_retry_table:
+        conn.execute(
+            """
+            INSERT INTO crawl_frontier (article_id, status, attempts, last_error, next_attempt_at)
+            SELECT article_id, 'pending', attempts, last_error, next_attempt_at FROM crawl_retry
+            ON CONFLICT (article_id) DO NOTHING
+            """
+        )
+        conn.execute("DROP TABLE crawl_retry")
+        conn.commit()
     cols = conn.execute("PRAGMA table_info(articles)").fetchall()
     col_names = {c[1] for c in cols}
     if "dislike" not in col_names:
         conn.execute("ALTER TABLE articles ADD COLUMN dislike INTEGER NOT NULL DEFAULT 0")
         conn.commit()
+    if "downloaded" not in col_names:
+        # Materialise what used to be recomputed per row by every query.
+        conn.execute("ALTER TABLE articles ADD COLUMN downloaded INTEGER NOT NULL DEFAULT 0")
+        conn.execute(
+            """
+            UPDATE articles
+            SET downloaded = 1
+            WHERE description IS NOT NULL
+               OR EXISTS (SELECT 1 FROM article_tags at WHERE at.article_id = articles.id)
+               OR (title IS NOT NULL AND title <> id)
+            """
+        )
+        rebuild_tag_counts(conn)
+        conn.commit()
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_downloaded ON articles(downloaded, dislike)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_listing ON articles(downloaded, id COLLATE NOCASE, id)")
+    if not has_search_index:
+        rebuild_search_index(conn)
+        conn.commit()
+
+
+def migrate_library_generation(conn):
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS library_generation (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            generation INTEGER NOT NULL
+        );
+
+        INSERT OR IGNORE INTO library_generation (id, generation) VALUES (1, 0);
+        """
+    )
+
+
+def migrate_stream_metadata(conn):
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS stream_metadata (
+            article_id VARCHAR(50) PRIMARY KEY,
+            uuid TEXT NOT NULL,
+            resolution TEXT,
+            m3u8_url TEXT NOT NULL,
+            duration_seconds INTEGER,
+            resolved_at REAL NOT NULL
+        );
+        """
+    )
+
+
+def migrate_stream_snapshot_count(conn):
+    cols = {row[1] for row in conn.execute("PRAGMA table_info(stream_metadata)").fetchall()}
+    if "snapshot_count" not in cols:
+        conn.execute("ALTER TABLE stream_metadata ADD COLUMN snapshot_count INTEGER")
+    conn.execute(
+        "UPDATE stream_metadata SET snapshot_count = duration_seconds / ? + 1 WHERE duration_seconds IS NOT NULL",
+        (SECONDS_PER_SHEET,),
+    )
+
+
+# Append-only: (version, name, function). Each runs once per DB, in order,
+# and is recorded in schema_migrations. Shared by the crawler and app.py.
+SCHEMA_MIGRATIONS = [
+    (1, "initial schema", migrate_initial_schema),
+    (2, "library generation counter", migrate_library_generation),
+    (3, "stream metadata", migrate_stream_metadata),
+    (4, "stream snapshot count", migrate_stream_snapshot_count),
+]
+SCHEMA_VERSION = SCHEMA_MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    try:
+        row = conn.execute("SELECT MAX(version) FROM schema_migrations").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] or 0
+
+
+def ensure_schema(conn):
+    """Apply pending SCHEMA_MIGRATIONS; a no-op single query when current."""
+    current = schema_version(conn)
+    if current >= SCHEMA_VERSION:
+        return
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    for version, name, migrate in SCHEMA_MIGRATIONS:
+        if version <= current:
+            continue
+        migrate(conn)
+        conn.execute("INSERT INTO schema_migrations (version, name) VALUES (?, ?)", (version, name))
+        conn.commit()
+        print(f"[INFO] Applied schema migration {version}: {name}")
+
+
+class ArticleStatusIndex:
+    """In-memory downloaded/placeholder/disliked/has-cover state for all ids.
+
+    Loaded once per crawl from one query over articles plus one directory
+    scan of covers/, then kept current by the coordinator as it writes, so
+    the BFS loop does no per-node SQLite round trips or stat() calls.
+    Dislikes toggled in the web app during a crawl are picked up next run.
+    """
+
+    COMPLETE = 1
+    DISLIKED = 2
+    HAS_COVER = 4
+
+    def __init__(self, covers_dir):
+        self.covers_dir = covers_dir
+        self.flags = {}
+        self.cover_files = set()
+
+    @classmethod
+    def load(cls, conn, base_dir):
+        index = cls(os.path.join(base_dir, "covers"))
+        rows = conn.execute(
+            """
+            SELECT id, downloaded, COALESCE(dislike, 0), cover IS NOT NULL
+            FROM articles
+            """
+        )
+        for article_id, complete, disliked, has_cover in rows:
+            index.flags[article_id] = (
+                (cls.COMPLETE if complete else 0)
+                | (cls.DISLIKED if disliked else 0)
+                | (cls.HAS_COVER if has_cover else 0)
+            )
+        if os.path.isdir(index.covers_dir):
+            with os.scandir(index.covers_dir) as entries:
+                index.cover_files = {e.name for e in entries if e.name.endswith(".jpg")}
+        return index
+
+    def __len__(self):
+        return len(self.flags)
+
+    def is_placeholder(self, article_id):
+        flags = self.flags.get(article_id)
+        return flags is not None and not flags & self.COMPLETE
+
+    def is_disliked(self, article_id):
+        return bool(self.flags.get(article_id, 0) & self.DISLIKED)
+
+    def has_cover_file(self, article_id):
+        return cover_filename(article_id) in self.cover_files
+
+    def is_downloaded(self, article_id):
+        # Same rule as is_article_downloaded: complete row and cover on disk.
+        return bool(self.flags.get(article_id, 0) & self.COMPLETE) and self.has_cover_file(article_id)
+
+    def mark_article(self, article_id, has_cover):
+        flags = self.flags.get(article_id, 0) & self.DISLIKED
+        self.flags[article_id] = flags | self.COMPLETE | (self.HAS_COVER if has_cover else 0)
+
+    def mark_placeholders(self, article_ids):
+        for article_id in article_ids:
+            self.flags.setdefault(article_id, 0)
+
+    def mark_cover(self, article_id):
+        self.cover_files.add(cover_filename(article_id))
+
+    def filter_refs(self, from_id, refs):
+        disliked = self.DISLIKED
+        flags = self.flags
+        return [r for r in refs if r != from_id and not flags.get(r, 0) & disliked]
 
 
 def is_article_downloaded(conn, article_id):
@@ -246,14 +1419,7 @@ def is_article_downloaded(conn, article_id):
         """
         SELECT 1
         FROM articles
-        WHERE id = ?
-          AND (
-            description IS NOT NULL
-            OR EXISTS (
-                SELECT 1 FROM article_tags at WHERE at.article_id = articles.id
-            )
-            OR (title IS NOT NULL AND title <> id)
-          )
+        WHERE id = ? AND downloaded = 1
         LIMIT 1
         """,
         (article_id,),
@@ -309,146 +1475,1788 @@ def pick_random_seed(conn):
     return None
 
 
-def upsert_article(conn, article_id, title, description, cover):
+def upsert_article(conn, article_id, title, description, cover, downloaded=None):
+    if downloaded is None:
+        downloaded = description is not None or bool(title and title != article_id)
     conn.execute(
         """
-        INSERT INTO articles (id, title, description, cover)
-        VALUES (?, ?, ?, ?)
+        INSERT INTO articles (id, title, description, cover, downloaded)
+        VALUES (?, ?, ?, ?, ?)
         ON CONFLICT (id) DO UPDATE
         SET title = excluded.title,
             description = excluded.description,
-            cover = excluded.cover
+            cover = excluded.cover,
+            downloaded = excluded.downloaded
         """,
-        (article_id, title, description, cover),
+        (article_id, title, description, cover, int(downloaded)),
     )
 
 
-def set_article_tags(conn, article_id, keywords):
+class TagIdCache:
+    """Process-wide tag name -> id map so tag writes skip the lookup query.
+
+    Call clear() after a rollback, since ids of tags inserted in the
+    rolled-back transaction are no longer valid.
+    """
+
+    def __init__(self):
+        self.ids = {}
+
+    def clear(self):
+        self.ids.clear()
+
+    def resolve(self, conn, names):
+        missing = [n for n in names if n not in self.ids]
+        if missing:
+            conn.executemany("INSERT OR IGNORE INTO tags (name) VALUES (?)", [(n,) for n in missing])
+            # Stay well below SQLite's bound-parameter limit.
+            for i in range(0, len(missing), 500):
+                chunk = missing[i : i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for tag_id, name in conn.execute(
+                    f"SELECT id, name FROM tags WHERE name IN ({placeholders})", chunk
+                ):
+                    self.ids[name] = tag_id
+        return [self.ids[n] for n in names if n in self.ids]
+
+
+def clean_keywords(keywords):
+    seen = set()
+    names = []
+    for kw in keywords or []:
+        tag_name = kw.strip()
+        if tag_name and tag_name not in seen:
+            seen.add(tag_name)
+            names.append(tag_name)
+    return names
+
+
+def set_article_tags(conn, article_id, keywords, tag_cache=None):
     conn.execute("DELETE FROM article_tags WHERE article_id = ?", (article_id,))
-    if not keywords:
+    names = clean_keywords(keywords)
+    if not names:
         return
 
-    for kw in keywords:
-        tag_name = kw.strip()
-        if not tag_name:
-            continue
-        conn.execute("INSERT OR IGNORE INTO tags (name) VALUES (?)", (tag_name,))
-        tag_row = conn.execute("SELECT id FROM tags WHERE name = ?", (tag_name,)).fetchone()
-        if tag_row:
-            conn.execute(
-                "INSERT OR IGNORE INTO article_tags (article_id, tag_id) VALUES (?, ?)",
-                (article_id, tag_row[0]),
-            )
+    tag_ids = (tag_cache or TagIdCache()).resolve(conn, names)
+    conn.executemany(
+        "INSERT OR IGNORE INTO article_tags (article_id, tag_id) VALUES (?, ?)",
+        [(article_id, tag_id) for tag_id in tag_ids],
+    )
 
 
 def insert_refs(conn, from_id, to_ids):
+    to_ids = [to_id for to_id in to_ids or [] if to_id != from_id]
     if not to_ids:
         return
-    for to_id in to_ids:
-        if to_id == from_id:
-            continue
-        conn.execute(
-            """
-            INSERT INTO articles (id, title, dislike)
-            VALUES (?, ?, 0)
-            ON CONFLICT (id) DO NOTHING
-            """,
-            (to_id, to_id),
-        )
-        conn.execute(
-            """
-            INSERT INTO article_refs (from_article_id, to_article_id)
-            VALUES (?, ?)
-            ON CONFLICT DO NOTHING
-            """,
-            (from_id, to_id),
-        )
+    conn.executemany(
+        """
+        INSERT INTO articles (id, title, dislike)
+        VALUES (?, ?, 0)
+        ON CONFLICT (id) DO NOTHING
+        """,
+        [(to_id, to_id) for to_id in to_ids],
+    )
+    conn.executemany(
+        """
+        INSERT INTO article_refs (from_article_id, to_article_id)
+        VALUES (?, ?)
+        ON CONFLICT DO NOTHING
+        """,
+        [(from_id, to_id) for to_id in to_ids],
+    )
 
 
-def crawl_single(seed_id, limit_count, debug_flag, fetch_mode):
-    base_dir = os.path.dirname(os.path.abspath(__file__))
+def fts_phrase(column, text):
+    return f'{column}:"{text.replace(chr(34), chr(34) * 2)}"'
+
+
+def index_article_text(conn, article_id, title, description, keywords):
+    # articles_fts has no usable key besides its rowid, so the old row is
+    # found through the trigram index on article_id (ids shorter than a
+    # trigram fall back to a scan) and then compared exactly.
+    if len(article_id) >= 3:
+        conn.execute(
+            "DELETE FROM articles_fts WHERE articles_fts MATCH ? AND article_id = ?",
+            (fts_phrase("article_id", article_id), article_id),
+        )
+    else:
+        conn.execute("DELETE FROM articles_fts WHERE article_id = ?", (article_id,))
+    conn.execute(
+        "INSERT INTO articles_fts (article_id, title, description, tags) VALUES (?, ?, ?, ?)",
+        (article_id, title, description or "", " ".join(clean_keywords(keywords))),
+    )
+
+
+def rebuild_search_index(conn):
+    conn.execute("DELETE FROM articles_fts")
+    cur = conn.execute(
+        """
+        INSERT INTO articles_fts (article_id, title, description, tags)
+        SELECT
+            a.id,
+            a.title,
+            COALESCE(a.description, ''),
+            COALESCE(
+                (
+                    SELECT group_concat(t.name, ' ')
+                    FROM article_tags at
+                    JOIN tags t ON t.id = at.tag_id
+                    WHERE at.article_id = a.id
+                ),
+                ''
+            )
+        FROM articles a
+        WHERE a.downloaded = 1
+        """
+    )
+    conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('optimize')")
+    return cur.rowcount
+
+
+def adjust_tag_counts(conn, article_id, delta, visible_delta):
+    # Applies one article's contribution to tag_counts for its current tags.
+    conn.execute(
+        """
+        INSERT INTO tag_counts (tag_id, articles, visible)
+        SELECT tag_id, ?, ? FROM article_tags WHERE article_id = ?
+        ON CONFLICT (tag_id) DO UPDATE
+        SET articles = articles + excluded.articles,
+            visible = visible + excluded.visible
+        """,
+        (delta, visible_delta, article_id),
+    )
+
+
+def rebuild_tag_counts(conn):
+    conn.execute("DELETE FROM tag_counts")
+    conn.execute(
+        """
+        INSERT INTO tag_counts (tag_id, articles, visible)
+        SELECT at.tag_id, COUNT(*), SUM(CASE WHEN COALESCE(a.dislike, 0) = 0 THEN 1 ELSE 0 END)
+        FROM article_tags at
+        JOIN articles a ON a.id = at.article_id
+        WHERE a.downloaded = 1
+        GROUP BY at.tag_id
+        """
+    )
+
+
+def bump_generation(conn):
+    # Any write that changes what the web app renders bumps this in the
+    # same transaction; app.py keys its response cache on it.
+    conn.execute("UPDATE library_generation SET generation = generation + 1 WHERE id = 1")
+
+
+def write_article(conn, article_id, title, description, cover, keywords, refs, tag_cache=None):
+    # tag_counts is kept incrementally: the article's old contribution is
+    # taken out before its tags are replaced and the new one added after.
+    row = conn.execute(
+        "SELECT downloaded, COALESCE(dislike, 0) FROM articles WHERE id = ?", (article_id,)
+    ).fetchone()
+    disliked = row[1] if row else 0
+    if row and row[0]:
+        adjust_tag_counts(conn, article_id, -1, -(1 - disliked))
+    names = clean_keywords(keywords)
+    downloaded = description is not None or bool(names) or bool(title and title != article_id)
+    upsert_article(conn, article_id, title, description, cover, downloaded)
+    set_article_tags(conn, article_id, names, tag_cache=tag_cache)
+    if downloaded:
+        adjust_tag_counts(conn, article_id, 1, 1 - disliked)
+    insert_refs(conn, article_id, refs)
+    index_article_text(conn, article_id, title, description, names)
+    bump_generation(conn)
+
+
+def save_stream_metadata(conn, article_id, uuid, resolution, m3u8_url, duration_seconds, resolved_at=None):
+    count = snapshot_count(duration_seconds) if duration_seconds is not None else None
+    conn.execute(
+        """
+        INSERT INTO stream_metadata
+            (article_id, uuid, resolution, m3u8_url, duration_seconds, snapshot_count, resolved_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (article_id) DO UPDATE SET
+            uuid = excluded.uuid,
+            resolution = excluded.resolution,
+            m3u8_url = excluded.m3u8_url,
+            duration_seconds = COALESCE(excluded.duration_seconds, stream_metadata.duration_seconds),
+            snapshot_count = COALESCE(excluded.snapshot_count, stream_metadata.snapshot_count),
+            resolved_at = excluded.resolved_at
+        """,
+        (article_id, uuid, resolution, m3u8_url, duration_seconds, count, resolved_at or time.time()),
+    )
+
+
+def load_stream_metadata(conn, article_id, max_age=STREAM_METADATA_TTL, now=None):
+    """The stored stream row for article_id as a dict, or None.
+
+    Rows resolved more than max_age seconds ago count as missing; pass
+    max_age=None to accept any age.
+    """
+    row = conn.execute(
+        """
+        SELECT uuid, resolution, m3u8_url, duration_seconds, snapshot_count, resolved_at
+        FROM stream_metadata
+        WHERE article_id = ?
+        """,
+        (article_id,),
+    ).fetchone()
+    if row is None:
+        return None
+    if max_age is not None and row[5] < (now or time.time()) - max_age:
+        return None
+    uuid, resolution, m3u8_url, duration_seconds, snapshots, resolved_at = row
+    return {
+        "uuid": uuid,
+        "resolution": resolution,
+        "m3u8_url": m3u8_url,
+        "seek_base": seek_base_url(uuid),
+        "duration": format_duration(duration_seconds) if duration_seconds is not None else None,
+        "duration_seconds": duration_seconds,
+        "snapshots": snapshots,
+        "resolved_at": resolved_at,
+    }
+
+
+class CommitBatcher:
+    """Groups many small writes into one transaction.
+
+    note() counts a finished unit of work and commits once `every` units
+    are pending or `interval` seconds have passed since the last commit.
+    """
+
+    def __init__(self, conn, every=1, interval=2.0):
+        self.conn = conn
+        self.every = max(1, every)
+        self.interval = interval
+        self.pending = 0
+        self.last_commit = time.monotonic()
+
+    def note(self, count=1):
+        self.pending += count
+        if self.pending >= self.every or time.monotonic() - self.last_commit >= self.interval:
+            self.commit()
+
+    def commit(self):
+        self.conn.commit()
+        self.pending = 0
+        self.last_commit = time.monotonic()
+
+
+@contextmanager
+def savepoint(conn, name="article"):
+    # Undo one article's writes without discarding the rest of the batch.
+    # An outermost SAVEPOINT would start its own transaction and RELEASE
+    # would commit it, so open the batch's transaction first.
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    conn.execute(f"SAVEPOINT {name}")
+    try:
+        yield
+    except Exception:
+        conn.execute(f"ROLLBACK TO {name}")
+        conn.execute(f"RELEASE {name}")
+        raise
+    conn.execute(f"RELEASE {name}")
+
+
+def enqueue_cover(conn, article_id, url):
+    conn.execute(
+        """
+        INSERT INTO cover_queue (article_id, url)
+        VALUES (?, ?)
+        ON CONFLICT (article_id) DO UPDATE SET url = excluded.url
+        """,
+        (article_id, url),
+    )
+
+
+def get_pending_covers(conn, max_attempts=MAX_COVER_ATTEMPTS):
+    rows = conn.execute(
+        "SELECT article_id, url FROM cover_queue WHERE attempts < ? ORDER BY queued_at",
+        (max_attempts,),
+    ).fetchall()
+    return [(r[0], r[1]) for r in rows]
+
+
+def finish_cover(conn, article_id, validators=None, min_age=DEFAULT_MIN_AGE):
+    # Record the download as the cover's first check, with its source URL
+    # and validators, so `refresh` revalidates it only after min_age.
+    row = conn.execute("SELECT url FROM cover_queue WHERE article_id = ?", (article_id,)).fetchone()
+    if row:
+        etag, last_modified, content_hash = validators or (None, None, None)
+        record_first_fetch(
+            conn, "cover", article_id, row[0], etag, last_modified, content_hash, time.time(), min_age
+        )
+    conn.execute("DELETE FROM cover_queue WHERE article_id = ?", (article_id,))
+    bump_generation(conn)
+
+
+def fail_cover(conn, article_id, error):
+    conn.execute(
+        "UPDATE cover_queue SET attempts = attempts + 1, last_error = ? WHERE article_id = ?",
+        (str(error)[:500], article_id),
+    )
+
+
+def queue_missing_covers(conn, status):
+    # Rows that planned a cover but have no file on disk (crawl interrupted
+    # before the queue existed, or the file was removed).
+    rows = conn.execute(
+        """
+        SELECT a.id, q.url
+        FROM articles a
+        LEFT JOIN cover_queue q ON q.article_id = a.id
+        WHERE a.cover IS NOT NULL
+        """
+    ).fetchall()
+    queued = 0
+    for article_id, url in rows:
+        if status.has_cover_file(article_id):
+            continue
+        conn.execute(
+            """
+            INSERT INTO cover_queue (article_id, url)
+            VALUES (?, ?)
+            ON CONFLICT (article_id) DO UPDATE SET attempts = 0, last_error = NULL
+            """,
+            (article_id, url or default_cover_url(article_id)),
+        )
+        queued += 1
+    conn.commit()
+    return queued
+
+
+# crawl_frontier status values
+FRONTIER_PENDING = "pending"
+FRONTIER_QUEUED = "queued"
+FRONTIER_DONE = "done"
+FRONTIER_FAILED = "failed"
+FRONTIER_SKIPPED = "skipped"
+
+
+def frontier_bootstrap(conn):
+    # One-off import of an existing library: downloaded rows are done,
+    # unresolved placeholders become the pending frontier.
+    if conn.execute("SELECT 1 FROM crawl_frontier LIMIT 1").fetchone():
+        return 0
+    cur = conn.execute(
+        f"""
+        INSERT INTO crawl_frontier (article_id, status, depth)
+        SELECT
+            id,
+            CASE
+                WHEN COALESCE(dislike, 0) <> 0 THEN '{FRONTIER_SKIPPED}'
+                WHEN downloaded = 1 THEN '{FRONTIER_DONE}'
+                ELSE '{FRONTIER_PENDING}'
+            END,
+            1
+        FROM articles
+        """
+    )
+    conn.commit()
+    return cur.rowcount
+
+
+def frontier_add_seed(conn, article_id, priority=FRONTIER_SEED_PRIORITY):
+    # An explicit seed jumps the queue, and gets another chance if it had
+    # been given up on. A seed that is already downloaded is not fetched
+    # again; what it links to is queued at its priority instead.
+    conn.execute(
+        f"""
+        INSERT INTO crawl_frontier (article_id, status, depth, priority)
+        VALUES (?, '{FRONTIER_PENDING}', 0, ?)
+        ON CONFLICT (article_id) DO UPDATE
+        SET status = CASE WHEN status = '{FRONTIER_DONE}' THEN status ELSE '{FRONTIER_PENDING}' END,
+            priority = MAX(priority, excluded.priority),
+            attempts = CASE WHEN status = '{FRONTIER_FAILED}' THEN 0 ELSE attempts END,
+            next_attempt_at = 0,
+            updated_at = CURRENT_TIMESTAMP
+        """,
+        (article_id, priority),
+    )
+    row = conn.execute("SELECT status FROM crawl_frontier WHERE article_id = ?", (article_id,)).fetchone()
+    if row[0] == FRONTIER_DONE:
+        return frontier_requeue_refs(conn, article_id, priority)
+    return 0
+
+
+def frontier_requeue_refs(conn, article_id, priority, limit=FRONTIER_BATCH):
+    """Queue the stored refs of a downloaded article at `priority`.
+
+    Walks breadth-first through refs that are downloaded too, until at
+    least `limit` ids are queued, so the crawl continues from the nearest
+    undownloaded neighbours. Returns the number of ids queued.
+    """
+    seen = {article_id}
+    level = [article_id]
+    depth = 0
+    queued = 0
+    while level and queued < limit:
+        depth += 1
+        refs = []
+        for from_id in level:
+            for ref in get_ref_ids(conn, from_id):
+                if ref not in seen:
+                    seen.add(ref)
+                    refs.append(ref)
+        statuses = {}
+        if refs:
+            placeholders = ", ".join("?" for _ in refs)
+            statuses = dict(
+                conn.execute(
+                    f"SELECT article_id, status FROM crawl_frontier WHERE article_id IN ({placeholders})", refs
+                ).fetchall()
+            )
+        wanted = [r for r in refs if statuses.get(r) in (None, FRONTIER_PENDING)]
+        frontier_push(conn, wanted, depth, priority)
+        queued += len(wanted)
+        level = [r for r in refs if statuses.get(r) == FRONTIER_DONE]
+    return queued
+
+
+def frontier_push(conn, article_ids, depth, priority=0):
+    # Pending ids reached from a higher-priority article take over its
+    # priority and their depth below it, so the crawl stays breadth-first
+    # from the seed that found them.
+    conn.executemany(
+        f"""
+        INSERT INTO crawl_frontier (article_id, depth, priority)
+        VALUES (?, ?, ?)
+        ON CONFLICT (article_id) DO UPDATE
+        SET depth = CASE WHEN excluded.priority > priority THEN excluded.depth ELSE MIN(depth, excluded.depth) END,
+            priority = MAX(priority, excluded.priority)
+        WHERE status = '{FRONTIER_PENDING}'
+        """,
+        [(article_id, depth, priority) for article_id in article_ids],
+    )
+
+
+def frontier_claim(conn, limit, now):
+    rows = conn.execute(
+        f"""
+        SELECT article_id, depth, priority
+        FROM crawl_frontier
+        WHERE status = '{FRONTIER_PENDING}' AND next_attempt_at <= ?
+        ORDER BY priority DESC, depth, next_attempt_at
+        LIMIT ?
+        """,
+        (now, limit),
+    ).fetchall()
+    conn.executemany(
+        f"UPDATE crawl_frontier SET status = '{FRONTIER_QUEUED}' WHERE article_id = ?",
+        [(r[0],) for r in rows],
+    )
+    return [(r[0], r[1], r[2]) for r in rows]
+
+
+def frontier_release(conn, article_ids=None):
+    # Hand claimed-but-unfinished ids back, e.g. after an interrupted run.
+    if article_ids is None:
+        conn.execute(
+            f"UPDATE crawl_frontier SET status = '{FRONTIER_PENDING}' WHERE status = '{FRONTIER_QUEUED}'"
+        )
+        return
+    conn.executemany(
+        f"""
+        UPDATE crawl_frontier SET status = '{FRONTIER_PENDING}'
+        WHERE article_id = ? AND status = '{FRONTIER_QUEUED}'
+        """,
+        [(article_id,) for article_id in article_ids],
+    )
+
+
+def frontier_mark(conn, article_id, status):
+    conn.execute(
+        """
+        UPDATE crawl_frontier
+        SET status = ?, last_error = NULL, updated_at = CURRENT_TIMESTAMP
+        WHERE article_id = ?
+        """,
+        (status, article_id),
+    )
+
+
+def is_retryable_error(error):
+    if isinstance(error, HTTPError):
+        return error.code >= 500 or error.code in RETRYABLE_STATUS
+    # Network errors, timeouts and browser failures.
+    return True
+
+
+def frontier_fail(conn, article_id, error, max_attempts=MAX_PAGE_ATTEMPTS):
+    # Returns the retry delay, or None when the id is given up on.
+    row = conn.execute("SELECT attempts FROM crawl_frontier WHERE article_id = ?", (article_id,)).fetchone()
+    attempts = (row[0] if row else 0) + 1
+    delay = retry_delay(attempts)
+    give_up = attempts >= max_attempts or not is_retryable_error(error)
+    status = FRONTIER_FAILED if give_up else FRONTIER_PENDING
+    conn.execute(
+        """
+        UPDATE crawl_frontier
+        SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE article_id = ?
+        """,
+        (status, attempts, time.time() + delay, str(error)[:500], article_id),
+    )
+    if status == FRONTIER_FAILED:
+        return None
+    return delay
+
+
+def frontier_next_due(conn):
+    row = conn.execute(
+        f"SELECT MIN(next_attempt_at) FROM crawl_frontier WHERE status = '{FRONTIER_PENDING}'"
+    ).fetchone()
+    return row[0] if row else None
+
+
+def frontier_counts(conn):
+    rows = conn.execute("SELECT status, COUNT(*) FROM crawl_frontier GROUP BY status").fetchall()
+    return {r[0]: r[1] for r in rows}
+
+
+def article_url(article_id, base_url=DEFAULT_BASE_URL):
+    return f"{base_url.rstrip('/')}/{article_id}"
+
+
+def fetch_article(article_id, fetch_mode, pool=None, client=None, base_url=DEFAULT_BASE_URL, limiter=None):
+    url = article_url(article_id, base_url)
+    with rate_limited(limiter, url):
+        print(f"[INFO] Fetching {url}")
+        html, etag, last_modified = fetch_page_html(url, fetch_mode=fetch_mode, pool=pool, client=client)
+    return html, parse_page(html), (url, etag, last_modified)
+
+
+def crawl_worker(tasks, results, fetch_mode, pool, client, base_url, limiter, archive):
+    # Workers only touch the network. All SQLite access stays on the
+    # coordinator thread, which is the single DB writer.
+    try:
+        while True:
+            article_id = tasks.get()
+            if article_id is None:
+                return
+            try:
+                html, parsed, source = fetch_article(
+                    article_id, fetch_mode, pool=pool, client=client, base_url=base_url, limiter=limiter
+                )
+                # Compress and hash here, off the writer thread.
+                encoded = archive.encode(html) if archive is not None else None
+                content_hash = encoded.content_hash if encoded else hashlib.sha256(html.encode("utf-8")).hexdigest()
+                results.put(("page", article_id, (html, parsed, encoded, source, content_hash), None))
+            except Exception as e:
+                results.put(("page", article_id, None, e))
+    finally:
+        pool.close_thread()
+
+
+def cover_worker(tasks, results, base_dir, client, limiter, thumbnails=False):
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        article_id, cover_url = task
+        try:
+            result = save_cover_jpg(base_dir, article_id, cover_url, client=client, limiter=limiter)
+        except Exception as e:
+            results.put(("cover", article_id, None, e))
+            continue
+        if thumbnails:
+            try:
+                make_thumbnails(os.path.join(base_dir, "covers"), result[0])
+            except Exception as e:
+                print(f"[WARN] Thumbnails failed for {result[0]}: {e}")
+        results.put(("cover", article_id, result, None))
+
+
+def start_workers(target, count, name, args):
+    workers = [
+        threading.Thread(target=target, args=args, name=f"{name}-{i + 1}", daemon=True)
+        for i in range(count)
+    ]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def stop_workers(tasks, workers):
+    # Drop tasks that never started (after an interrupt); pending covers
+    # are still recorded in cover_queue and resume on the next run.
+    while True:
+        try:
+            tasks.get_nowait()
+        except Empty:
+            break
+    for _ in workers:
+        tasks.put(None)
+    for worker in workers:
+        worker.join()
+
+
+def crawl_single(
+    seed_id,
+    limit_count,
+    debug_flag,
+    fetch_mode,
+    threads=1,
+    recycle_after=50,
+    base_url=DEFAULT_BASE_URL,
+    page_concurrency=4,
+    cover_concurrency=8,
+    cover_threads=4,
+    covers_only=False,
+    rate=2.0,
+    max_rate=8.0,
+    max_attempts=MAX_PAGE_ATTEMPTS,
+    commit_every=20,
+    commit_interval=2.0,
+    archive_pages=True,
+    thumbnails=True,
+    min_age=DEFAULT_MIN_AGE,
+):
+    base_dir = os.path.dirname(os.path.abspath(__file__))
     db_path = get_sqlite_db_path(base_dir)
+    archive = PageArchive(get_archive_dir(base_dir)) if archive_pages and not covers_only else None
+    if thumbnails and load_pillow() is None:
+        print("[WARN] Pillow is not installed; skipping cover thumbnails (uv pip install pillow)")
+        thumbnails = False
+    threads = max(1, threads)
+    pool = BrowserPool(max_navigations=recycle_after)
+    client = HttpClient(page_concurrency=page_concurrency, cover_concurrency=cover_concurrency)
+    limiter = HostRateLimiter(rate=rate, max_rate=max_rate)
+
+    # Page and cover downloads have separate task queues and worker pools,
+    # so a slow cover never holds up the next page fetch.
+    results = Queue()
+    page_tasks = Queue()
+    cover_tasks = Queue(maxsize=COVER_QUEUE_SIZE)
+    page_workers = []
+    if not covers_only:
+        page_workers = start_workers(
+            crawl_worker,
+            threads,
+            "crawl-worker",
+            (page_tasks, results, fetch_mode, pool, client, base_url, limiter, archive),
+        )
+    cover_workers = start_workers(
+        cover_worker,
+        max(1, cover_threads),
+        "cover-worker",
+        (cover_tasks, results, base_dir, client, limiter, thumbnails),
+    )
 
     with connect_sqlite(db_path) as conn:
         ensure_schema(conn)
         print(f"[INFO] SQLite DB: {db_path}")
+        status = ArticleStatusIndex.load(conn, base_dir)
+        print(f"[INFO] Status index: {len(status)} article(s), {len(status.cover_files)} cover file(s)")
+        if covers_only:
+            print(f"[INFO] Cover threads: {max(1, cover_threads)}")
+            print(f"[INFO] Queued {queue_missing_covers(conn, status)} missing cover(s)")
+        else:
+            print(f"[INFO] Threads: {threads}, cover threads: {max(1, cover_threads)}")
+            frontier_release(conn)
+            imported = frontier_bootstrap(conn)
+            if imported:
+                print(f"[INFO] Imported {imported} existing article(s) into the crawl frontier")
+            if seed_id:
+                requeued = frontier_add_seed(conn, seed_id)
+                if requeued:
+                    print(f"[INFO] {seed_id} is already downloaded; queued {requeued} id(s) it links to")
+            conn.commit()
+            counts = frontier_counts(conn)
+            print(
+                f"[INFO] Frontier: pending={counts.get(FRONTIER_PENDING, 0)}, "
+                f"done={counts.get(FRONTIER_DONE, 0)}, failed={counts.get(FRONTIER_FAILED, 0)}"
+            )
 
-        queue = deque([seed_id])
-        discovered = {seed_id}
+        pending_covers = deque(get_pending_covers(conn))
+        if pending_covers and not covers_only:
+            print(f"[INFO] Resuming {len(pending_covers)} pending cover download(s)")
+        covers_queued = {article_id for article_id, _ in pending_covers}
+        tag_cache = TagIdCache()
+        batcher = CommitBatcher(conn, every=commit_every, interval=commit_interval)
+
+        # In-memory window over crawl_frontier; the table is the source of
+        # truth and is refilled in priority/depth order as the window drains.
+        queue = deque()
+        depths = {}
+        frontier_dirty = not covers_only
+        refill_at = 0.0
         downloaded = 0
         skip_downloaded = 0
+        covers_saved = 0
+        pages_in_flight = set()
+        covers_in_flight = 0
 
-        while queue and downloaded < limit_count:
-            article_id = queue.popleft()
+        try:
+            while True:
+                if (
+                    not covers_only
+                    and len(queue) < threads
+                    and (frontier_dirty or time.time() >= refill_at)
+                    and downloaded + len(pages_in_flight) < limit_count
+                ):
+                    claimed = frontier_claim(conn, FRONTIER_BATCH, time.time())
+                    batcher.note(0)
+                    for article_id, depth, priority in claimed:
+                        depths[article_id] = (depth, priority)
+                        queue.append(article_id)
+                    frontier_dirty = len(claimed) == FRONTIER_BATCH
+                    refill_at = time.time() + RETRY_POLL_INTERVAL
+
+                # Only hand out as many pages as can still count towards
+                # --count, so the limit holds exactly across workers.
+                while queue and len(pages_in_flight) < threads and downloaded + len(pages_in_flight) < limit_count:
+                    article_id = queue.popleft()
+
+                    if status.is_disliked(article_id):
+                        frontier_mark(conn, article_id, FRONTIER_SKIPPED)
+                        batcher.note(0)
+                        print(f"[SKIP] Disliked: {article_id}")
+                        continue
+
+                    if status.is_downloaded(article_id):
+                        skip_downloaded += 1
+                        frontier_mark(conn, article_id, FRONTIER_DONE)
+                        batcher.note(0)
+                        print(f"[SKIP] Already downloaded: {article_id}")
+                        continue
+
+                    page_tasks.put(article_id)
+                    pages_in_flight.add(article_id)
+
+                while pending_covers and not cover_tasks.full():
+                    cover_tasks.put(pending_covers.popleft())
+                    covers_in_flight += 1
+
+                if not pages_in_flight and not covers_in_flight:
+                    if queue or covers_only or downloaded >= limit_count:
+                        break
+                    if frontier_dirty:
+                        continue
+                    next_at = frontier_next_due(conn)
+                    if next_at is None or next_at - time.time() > RETRY_WAIT_LIMIT:
+                        break
+                    batcher.commit()
+                    print(f"[INFO] Waiting {max(0.0, next_at - time.time()):.0f}s for due retries")
+                    time.sleep(max(0.0, next_at - time.time()))
+                    refill_at = 0.0
+                    continue
+
+                try:
+                    kind, article_id, result, error = results.get(timeout=RETRY_POLL_INTERVAL)
+                except Empty:
+                    batcher.note(0)
+                    continue
+
+                if kind == "cover":
+                    covers_in_flight -= 1
+                    covers_queued.discard(article_id)
+                    if error is not None:
+                        print(f"[WARN] Cover download failed for {article_id}: {error}")
+                        fail_cover(conn, article_id, error)
+                    else:
+                        filename, validators = result
+                        covers_saved += 1
+                        status.mark_cover(article_id)
+                        print(f"[INFO] Cover saved: {filename}")
+                        finish_cover(conn, article_id, validators, min_age)
+                    batcher.note()
+                    continue
+
+                pages_in_flight.discard(article_id)
+                depth, priority = depths.pop(article_id, (0, 0))
+                if error is not None:
+                    delay = frontier_fail(conn, article_id, error, max_attempts)
+                    batcher.note()
+                    if delay is None:
+                        print(f"[WARN] Failed {article_id}: {error} (giving up)")
+                    else:
+                        print(f"[WARN] Failed {article_id}: {error} (retry in {delay:.0f}s)")
+                    continue
+
+                try:
+                    html, (title, description, cover_url, keywords, refs), encoded, source, content_hash = result
+
+                    if debug_flag:
+                        debug_path = save_debug_html(base_dir, article_id, html)
+                        print(f"[DEBUG] Saved HTML: {debug_path}")
+
+                    if not title:
+                        title = article_id
+
+                    # 1) Write DB first, recording the cover as pending in
+                    #    the same transaction so it survives an interrupt.
+                    #    Commits are grouped by the batcher; a savepoint
+                    #    keeps a failure from undoing the rest of the batch.
+                    planned_cover = cover_filename(article_id) if cover_url else None
+                    new_refs = status.filter_refs(article_id, refs)
+                    need_cover = False
+                    with savepoint(conn):
+                        write_article(
+                            conn, article_id, title, description, planned_cover, keywords, refs, tag_cache
+                        )
+                        if encoded is not None:
+                            archive.append(conn, article_id, encoded)
+                        # source is (url, etag, last_modified) of the fetch.
+                        record_first_fetch(conn, "page", article_id, *source, content_hash, time.time(), min_age)
+                        frontier_push(conn, new_refs, depth + 1, priority)
+                        frontier_mark(conn, article_id, FRONTIER_DONE)
+                        if cover_url:
+                            if status.has_cover_file(article_id):
+                                print(f"[SKIP] Cover exists: {cover_filename(article_id)}")
+                            elif article_id not in covers_queued:
+                                enqueue_cover(conn, article_id, cover_url)
+                                need_cover = True
+                    batcher.note()
+                    status.mark_article(article_id, has_cover=bool(cover_url))
+                    status.mark_placeholders(new_refs)
+                    frontier_dirty = frontier_dirty or bool(new_refs)
+                    if new_refs and any(depths[q][1] < priority for q in queue):
+                        # The window was claimed before these refs existed;
+                        # give it back so they are fetched first.
+                        frontier_release(conn, queue)
+                        for queued_id in queue:
+                            depths.pop(queued_id, None)
+                        queue.clear()
+
+                    # 2) Then hand the cover to the background cover workers
+                    if need_cover:
+                        covers_queued.add(article_id)
+                        pending_covers.append((article_id, cover_url))
+
+                    downloaded += 1
+                    print(
+                        f"[INFO] Saved article={article_id}, refs={len(refs)}, "
+                        f"progress={downloaded}/{limit_count}"
+                    )
+                except Exception as e:
+                    tag_cache.clear()
+                    frontier_fail(conn, article_id, e, max_attempts)
+                    batcher.note()
+                    print(f"[WARN] Failed {article_id}: {e}")
+        finally:
+            stop_workers(page_tasks, page_workers)
+            stop_workers(cover_tasks, cover_workers)
+            client.close()
+            if not covers_only:
+                frontier_release(conn)
+            batcher.commit()
+            if archive is not None:
+                archive.close()
+
+        print(
+            f"[DONE] Downloaded {downloaded} article(s), skipped {skip_downloaded} already-downloaded, "
+            f"saved {covers_saved} cover(s)."
+        )
+        if pool.timings:
+            print(f"[INFO] Browser pool: {pool.summary()}")
+        if archive is not None and (archive.written or archive.unchanged):
+            print(f"[INFO] Page archive: {archive.summary()}")
+        rates = limiter.summary()
+        if rates:
+            print(f"[INFO] Host rates: {rates}")
+
+
+class RefreshOutcome:
+    def __init__(self, kind, article_id, url, etag, last_modified):
+        self.kind = kind
+        self.article_id = article_id
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.state = "not_modified"
+        self.content_hash = None
+        self.size = 0
+        self.parsed = None
+        self.encoded = None
+
+
+def revisit_interval(unchanged_count, min_age, max_age):
+    # Back off exponentially while a resource keeps coming back unchanged;
+    # any change resets it to min_age. Jitter spreads revisits of a library
+    # crawled in one go.
+    step = min(max_age, min_age * (2 ** min(unchanged_count, 30)))
+    return step * (0.75 + random.random() * 0.5)
+
+
+def refresh_due(conn, kind, now, limit):
+    # Articles never revisited have no fetch_state row and count as due.
+    cover_filter = "AND a.cover IS NOT NULL" if kind == "cover" else ""
+    return conn.execute(
+        f"""
+        SELECT a.id, s.url, s.etag, s.last_modified, s.content_hash
+        FROM articles a
+        LEFT JOIN fetch_state s ON s.article_id = a.id AND s.kind = ?
+        WHERE a.downloaded = 1
+          AND COALESCE(a.dislike, 0) = 0
+          {cover_filter}
+          AND COALESCE(s.next_check_at, 0) <= ?
+        ORDER BY COALESCE(s.next_check_at, 0), a.id
+        LIMIT ?
+        """,
+        (kind, now, limit),
+    ).fetchall()
 
-            if is_article_disliked(conn, article_id):
-                print(f"[SKIP] Disliked: {article_id}")
-                continue
 
-            if is_article_downloaded(conn, article_id):
-                skip_downloaded += 1
-                refs_from_db = get_ref_ids(conn, article_id)
-                for ref_id in refs_from_db:
-                    if ref_id not in discovered:
-                        discovered.add(ref_id)
-                        queue.append(ref_id)
-                print(f"[SKIP] Already downloaded: {article_id}")
-                continue
+def record_fetch_state(conn, outcome, now, min_age, max_age):
+    row = conn.execute(
+        "SELECT unchanged_count FROM fetch_state WHERE article_id = ? AND kind = ?",
+        (outcome.article_id, outcome.kind),
+    ).fetchone()
+    changed = outcome.state == "changed"
+    unchanged_count = 0 if changed else (row[0] + 1 if row else 1)
+    next_check_at = now + revisit_interval(unchanged_count, min_age, max_age)
+    conn.execute(
+        """
+        INSERT INTO fetch_state (
+            article_id, kind, url, etag, last_modified, content_hash,
+            checked_at, changed_at, unchanged_count, next_check_at, last_error
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL)
+        ON CONFLICT (article_id, kind) DO UPDATE
+        SET url = excluded.url,
+            etag = excluded.etag,
+            last_modified = excluded.last_modified,
+            content_hash = excluded.content_hash,
+            checked_at = excluded.checked_at,
+            changed_at = COALESCE(excluded.changed_at, changed_at),
+            unchanged_count = excluded.unchanged_count,
+            next_check_at = excluded.next_check_at,
+            last_error = NULL
+        """,
+        (
+            outcome.article_id,
+            outcome.kind,
+            outcome.url,
+            outcome.etag,
+            outcome.last_modified,
+            outcome.content_hash,
+            now,
+            now if changed else None,
+            unchanged_count,
+            next_check_at,
+        ),
+    )
+
+
+def record_first_fetch(conn, kind, article_id, url, etag, last_modified, content_hash, now, min_age):
+    # A first download counts as a change: it is revisited after min_age,
+    # conditionally on the validators it came with.
+    outcome = RefreshOutcome(kind, article_id, url, etag, last_modified)
+    outcome.state = "changed"
+    outcome.content_hash = content_hash
+    record_fetch_state(conn, outcome, now, min_age, min_age)
+
+
+def record_fetch_failure(conn, kind, article_id, url, error, now, min_age):
+    conn.execute(
+        """
+        INSERT INTO fetch_state (article_id, kind, url, checked_at, next_check_at, last_error)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (article_id, kind) DO UPDATE
+        SET checked_at = excluded.checked_at,
+            next_check_at = excluded.next_check_at,
+            last_error = excluded.last_error
+        """,
+        (article_id, kind, url, now, now + min_age, str(error)[:500]),
+    )
+
+
+def update_cover_url(conn, article_id, cover_url, now):
+    # A page that now points at a different cover gets it re-checked at once.
+    conn.execute(
+        """
+        INSERT INTO fetch_state (article_id, kind, url, checked_at)
+        VALUES (?, 'cover', ?, ?)
+        ON CONFLICT (article_id, kind) DO UPDATE
+        SET url = excluded.url, etag = NULL, last_modified = NULL, next_check_at = 0
+        WHERE fetch_state.url <> excluded.url
+        """,
+        (article_id, cover_url, now),
+    )
+
+
+def refresh_resource(task, base_dir, fetch_mode, pool, client, limiter, archive):
+    kind, article_id, url, etag, last_modified, old_hash = task
+    cover_path = cover_full_path(base_dir, article_id) if kind == "cover" else None
+    if kind == "cover":
+        # Before the first revisit the file on disk stands in for the last
+        # copy: its mtime is a valid If-Modified-Since and its hash a
+        # baseline for servers that ignore validators.
+        old_hash = old_hash or file_sha256(cover_path)
+        if not etag and not last_modified and old_hash:
+            last_modified = formatdate(os.path.getmtime(cover_path), usegmt=True)
+
+    with rate_limited(limiter, url):
+        print(f"[INFO] Revalidating {kind} {url}")
+        status, content, etag, last_modified = fetch_conditional(
+            url, kind, etag, last_modified, fetch_mode=fetch_mode, pool=pool, client=client
+        )
+
+    outcome = RefreshOutcome(kind, article_id, url, etag, last_modified)
+    if status == 304:
+        outcome.content_hash = old_hash
+        return outcome
+
+    data = content.encode("utf-8") if kind == "page" else content
+    outcome.size = len(data)
+    outcome.content_hash = hashlib.sha256(data).hexdigest()
+    if outcome.content_hash == old_hash:
+        outcome.state = "unchanged"
+        return outcome
 
+    outcome.state = "changed"
+    if kind == "page":
+        outcome.parsed = parse_page(content)
+        outcome.encoded = archive.encode(content) if archive is not None else None
+    else:
+        write_cover_file(cover_path, content)
+    return outcome
+
+
+def refresh_worker(tasks, results, base_dir, fetch_mode, pool, client, limiter, archive):
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            kind, article_id = task[0], task[1]
             try:
-                url = f"https://missav.ai/ja/{article_id}"
-                print(f"[INFO] Fetching {url}")
-                html = fetch_page_html(url, fetch_mode=fetch_mode)
-
-                if debug_flag:
-                    debug_path = save_debug_html(base_dir, article_id, html)
-                    print(f"[DEBUG] Saved HTML: {debug_path}")
-
-                title, description, cover_url, keywords, refs = parse_page(html)
-                if not title:
-                    title = article_id
-
-                # 1) Write DB first
-                planned_cover = cover_filename(article_id) if cover_url else None
-                upsert_article(conn, article_id, title, description, planned_cover)
-                set_article_tags(conn, article_id, keywords)
-                insert_refs(conn, article_id, refs)
-                conn.commit()
-
-                # 2) Then download cover if not already downloaded
-                if cover_url:
-                    cover_path = cover_full_path(base_dir, article_id)
-                    if os.path.exists(cover_path):
-                        print(f"[SKIP] Cover exists: {cover_path}")
-                    else:
-                        saved_cover = download_cover_jpg(base_dir, article_id, cover_url)
-                        if saved_cover:
-                            print(f"[INFO] Cover saved: {saved_cover}")
-
-                for ref_id in refs:
-                    if ref_id not in discovered and not is_article_disliked(conn, ref_id):
-                        discovered.add(ref_id)
-                        queue.append(ref_id)
-
-                downloaded += 1
-                print(
-                    f"[INFO] Saved article={article_id}, refs={len(refs)}, "
-                    f"progress={downloaded}/{limit_count}"
-                )
+                outcome = refresh_resource(task, base_dir, fetch_mode, pool, client, limiter, archive)
+                results.put((kind, article_id, outcome, None))
             except Exception as e:
-                print(f"[WARN] Failed {article_id}: {e}")
+                results.put((kind, article_id, None, e))
+    finally:
+        pool.close_thread()
+
+
+def refresh_library(
+    limit_count,
+    fetch_mode,
+    kinds=REFRESH_KINDS,
+    threads=4,
+    recycle_after=50,
+    base_url=DEFAULT_BASE_URL,
+    page_concurrency=4,
+    cover_concurrency=8,
+    rate=2.0,
+    max_rate=8.0,
+    min_age=DEFAULT_MIN_AGE,
+    max_age=30 * 86400.0,
+    commit_every=20,
+    archive_pages=True,
+):
+    """Revalidate downloaded pages and covers whose revisit time has come.
+
+    Each resource is fetched with If-None-Match/If-Modified-Since from its
+    fetch_state row; 304s and byte-identical bodies only move its next
+    check further out. Changed pages are re-parsed and rewritten, changed
+    covers replace the file on disk.
+    """
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    db_path = get_sqlite_db_path(base_dir)
+    archive = PageArchive(get_archive_dir(base_dir)) if archive_pages else None
+    pool = BrowserPool(max_navigations=recycle_after)
+    client = HttpClient(page_concurrency=page_concurrency, cover_concurrency=cover_concurrency)
+    limiter = HostRateLimiter(rate=rate, max_rate=max_rate)
+    tasks = Queue()
+    results = Queue()
+    workers = start_workers(
+        refresh_worker,
+        max(1, threads),
+        "refresh-worker",
+        (tasks, results, base_dir, fetch_mode, pool, client, limiter, archive),
+    )
+
+    counts = {(kind, state): 0 for kind in REFRESH_KINDS for state in ("not_modified", "unchanged", "changed")}
+    failed = 0
+    downloaded_bytes = 0
+    with connect_sqlite(db_path) as conn:
+        ensure_schema(conn)
+        print(f"[INFO] SQLite DB: {db_path}")
+        tag_cache = TagIdCache()
+        batcher = CommitBatcher(conn, every=commit_every, interval=2.0)
+        now = time.time()
+        urls = {}
+        for kind in kinds:
+            due = refresh_due(conn, kind, now, limit_count)
+            print(f"[INFO] {len(due)} {kind}(s) due for revalidation")
+            for article_id, url, etag, last_modified, content_hash in due:
+                if kind == "page":
+                    url = article_url(article_id, base_url)
+                    if content_hash is None and archive is not None:
+                        latest = archive.latest(conn, article_id)
+                        content_hash = latest[1] if latest else None
+                else:
+                    url = url or default_cover_url(article_id)
+                tasks.put((kind, article_id, url, etag, last_modified, content_hash))
+                urls[(kind, article_id)] = url
 
-        print(f"[DONE] Downloaded {downloaded} article(s), skipped {skip_downloaded} already-downloaded.")
+        try:
+            while urls:
+                kind, article_id, outcome, error = results.get()
+                url = urls.pop((kind, article_id))
+                now = time.time()
+                if error is not None:
+                    failed += 1
+                    print(f"[WARN] Revalidation failed for {kind} {article_id}: {error}")
+                    record_fetch_failure(conn, kind, article_id, url, error, now, min_age)
+                    batcher.note()
+                    continue
+
+                counts[(kind, outcome.state)] += 1
+                downloaded_bytes += outcome.size
+                try:
+                    with savepoint(conn):
+                        if kind == "page" and outcome.state == "changed":
+                            title, description, cover_url, keywords, refs = outcome.parsed
+                            planned_cover = cover_filename(article_id) if cover_url else None
+                            write_article(
+                                conn,
+                                article_id,
+                                title or article_id,
+                                description,
+                                planned_cover,
+                                keywords,
+                                refs,
+                                tag_cache,
+                            )
+                            if outcome.encoded is not None:
+                                archive.append(conn, article_id, outcome.encoded)
+                            frontier_push(conn, refs, 1)
+                            if cover_url:
+                                update_cover_url(conn, article_id, cover_url, now)
+                                if not os.path.exists(cover_full_path(base_dir, article_id)):
+                                    enqueue_cover(conn, article_id, cover_url)
+                            print(f"[INFO] Updated article={article_id}")
+                        elif outcome.state == "changed":
+                            # Cover URLs carry the file's mtime; a new
+                            # generation re-renders pages with the new one.
+                            bump_generation(conn)
+                            print(f"[INFO] Updated cover: {cover_filename(article_id)}")
+                        record_fetch_state(conn, outcome, now, min_age, max_age)
+                except Exception as e:
+                    tag_cache.clear()
+                    failed += 1
+                    print(f"[WARN] Failed to record {kind} {article_id}: {e}")
+                batcher.note()
+        finally:
+            stop_workers(tasks, workers)
+            client.close()
+            batcher.commit()
+            if archive is not None:
+                archive.close()
+
+    for kind in kinds:
+        print(
+            f"[DONE] {kind}s: {counts[(kind, 'not_modified')]} not modified (304), "
+            f"{counts[(kind, 'unchanged')]} unchanged, {counts[(kind, 'changed')]} changed"
+        )
+    print(f"[DONE] Failed {failed}, downloaded {downloaded_bytes} byte(s)")
+    rates = limiter.summary()
+    if rates:
+        print(f"[INFO] Host rates: {rates}")
+
+
+def build_refresh_parser():
+    parser = argparse.ArgumentParser(
+        prog="get_missav_titles.py refresh",
+        description="Revalidate downloaded pages and covers with conditional requests.",
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=200,
+        help="Maximum number of pages, and of covers, to revalidate (default: 200)",
+    )
+    parser.add_argument(
+        "--only",
+        choices=REFRESH_KINDS,
+        help="Revalidate only pages or only covers (default: both)",
+    )
+    parser.add_argument(
+        "--min-age",
+        type=float,
+        default=1.0,
+        help="Days before an article is first revisited, and after it changes (default: 1)",
+    )
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=30.0,
+        help="Longest revisit interval in days for resources that never change (default: 30)",
+    )
+    parser.add_argument(
+        "--fetch-mode",
+        choices=["auto", "http", "playwright"],
+        default="auto",
+        help="Fetch engine for pages: auto(default), http only, or playwright only",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=4,
+        help="Number of concurrent revalidation workers (default: 4)",
+    )
+    parser.add_argument(
+        "--base-url",
+        default=os.getenv("MISSAV_BASE_URL", DEFAULT_BASE_URL),
+        help=f"Article URL prefix (default: {DEFAULT_BASE_URL}, or $MISSAV_BASE_URL)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=2.0,
+        help="Initial requests/second per host (default: 2.0)",
+    )
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        default=8.0,
+        help="Upper bound for the adaptive per-host rate (default: 8.0)",
+    )
+    parser.add_argument(
+        "--no-archive",
+        action="store_true",
+        help="Do not store changed pages in the compressed page archive (archive/)",
+    )
+    return parser
+
+
+def refresh_main(argv):
+    args = build_refresh_parser().parse_args(argv)
+    if args.count <= 0:
+        print("[ERROR] --count must be > 0")
+        sys.exit(1)
+    if args.threads <= 0:
+        print("[ERROR] --threads must be > 0")
+        sys.exit(1)
+    if args.min_age <= 0 or args.max_age < args.min_age:
+        print("[ERROR] --min-age must be > 0 and --max-age >= --min-age")
+        sys.exit(1)
+    if args.rate <= 0 or args.max_rate <= 0:
+        print("[ERROR] --rate and --max-rate must be > 0")
+        sys.exit(1)
+    refresh_library(
+        limit_count=args.count,
+        fetch_mode=args.fetch_mode,
+        kinds=(args.only,) if args.only else REFRESH_KINDS,
+        threads=args.threads,
+        base_url=args.base_url,
+        rate=args.rate,
+        max_rate=args.max_rate,
+        min_age=args.min_age * 86400,
+        max_age=args.max_age * 86400,
+        archive_pages=not args.no_archive,
+    )
+
+
+def article_id_from_page_name(name):
+    base = os.path.basename(name)
+    for suffix in (".gz", ".html", ".htm"):
+        if base.lower().endswith(suffix):
+            base = base[: -len(suffix)]
+    if base.startswith("debug_missing_"):
+        base = base[len("debug_missing_") :]
+    return base
+
+
+def is_page_name(name):
+    return name.lower().endswith((".html", ".htm", ".html.gz", ".htm.gz"))
+
+
+def decode_page(data, name):
+    if name.lower().endswith(".gz"):
+        data = gzip.decompress(data)
+    elif name.lower().endswith(".zst"):
+        zstd = load_zstd()
+        if zstd is None:
+            raise RuntimeError("zstandard is required to read .zst pages: uv pip install zstandard")
+        data = zstd.ZstdDecompressor().decompress(data)
+    return data.decode("utf-8", errors="replace")
+
+
+ARCHIVE_SUFFIXES = {"gzip": ".html.gz", "zstd": ".html.zst"}
+
+
+def iter_archived_pages(conn, archive):
+    """Yield (article_id, name, data) for the newest archived copy of each page."""
+    for article_id, codec, blob in archive.iter_latest(conn):
+        yield article_id, f"{article_id}{ARCHIVE_SUFFIXES[codec]}", blob
+
+
+def iter_stored_pages(source):
+    """Yield (article_id, path, data) for saved pages.
+
+    `source` is a directory (searched recursively) or a .zip/.tar/.tar.gz
+    archive. Directory entries are yielded as paths so the pool workers read
+    them; archive members are read here and passed as bytes.
+    """
+    if os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                if is_page_name(name):
+                    yield article_id_from_page_name(name), os.path.join(root, name), None
+        return
+
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and is_page_name(info.filename):
+                    yield article_id_from_page_name(info.filename), info.filename, zf.read(info)
+        return
+
+    if tarfile.is_tarfile(source):
+        with tarfile.open(source) as tf:
+            for member in tf:
+                if member.isfile() and is_page_name(member.name):
+                    yield article_id_from_page_name(member.name), member.name, tf.extractfile(member).read()
+        return
+
+    raise ValueError(f"Not a directory or zip/tar archive: {source}")
+
+
+def reparse_page(task):
+    # Runs in a pool worker process. The page's own og:url wins over the
+    # file name, which may not be the article id.
+    article_id, name, data = task
+    if data is None:
+        with open(name, "rb") as f:
+            data = f.read()
+    html = decode_page(data, name)
+    meta = extract_head_meta(html)
+    page_id = normalize_id(unescape(meta.get("og:url", "")).strip())
+    return page_id or article_id, page_fields(meta, html)
+
+
+def reparse_pages(source, workers=None, commit_every=200, from_archive=False):
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    db_path = get_sqlite_db_path(base_dir)
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 4
+
+    started = time.perf_counter()
+    written = 0
+    skipped = 0
+    failed = 0
+    with connect_sqlite(db_path) as conn:
+        ensure_schema(conn)
+        print(f"[INFO] SQLite DB: {db_path}")
+        if from_archive:
+            source = get_archive_dir(base_dir)
+            tasks = iter_archived_pages(conn, PageArchive(source))
+        else:
+            tasks = iter_stored_pages(source)
+        print(f"[INFO] Reparsing {source} with {workers} process(es)")
+        status = ArticleStatusIndex.load(conn, base_dir)
+        tag_cache = TagIdCache()
+        batcher = CommitBatcher(conn, every=commit_every, interval=float("inf"))
+
+        def write_result(future):
+            nonlocal written, skipped, failed
+            try:
+                article_id, (title, description, cover_url, keywords, refs) = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[WARN] Reparse failed: {e}")
+                return
+            if not (title or description or keywords):
+                skipped += 1
+                print(f"[SKIP] No article metadata: {article_id}")
+                return
+
+            planned_cover = cover_filename(article_id) if cover_url else None
+            new_refs = status.filter_refs(article_id, refs)
+            try:
+                with savepoint(conn):
+                    write_article(
+                        conn, article_id, title or article_id, description, planned_cover, keywords, refs, tag_cache
+                    )
+                    frontier_push(conn, [article_id], 0)
+                    frontier_mark(conn, article_id, FRONTIER_DONE)
+                    frontier_push(conn, new_refs, 1)
+                    if cover_url and not status.has_cover_file(article_id):
+                        enqueue_cover(conn, article_id, cover_url)
+            except Exception as e:
+                # The savepoint undid this page only; tag ids it created
+                # are gone with it.
+                tag_cache.clear()
+                failed += 1
+                print(f"[WARN] Failed to write {article_id}: {e}")
+                return
+            status.mark_article(article_id, has_cover=bool(cover_url))
+            status.mark_placeholders(new_refs)
+            written += 1
+            batcher.note()
+            if written % 500 == 0:
+                print(f"[INFO] Reparsed {written} page(s)")
+
+        # Parsing fans out to the pool; results stream back to this process,
+        # which is the only DB writer. Submission is bounded so archives are
+        # never read into memory all at once.
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+            for task in tasks:
+                pending.add(executor.submit(reparse_page, task))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        write_result(future)
+            for future in pending:
+                write_result(future)
+        batcher.commit()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"[DONE] Reparsed {written} page(s), skipped {skipped}, failed {failed} "
+        f"in {elapsed:.1f}s ({written / elapsed if elapsed else 0:.0f} pages/s)"
+    )
+
+
+def build_reparse_parser():
+    parser = argparse.ArgumentParser(
+        prog="get_missav_titles.py reparse",
+        description="Re-derive titles, tags and refs from stored HTML without fetching.",
+    )
+    parser.add_argument(
+        "source",
+        nargs="?",
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "debug"),
+        help="Directory of saved pages (debug_missing_{id}.html[.gz]) or a zip/tar archive (default: debug/)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Parser processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--commit-every",
+        type=int,
+        default=200,
+        help="Articles per SQLite transaction (default: 200)",
+    )
+    parser.add_argument(
+        "--from-archive",
+        action="store_true",
+        help="Reparse the newest copy of every page in the page archive instead of SOURCE",
+    )
+    return parser
+
+
+def reparse_main(argv):
+    args = build_reparse_parser().parse_args(argv)
+    if args.workers is not None and args.workers <= 0:
+        print("[ERROR] --workers must be > 0")
+        sys.exit(1)
+    if args.commit_every <= 0:
+        print("[ERROR] --commit-every must be > 0")
+        sys.exit(1)
+    if not args.from_archive and not os.path.exists(args.source):
+        print(f"[ERROR] Not found: {args.source}")
+        sys.exit(1)
+    reparse_pages(
+        args.source, workers=args.workers, commit_every=args.commit_every, from_archive=args.from_archive
+    )
+
+
+def thumbnail_task(task):
+    covers_dir, filename = task
+    return make_thumbnails(covers_dir, filename)
+
+
+def thumbnails_main(argv):
+    parser = argparse.ArgumentParser(
+        prog="get_missav_titles.py thumbnails",
+        description="Generate missing card-sized cover thumbnails for every file in covers/.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Resize processes (default: CPU count)",
+    )
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers <= 0:
+        print("[ERROR] --workers must be > 0")
+        sys.exit(1)
+    if load_pillow() is None:
+        print("[ERROR] Pillow is required for thumbnails: uv pip install pillow")
+        sys.exit(1)
+
+    covers_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "covers")
+    names = sorted(n for n in os.listdir(covers_dir) if n.endswith(".jpg"))
+    started = time.perf_counter()
+    written = 0
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        tasks = [(covers_dir, name) for name in names]
+        for name, future in zip(names, [executor.submit(thumbnail_task, t) for t in tasks]):
+            try:
+                written += future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[WARN] Thumbnails failed for {name}: {e}")
+    print(
+        f"[DONE] {len(names)} cover(s), wrote {written} thumbnail(s), failed {failed} "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+def reindex_main(argv):
+    parser = argparse.ArgumentParser(
+        prog="get_missav_titles.py reindex",
+        description="Rebuild the full-text search index (articles_fts) from the articles and tags tables.",
+    )
+    parser.parse_args(argv)
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    db_path = get_sqlite_db_path(base_dir)
+    started = time.perf_counter()
+    with connect_sqlite(db_path) as conn:
+        ensure_schema(conn)
+        print(f"[INFO] SQLite DB: {db_path}")
+        indexed = rebuild_search_index(conn)
+        conn.commit()
+    print(f"[DONE] Indexed {indexed} article(s) in {time.perf_counter() - started:.1f}s")
+
+
+def select_seek_videos(conn, ids=None, tags=None, recent=None):
+    """(article_id, uuid, snapshot_count) of resolved, not disliked videos.
+
+    Filters combine: explicit ids, any of `tags`, and the `recent` most
+    recently resolved. With none given, every resolved video is selected.
+    """
+    where = ["s.snapshot_count IS NOT NULL", "COALESCE(a.dislike, 0) = 0"]
+    params = []
+    if ids:
+        where.append(f"s.article_id IN ({', '.join('?' for _ in ids)})")
+        params.extend(ids)
+    if tags:
+        where.append(
+            f"""s.article_id IN (
+                SELECT at.article_id FROM article_tags at JOIN tags t ON t.id = at.tag_id
+                WHERE t.name IN ({', '.join('?' for _ in tags)})
+            )"""
+        )
+        params.extend(tags)
+    sql = f"""
+        SELECT s.article_id, s.uuid, s.snapshot_count
+        FROM stream_metadata s
+        JOIN articles a ON a.id = s.article_id
+        WHERE {' AND '.join(where)}
+        ORDER BY s.resolved_at DESC, s.article_id
+    """
+    if recent:
+        sql += " LIMIT ?"
+        params.append(recent)
+    return conn.execute(sql, params).fetchall()
+
+
+def fetch_seek_sheet(url, client, limiter):
+    with rate_limited(limiter, url):
+        started = time.perf_counter()
+        data = fetch_bytes(url, client=client)
+    return data, time.perf_counter() - started
+
+
+def prefetch_seeks(videos, seeks_dir, workers=8, rate=8.0, max_rate=32.0):
+    """Download every missing seek sheet of `videos` into per-video packs.
+
+    Sheets of all videos share one pool of `workers` fetches; the main
+    thread appends finished sheets to their pack and closes each pack as
+    its last sheet lands. Sheets already packed are skipped, so an
+    interrupted run, or one where some sheets failed, picks up where it
+    stopped. A video counts as complete only once every sheet is packed.
+    """
+    client = HttpClient(cover_concurrency=workers)
+    limiter = HostRateLimiter(rate=rate, max_rate=max_rate)
+    counts = {
+        "sheets": 0,
+        "bytes": 0,
+        "missing": 0,
+        "failed": 0,
+        "skipped": 0,
+        "complete": 0,
+        "incomplete": 0,
+    }
+    fetch_seconds = 0.0
+    started = time.perf_counter()
+
+    def sheet_tasks():
+        for article_id, uuid, total in videos:
+            pack = SeekPack.load(seek_pack_path(seeks_dir, uuid)) or SeekPack(seek_pack_path(seeks_dir, uuid))
+            wanted = [n for n in range(total) if n not in pack]
+            counts["skipped"] += total - len(wanted)
+            if not wanted:
+                counts["complete"] += 1
+                continue
+            yield article_id, uuid, total, pack, wanted
+
+    def finish_video(video):
+        pack = video["pack"]
+        pack.close()
+        if video["failed"]:
+            counts["incomplete"] += 1
+            print(
+                f"[WARN] {video['article_id']}: {len(pack.index)}/{video['total']} sheet(s) packed, "
+                f"{video['failed']} failed; re-run to fetch the rest"
+            )
+        else:
+            counts["complete"] += 1
+            print(f"[DONE] {video['article_id']}: {len(pack.index)} sheet(s), {pack.data_end} byte(s)")
+
+    pending = {}
+    open_videos = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="seek-fetch") as executor:
+            tasks = iter(sheet_tasks())
+            queued = deque()
+            while True:
+                # Keep at most two fetches per worker in flight.
+                while len(pending) < workers * 2:
+                    if not queued:
+                        task = next(tasks, None)
+                        if task is None:
+                            break
+                        article_id, uuid, total, pack, wanted = task
+                        pack.open_append()
+                        open_videos[uuid] = {
+                            "article_id": article_id,
+                            "pack": pack,
+                            "total": total,
+                            "remaining": len(wanted),
+                            "failed": 0,
+                        }
+                        queued.extend((uuid, n) for n in wanted)
+                    uuid, sheet = queued.popleft()
+                    url = f"{seek_base_url(uuid)}/_{sheet}.jpg"
+                    pending[executor.submit(fetch_seek_sheet, url, client, limiter)] = (uuid, sheet)
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    uuid, sheet = pending.pop(future)
+                    video = open_videos[uuid]
+                    try:
+                        data, elapsed = future.result()
+                    except Exception as e:
+                        if isinstance(e, HTTPError) and e.code == 404 and sheet == video["total"] - 1:
+                            # The sheet count is estimated from the duration
+                            # and can run one past the real last sheet; keep
+                            # an empty record so reruns skip it. A 404 for
+                            # any other sheet is retried on the next run.
+                            video["pack"].append(sheet, b"")
+                            counts["missing"] += 1
+                        else:
+                            video["failed"] += 1
+                            counts["failed"] += 1
+                            reason = f"HTTP {e.code}" if isinstance(e, HTTPError) else e
+                            print(f"[WARN] {video['article_id']} _{sheet}.jpg: {reason}")
+                    else:
+                        video["pack"].append(sheet, data)
+                        counts["sheets"] += 1
+                        counts["bytes"] += len(data)
+                        fetch_seconds += elapsed
+                    video["remaining"] -= 1
+                    if video["remaining"] == 0:
+                        del open_videos[uuid]
+                        finish_video(video)
+    finally:
+        # Interrupted: keep what was fetched so the next run resumes.
+        for video in open_videos.values():
+            video["pack"].close()
+        client.close()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"[DONE] {counts['complete']}/{len(videos)} video(s) complete, {counts['incomplete']} incomplete: "
+        f"fetched {counts['sheets']} sheet(s), {counts['bytes'] / 1048576:.1f} MiB in {elapsed:.1f}s; "
+        f"already packed {counts['skipped']}, past the end {counts['missing']}, failed {counts['failed']}"
+    )
+    if counts["sheets"]:
+        print(
+            f"[INFO] Throughput: {counts['sheets'] / elapsed:.1f} sheets/s, "
+            f"{counts['bytes'] / 1048576 / elapsed:.2f} MiB/s, "
+            f"mean fetch {fetch_seconds / counts['sheets'] * 1000:.0f} ms with {workers} worker(s)"
+        )
+    rates = limiter.summary()
+    if rates:
+        print(f"[INFO] Host rates: {rates}")
+    return counts
+
+
+def prefetch_seeks_main(argv):
+    parser = argparse.ArgumentParser(
+        prog="get_missav_titles.py prefetch-seeks",
+        description="Download every seek sheet of resolved videos into one <uuid>.pack file per video.",
+        epilog="Videos need stream metadata first (miss_thumb.py --from-db). Re-running resumes.",
+    )
+    parser.add_argument("ids", nargs="*", help="Article ids to prefetch")
+    parser.add_argument("--tag", action="append", default=[], help="Videos with this tag; repeat for any of several")
+    parser.add_argument("--recent", type=int, help="Only the N most recently resolved videos")
+    parser.add_argument("--all", action="store_true", help="Every resolved, not disliked video")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent sheet downloads (default: 8)")
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=8.0,
+        help="Initial requests/second to the seek host (default: 8.0)",
+    )
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        default=32.0,
+        help="Upper bound for the adaptive seek host rate (default: 32.0)",
+    )
+    parser.add_argument("--seeks-dir", help="Where packs are written (default: MISSAV_SEEKS_DIR or seeks/)")
+    args = parser.parse_args(argv)
+    if not (args.ids or args.tag or args.recent or args.all):
+        print("[ERROR] Give ids, --tag, --recent N or --all")
+        sys.exit(1)
+    if args.recent is not None and args.recent <= 0:
+        print("[ERROR] --recent must be > 0")
+        sys.exit(1)
+    if args.workers <= 0:
+        print("[ERROR] --workers must be > 0")
+        sys.exit(1)
+    if args.rate <= 0 or args.max_rate <= 0:
+        print("[ERROR] --rate and --max-rate must be > 0")
+        sys.exit(1)
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    seeks_dir = args.seeks_dir or get_seeks_dir(base_dir)
+    with connect_sqlite(get_sqlite_db_path(base_dir)) as conn:
+        ensure_schema(conn)
+        videos = select_seek_videos(conn, args.ids, args.tag, args.recent)
+    if not videos:
+        print("[SKIP] No resolved videos match")
+        return
+    sheets = sum(total for _, _, total in videos)
+    print(f"[INFO] {len(videos)} video(s), {sheets} sheet(s) into {seeks_dir} with {args.workers} worker(s)")
+    prefetch_seeks(videos, seeks_dir, workers=args.workers, rate=args.rate, max_rate=args.max_rate)
+
+
+SUBCOMMANDS = {
+    "reparse": reparse_main,
+    "refresh": refresh_main,
+    "reindex": reindex_main,
+    "thumbnails": thumbnails_main,
+    "prefetch-seeks": prefetch_seeks_main,
+}
 
 
 def build_arg_parser():
     parser = argparse.ArgumentParser(
-        description="Crawl MissAV metadata into SQLite."
+        description="Crawl MissAV metadata into SQLite.",
+        epilog="Subcommands: reparse, refresh, reindex, thumbnails, prefetch-seeks "
+        "(see 'get_missav_titles.py <subcommand> --help').",
     )
     parser.add_argument(
         "id",
         nargs="?",
-        help="Seed video id or URL (optional). If omitted, pick one random id from DB.",
+        help="Seed video id or URL (optional). If omitted, resume the saved crawl frontier, "
+        "or pick one random id from DB.",
     )
     parser.add_argument(
         "--count",
@@ -467,38 +3275,188 @@ def build_arg_parser():
         default="auto",
         help="Fetch engine: auto(default), http only, or playwright only",
     )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=1,
+        help="Number of concurrent fetch workers (default: 1)",
+    )
+    parser.add_argument(
+        "--recycle-after",
+        type=int,
+        default=50,
+        help="Open a fresh Playwright page after this many navigations (default: 50)",
+    )
+    parser.add_argument(
+        "--base-url",
+        default=os.getenv("MISSAV_BASE_URL", DEFAULT_BASE_URL),
+        help=f"Article URL prefix (default: {DEFAULT_BASE_URL}, or $MISSAV_BASE_URL)",
+    )
+    parser.add_argument(
+        "--page-concurrency",
+        type=int,
+        default=4,
+        help="Max concurrent HTTP page requests per host (default: 4)",
+    )
+    parser.add_argument(
+        "--cover-concurrency",
+        type=int,
+        default=8,
+        help="Max concurrent cover downloads per host (default: 8)",
+    )
+    parser.add_argument(
+        "--cover-threads",
+        type=int,
+        default=4,
+        help="Number of background cover download workers (default: 4)",
+    )
+    parser.add_argument(
+        "--covers-only",
+        action="store_true",
+        help="Only backfill covers for rows whose cover file is missing, then exit",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=2.0,
+        help="Initial requests/second per host; adapts to 429/403 and latency (default: 2.0)",
+    )
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        default=8.0,
+        help="Upper bound for the adaptive per-host rate (default: 8.0)",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=MAX_PAGE_ATTEMPTS,
+        help=f"Give up on an id after this many failed fetches (default: {MAX_PAGE_ATTEMPTS})",
+    )
+    parser.add_argument(
+        "--commit-every",
+        type=int,
+        default=20,
+        help="Group this many article writes into one SQLite transaction (default: 20)",
+    )
+    parser.add_argument(
+        "--commit-interval",
+        type=float,
+        default=2.0,
+        help="Commit pending writes at least every N seconds (default: 2.0)",
+    )
+    parser.add_argument(
+        "--no-archive",
+        action="store_true",
+        help="Do not store fetched pages in the compressed page archive (archive/)",
+    )
+    parser.add_argument(
+        "--no-thumbnails",
+        action="store_true",
+        help="Do not generate card-sized cover thumbnails (covers/thumbs/) after each download",
+    )
+    parser.add_argument(
+        "--min-age",
+        type=float,
+        default=DEFAULT_MIN_AGE / 86400,
+        help="Days before 'refresh' first revisits a downloaded page or cover (default: 1)",
+    )
     return parser
 
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+        return
+
     parser = build_arg_parser()
     args = parser.parse_args()
 
+    if args.cover_threads <= 0:
+        print("[ERROR] --cover-threads must be > 0")
+        sys.exit(1)
+    if args.rate <= 0 or args.max_rate <= 0:
+        print("[ERROR] --rate and --max-rate must be > 0")
+        sys.exit(1)
+    if args.max_attempts <= 0:
+        print("[ERROR] --max-attempts must be > 0")
+        sys.exit(1)
+    if args.commit_every <= 0:
+        print("[ERROR] --commit-every must be > 0")
+        sys.exit(1)
+    if args.min_age <= 0:
+        print("[ERROR] --min-age must be > 0")
+        sys.exit(1)
+    if args.covers_only:
+        crawl_single(
+            seed_id=None,
+            limit_count=0,
+            debug_flag=False,
+            fetch_mode=args.fetch_mode,
+            page_concurrency=args.page_concurrency,
+            cover_concurrency=args.cover_concurrency,
+            cover_threads=args.cover_threads,
+            covers_only=True,
+            rate=args.rate,
+            max_rate=args.max_rate,
+            thumbnails=not args.no_thumbnails,
+            min_age=args.min_age * 86400,
+        )
+        return
+
     base_dir = os.path.dirname(os.path.abspath(__file__))
     db_path = get_sqlite_db_path(base_dir)
     with connect_sqlite(db_path) as conn:
         ensure_schema(conn)
         seed_raw = args.id
+        resume_frontier = False
         if not seed_raw:
-            seed_raw = pick_random_seed(conn)
-            if not seed_raw:
-                print("[ERROR] No id provided and DB is empty. Please pass an id.")
-                sys.exit(1)
-            print(f"[INFO] Picked random seed from DB: {seed_raw}")
+            frontier_release(conn)
+            frontier_bootstrap(conn)
+            conn.commit()
+            resume_frontier = frontier_next_due(conn) is not None
+            if resume_frontier:
+                print("[INFO] No id provided, resuming saved crawl frontier")
+            else:
+                seed_raw = pick_random_seed(conn)
+                if not seed_raw:
+                    print("[ERROR] No id provided and DB is empty. Please pass an id.")
+                    sys.exit(1)
+                print(f"[INFO] Picked random seed from DB: {seed_raw}")
 
     seed_id = normalize_id(seed_raw)
-    if not seed_id:
+    if not seed_id and not resume_frontier:
         print("[ERROR] Seed id is empty.")
         sys.exit(1)
     if args.count <= 0:
         print("[ERROR] --count must be > 0")
         sys.exit(1)
+    if args.threads <= 0:
+        print("[ERROR] --threads must be > 0")
+        sys.exit(1)
+    if args.recycle_after <= 0:
+        print("[ERROR] --recycle-after must be > 0")
+        sys.exit(1)
 
     crawl_single(
         seed_id=seed_id,
         limit_count=args.count,
         debug_flag=args.debug,
         fetch_mode=args.fetch_mode,
+        threads=args.threads,
+        recycle_after=args.recycle_after,
+        base_url=args.base_url,
+        page_concurrency=args.page_concurrency,
+        cover_concurrency=args.cover_concurrency,
+        cover_threads=args.cover_threads,
+        rate=args.rate,
+        max_rate=args.max_rate,
+        max_attempts=args.max_attempts,
+        commit_every=args.commit_every,
+        commit_interval=args.commit_interval,
+        archive_pages=not args.no_archive,
+        thumbnails=not args.no_thumbnails,
+        min_age=args.min_age * 86400,
     )
 
 
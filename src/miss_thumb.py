@@ -1,471 +1,453 @@
-import sys
+#!/usr/bin/env python3
+"""Resolve MissAV stream URLs, seek-sprite bases and durations.
+
+    python miss_thumb.py hunta-881                          # one id, writes viewer.html
+    python miss_thumb.py --tabs 4 --jsonl streams.jsonl id1 id2 ...
+    cat ids.txt | python miss_thumb.py --stdin
+    python miss_thumb.py --from-db --limit 200
+
+Results are kept in the stream_metadata table and reused for --max-age
+days, so a known id needs no browser at all. The rest are opened as tabs
+of one shared headless Chromium; a tab moves on as soon as the packed
+'...'.split('|') string is in the page.
+"""
+import argparse
+import asyncio
+import json
+import os
 import re
-from playwright.sync_api import sync_playwright
-from playwright_stealth import Stealth
-
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python miss_thumb.py <url_or_id>")
-        sys.exit(1)
-
-    user_input = sys.argv[1]
-    
+import sys
+import time
+
+from get_missav_titles import (
+    CommitBatcher,
+    DEFAULT_BASE_URL,
+    STREAM_METADATA_TTL,
+    USER_AGENT,
+    bump_generation,
+    connect_sqlite,
+    ensure_schema,
+    get_sqlite_db_path,
+    load_stream_metadata,
+    save_stream_metadata,
+    seek_base_url,
+    snapshot_count,
+)
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
+STREAM_PATTERN = re.compile(r"'([^']+)'\.split\('\|'\)")
+STREAM_PATTERN_JS = r"""() => /'[^']+'\.split\('\|'\)/.test(document.documentElement.innerHTML)"""
+DURATION_PATTERN = re.compile(r"(\d{1,2}:\d{2}:\d{2})")
+DURATION_SELECTORS = ("span[class*='text-secondary'] .font-medium", ".plyr__time--duration")
+# The packed string is in the page's own HTML; nothing else needs loading.
+BLOCKED_RESOURCES = {"image", "media", "font", "stylesheet"}
+
+
+def load_async_playwright():
+    try:
+        from playwright.async_api import async_playwright
+    except Exception as e:
+        raise RuntimeError(
+            "Playwright is required to resolve streams. Install with: uv pip install playwright playwright-stealth"
+        ) from e
+
+    stealth_cls = None
+    try:
+        from playwright_stealth import Stealth
+
+        stealth_cls = Stealth
+    except Exception:
+        stealth_cls = None
+    return async_playwright, stealth_cls
+
+
+def article_url(user_input, base_url=DEFAULT_BASE_URL):
     if user_input.startswith("http"):
-        url = user_input
+        return user_input
+    return f"{base_url.rstrip('/')}/{user_input}"
+
+
+def article_id_from_input(user_input):
+    return user_input.rstrip("/").rsplit("/", 1)[-1] if user_input.startswith("http") else user_input
+
+
+def parse_stream_string(raw_string):
+    # Input: m3u8|part5|part4|part3|part2|part1|com|surrit|https|video|1280x720|...
+    # Target: https://surrit.com/part1-part2-part3-part4-part5/1280x720/video.m3u8
+    # The uuid parts come reversed: indices 5, 4, 3, 2, 1.
+    parts = raw_string.split("|")
+    if len(parts) <= 10:
+        return None
+    uuid = f"{parts[5]}-{parts[4]}-{parts[3]}-{parts[2]}-{parts[1]}"
+    return {
+        "uuid": uuid,
+        "resolution": parts[10],
+        "m3u8_url": f"{parts[8]}://{parts[7]}.{parts[6]}/{uuid}/{parts[10]}/{parts[9]}.{parts[0]}",
+        "seek_base": seek_base_url(uuid),
+    }
+
+
+def parse_duration(text):
+    # "1:02:03" / "02:03" -> seconds; None when it does not parse.
+    try:
+        time_parts = list(map(int, text.strip().split(":")))[::-1]
+    except (AttributeError, ValueError):
+        return None
+    return sum(part * (60**i) for i, part in enumerate(time_parts))
+
+
+def extract_stream(content, duration_text=None):
+    match = STREAM_PATTERN.search(content)
+    stream = parse_stream_string(match.group(1)) if match else None
+    if stream is None:
+        return None
+    if not duration_text:
+        dur_match = DURATION_PATTERN.search(content)
+        duration_text = dur_match.group(1) if dur_match else None
+    stream["duration"] = duration_text
+    stream["duration_seconds"] = parse_duration(duration_text) if duration_text else None
+    if stream["duration_seconds"] is not None:
+        stream["snapshots"] = snapshot_count(stream["duration_seconds"])
+    return stream
+
+
+async def wait_for_stream_string(page, timeout_ms):
+    # A challenge page may navigate once or twice before the real one; each
+    # navigation aborts the wait, so keep waiting until the deadline.
+    deadline = time.monotonic() + timeout_ms / 1000
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        try:
+            await page.wait_for_function(STREAM_PATTERN_JS, timeout=remaining * 1000)
+            return True
+        except Exception as e:
+            if "Timeout" in type(e).__name__ or "Timeout" in str(e):
+                return False
+            await asyncio.sleep(0.1)
+
+
+async def resolve_page(page, url, timeout_ms):
+    await page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
+    await wait_for_stream_string(page, timeout_ms)
+    content = await page.content()
+    duration_text = None
+    for selector in DURATION_SELECTORS:
+        element = await page.query_selector(selector)
+        if element:
+            duration_text = (await element.inner_text()).strip() or None
+            if duration_text:
+                break
+    stream = extract_stream(content, duration_text)
+    if stream is None:
+        raise RuntimeError("stream string not found")
+    return stream
+
+
+async def block_resources(route):
+    if route.request.resource_type in BLOCKED_RESOURCES:
+        await route.abort()
     else:
-        url = f"https://missav.ai/ja/{user_input}"
-        
-    print(f"Target URL: {url}")
+        await route.continue_()
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=False, 
-            args=["--disable-blink-features=AutomationControlled"]
-        )
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36"
+
+async def resolve_streams(inputs, on_result, tabs=4, timeout_ms=15000, base_url=DEFAULT_BASE_URL, headed=False):
+    """Resolve every input in one browser, `tabs` pages at a time.
+
+    on_result(user_input, url, stream, error, elapsed) is called as each
+    one finishes; stream is the extract_stream() dict or None.
+    """
+    async_playwright, stealth_cls = load_async_playwright()
+    queue = asyncio.Queue()
+    for user_input in inputs:
+        queue.put_nowait(user_input)
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(
+            headless=not headed,
+            args=["--disable-blink-features=AutomationControlled"],
         )
-        page = context.new_page()
-        Stealth().apply_stealth_sync(page) 
-        
-        try:
-            page.goto(url)
-            
-            try:
-                # Wait for main content, shorter timeout as we primarily scan HTML
-                page.wait_for_selector(".plyr__progress", timeout=15000)
-            except:
-                pass # Proceed to scan content even if timeout
-
-            content = page.content()
-            
-            # 1. Extract String
-            match = re.search(r"'([^']+)'\.split\('\|'\)", content)
-            if match:
-                raw_string = match.group(1)
-                print(f"Extracted String: {raw_string}")
-                
-                # Synthesize URL
-                # Input: m3u8|part5|part4|part3|part2|part1|com|surrit|https|video|1280x720|...
-                # Target: https://surrit.com/part1-part2-part3-part4-part5/1280x720/video.m3u8
-                # Note: The user example shows the UUID parts are reversed in the raw string relative to the URL?
-                # User Example:
-                # Raw: m3u8|43cdb0f23fd7|aa6d|4d37|70ad|7ee563f7|...
-                # Target: .../7ee563f7-70ad-4d37-aa6d-43cdb0f23fd7/...
-                # So indices: 5, 4, 3, 2, 1
-                
-                parts = raw_string.split('|')
-                if len(parts) > 10:
-                    # Construct URL
-                    # {8}://{7}.{6}/{5}-{4}-{3}-{2}-{1}/{10}/{9}.{0}
-                    m3u8_url = f"{parts[8]}://{parts[7]}.{parts[6]}/{parts[5]}-{parts[4]}-{parts[3]}-{parts[2]}-{parts[1]}/{parts[10]}/{parts[9]}.{parts[0]}"
-                    print(f"Stream URL: {m3u8_url}")
-                    
-                    uuid = f"{parts[5]}-{parts[4]}-{parts[3]}-{parts[2]}-{parts[1]}"
-                    seek_base = f"https://nineyu.com/{uuid}/seek"
-                    seek_url = f"{seek_base}/_0.jpg"
-                    print(f"Seek URL: {seek_url}")
-                else:
-                    print("Stream URL: Parse Error (Not enough parts)")
-                    seek_base = None
-            else:
-                print("Extracted String: Not Found")
-                print("Stream URL: Not Found")
-                seek_base = None
-
-            # 2. Extract Duration
-            duration = "Not Found"
-            # Try specific element
-            duration_el = page.query_selector("span[class*='text-secondary'] .font-medium")
-            if not duration_el:
-                duration_el = page.query_selector(".plyr__time--duration")
-            
-            if duration_el:
-                duration = duration_el.inner_text()
-            else:
-                # Fallback Regex
-                dur_match = re.search(r'(\d{1,2}:\d{2}:\d{2})', content)
-                if dur_match:
-                    duration = dur_match.group(1)
-            
-            print(f"Duration: {duration}")
-
-            # 3. Generate Viewer
-            if seek_base and duration and duration != "Not Found":
+        context = await browser.new_context(user_agent=USER_AGENT)
+        await context.route("**/*", block_resources)
+
+        async def new_tab():
+            page = await context.new_page()
+            if stealth_cls:
+                await stealth_cls().apply_stealth_async(page)
+            return page
+
+        async def tab_worker():
+            page = await new_tab()
+            while True:
                 try:
-                    # Parse duration to seconds
-                    time_parts = list(map(int, duration.split(':')))[::-1]
-                    total_seconds = 0
-                    for i, part in enumerate(time_parts):
-                        total_seconds += part * (60 ** i)
-                    
-                    # Calculate number of snapshots (every 72 seconds)
-                    num_snapshots = int(total_seconds / 72) + 1
-                    print(f"Total Seconds: {total_seconds}, Snapshots: {num_snapshots}")
-
-                    width_pixels = 720
-                    height_pixels = 405
-                    
-                    html_content = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>MissAV Viewer - {user_input}</title>
-    <style>
-        body {{ background: #222; color: #eee; font-family: sans-serif; display: flex; flex-direction: column; align-items: center; min-height: 100vh; margin: 0; padding: 20px; box-sizing: border-box; }}
-        h1 {{ margin: 0 0 10px 0; font-size: 1.5rem; }}
-        .container {{ width: 100%; max-width: 1000px; text-align: center; }}
-        
-        .nav-links {{ margin-bottom: 20px; color: #aaa; }}
-        a {{ color: #60a5fa; text-decoration: none; }}
-        
-        /* Viewer Area */
-        .viewer-area {{ position: relative; display: inline-block; margin: 20px 0; box-shadow: 0 4px 10px rgba(0,0,0,0.5); }}
-        .img-container {{ display: block; }}
-        img {{ display: block; max-width: 100%; height: auto; }}
-        
-        /* Grid Overlay */
-        .grid-overlay {{ 
-            position: absolute; top: 0; left: 0; right: 0; bottom: 0; 
-            display: grid; 
-            grid-template-columns: repeat(6, 1fr); 
-            grid-template-rows: repeat(6, 1fr); 
-        }}
-        .grid-cell {{ 
-            border: 1px solid rgba(255,255,255,0.1); 
-            cursor: pointer; 
-            position: relative;
-        }}
-        .grid-cell:hover {{ background: rgba(255,255,255,0.2); }}
-        .grid-cell.selected {{ background: rgba(74, 222, 128, 0.4); border: 1px solid rgba(74, 222, 128, 0.8); }}
-        .grid-cell.pending-start {{ background: rgba(96, 165, 250, 0.6); box-shadow: inset 0 0 0 3px #2563eb; }}
-        .grid-cell.active-cursor {{ box-shadow: inset 0 0 0 2px #fff; }}
-
-        /* Controls */
-        .controls-row {{ display: flex; gap: 10px; justify-content: center; align-items: center; flex-wrap: wrap; margin-bottom: 15px; }}
-        button {{ background: #374151; color: white; border: 1px solid #555; padding: 8px 16px; border-radius: 4px; cursor: pointer; transition: 0.2s; }}
-        button:hover {{ background: #4b5563; }}
-        button.primary {{ background: #2563eb; border-color: #2563eb; }}
-        button.primary:hover {{ background: #1d4ed8; }}
-        button.danger {{ background: #dc2626; border-color: #dc2626; }}
-        button.danger:hover {{ background: #b91c1c; }}
-        
-        input[type=range] {{ width: 200px; }}
-        input[type=number] {{ width: 60px; padding: 5px; background: #1f2937; border: 1px solid #374151; color: white; border-radius: 4px; }}
-        
-        .info-panel {{ background: #1f2937; padding: 15px; border-radius: 8px; margin-bottom: 20px; text-align: left; display: inline-block; min-width: 600px; }}
-        .info-row {{ display: flex; justify-content: space-between; margin-bottom: 5px; }}
-        .highlight {{ color: #4ade80; font-weight: bold; }}
-        
-        .command-box {{ width: 100%; box-sizing: border-box; background: #111; color: #4ade80; padding: 10px; border-radius: 4px; border: 1px solid #333; font-family: monospace; margin-top: 10px; word-break: break-all; white-space: pre; overflow-x: auto; }}
-        
-        .selection-actions {{ margin-top: 10px; border-top: 1px solid #333; padding-top: 10px; }}
-    </style>
-</head>
-<body>
-    <h1>{user_input}</h1>
-    <div class="nav-links">
-        <a href="{url}" target="_blank">Original Video</a> | 
-        <a href="{m3u8_url}" target="_blank">M3U8 Stream</a>
-    </div>
-
-    <div class="container">
-        <!-- Info & Selection Status -->
-        <div class="info-panel">
-            <div class="info-row">
-                <span>Main Snapshot: <span id="main-idx" class="highlight">0</span> / {num_snapshots - 1}</span>
-                <span>Time: <span id="main-time" class="highlight">00:00:00</span></span>
-            </div>
-            <div class="info-row">
-                <span>Hovered Sub-Snap: <span id="sub-idx">--</span> (+<span id="sub-time">--</span>s)</span>
-                <span>Selection: <span id="sel-count" class="highlight">0</span> ranges</span>
-            </div>
-            
-            <input type="hidden" id="pending-start" value="-1">
-
-            <div class="selection-actions">
-                <small>Selection Controls:</small><br>
-                <div style="margin-top: 5px;">
-                    <button class="primary" onclick="setStart()">1. Set Start Snap</button>
-                    <button class="primary" onclick="setEnd()">2. Set End Snap</button>
-                    <button class="danger" onclick="clearAll()" style="margin-left: 20px;">Clear All Selection</button>
-                </div>
-                <div style="margin-top: 5px; font-style: italic; color: #aaa; font-size: 0.9em;">
-                    Create multiple ranges by setting Start/End repeatedly.
-                </div>
-            </div>
-
-            <div style="margin-top: 15px;">
-                 <strong>Download & Merge Command (FFmpeg):</strong>
-                 <textarea id="ffmpeg-cmd" class="command-box" rows="10" readonly></textarea>
-                 <div style="display: flex; gap: 10px; margin-top: 5px;">
-                     <button onclick="copyCmd()" style="flex: 1;">Copy Command</button>
-                     <button onclick="downloadCmd()" style="flex: 1; background: #059669; border-color: #059669;">Download .sh</button>
-                 </div>
-            </div>
-        </div>
-
-        <!-- Navigation -->
-        <div class="controls-row">
-            <button onclick="prev()">Previous</button>
-            <input type="range" id="slider" min="0" max="{num_snapshots - 1}" value="0" oninput="jumpTo(this.value)">
-            <button onclick="next()">Next</button>
-            
-            <span style="margin-left: 15px; border-left: 1px solid #555; padding-left: 15px;">
-                Jump: <input type="number" id="jump-input" min="0" max="{num_snapshots - 1}" value="0" onchange="jumpTo(this.value)">
-            </span>
-        </div>
-
-        <!-- Viewer -->
-        <div class="viewer-area">
-            <div class="img-container">
-                <img id="viewer-img" src="" alt="Snapshot">
-            </div>
-            <div id="grid-overlay" class="grid-overlay">
-                <!-- Grid items generated by JS -->
-            </div>
-        </div>
-    </div>
-
-    <script>
-        const seekBase = "{seek_base}";
-        const totalSnapshots = {num_snapshots};
-        const m3u8Url = "{m3u8_url}";
-        const videoId = "{user_input}"; 
-        
-        let currentIndex = 0;
-        let activeSubIndex = null; 
-        
-        const CELLS_PER_SHEET = 36;
-        const SECONDS_PER_CELL = 2;
-        const SECONDS_PER_SHEET = CELLS_PER_SHEET * SECONDS_PER_CELL; // 72
-
-        // Ranges: Array of [startGlobal, endGlobal]
-        let ranges = [];
-        let pendingStart = -1;
-        
-        const gridOverlay = document.getElementById('grid-overlay');
-        for(let i=0; i<CELLS_PER_SHEET; i++) {{
-            const cell = document.createElement('div');
-            cell.className = 'grid-cell';
-            cell.dataset.idx = i;
-            cell.onclick = (e) => onCellClick(i, e);
-            cell.onmouseover = () => onCellHover(i);
-            gridOverlay.appendChild(cell);
-        }}
-
-        function formatTime(totalSeconds) {{
-            const h = Math.floor(totalSeconds / 3600).toString().padStart(2, '0');
-            const m = Math.floor((totalSeconds % 3600) / 60).toString().padStart(2, '0');
-            const s = (totalSeconds % 60).toString().padStart(2, '0');
-            return `${{h}}:${{m}}:${{s}}`;
-        }}
-
-        function updateView() {{
-            if (currentIndex < 0) currentIndex = 0;
-            if (currentIndex >= totalSnapshots) currentIndex = totalSnapshots - 1;
-
-            const imgUrl = `${{seekBase}}/_${{currentIndex}}.jpg`;
-            document.getElementById('viewer-img').src = imgUrl;
-
-            const startTime = currentIndex * SECONDS_PER_SHEET;
-            document.getElementById('main-idx').innerText = currentIndex;
-            document.getElementById('main-time').innerText = formatTime(startTime);
-            
-            document.getElementById('slider').value = currentIndex;
-            document.getElementById('jump-input').value = currentIndex;
-
-            renderGridSelection();
-        }}
-
-        function onCellHover(subIdx) {{
-            const timeOffset = subIdx * SECONDS_PER_CELL;
-            document.getElementById('sub-idx').innerText = subIdx;
-            document.getElementById('sub-time').innerText = timeOffset;
-        }}
-
-        function onCellClick(subIdx, e) {{
-            activeSubIndex = subIdx;
-            renderGridSelection();
-        }}
-        
-        function getGlobalIndex(sheetIdx, subIdx) {{
-            return sheetIdx * CELLS_PER_SHEET + subIdx;
-        }}
-
-        function setStart() {{
-            if (activeSubIndex === null) return alert("Select a snapshot cell first.");
-            pendingStart = getGlobalIndex(currentIndex, activeSubIndex);
-            renderGridSelection();
-        }}
-
-        function setEnd() {{
-            if (activeSubIndex === null) return alert("Select a snapshot cell first.");
-            if (pendingStart === -1) return alert("Please set Start Snap first (Key '1').");
-            
-            const endGlob = getGlobalIndex(currentIndex, activeSubIndex);
-            
-            // Normalize start/end
-            const s = Math.min(pendingStart, endGlob);
-            const e = Math.max(pendingStart, endGlob);
-            
-            // Add range
-            ranges.push([s, e]);
-            pendingStart = -1; // Reset pending
-            
-            // Merge overlaps? 
-            // Simple merge strategy: Sort by start, then merge
-            ranges.sort((a,b) => a[0] - b[0]);
-            
-            let merged = [];
-            if(ranges.length > 0) {{
-                let curr = ranges[0];
-                for(let i=1; i<ranges.length; i++) {{
-                    if (ranges[i][0] <= curr[1] + 1) {{ // +1 allows adjacent merging
-                        curr[1] = Math.max(curr[1], ranges[i][1]);
-                    }} else {{
-                        merged.push(curr);
-                        curr = ranges[i];
-                    }}
-                }}
-                merged.push(curr);
-            }}
-            ranges = merged;
-            
-            renderGridSelection();
-            updateCommand();
-        }}
-
-        function clearAll() {{
-            ranges = [];
-            pendingStart = -1;
-            renderGridSelection();
-            updateCommand();
-        }}
-
-        function renderGridSelection() {{
-            const cells = document.querySelectorAll('.grid-cell');
-            cells.forEach(cell => {{
-                const subIdx = parseInt(cell.dataset.idx);
-                const globalIdx = getGlobalIndex(currentIndex, subIdx);
-                
-                cell.className = 'grid-cell'; // Reset logic
-
-                // Active Cursor
-                if (subIdx === activeSubIndex) cell.classList.add('active-cursor');
-
-                // Pending Start
-                if (pendingStart !== -1 && globalIdx === pendingStart) {{
-                    cell.classList.add('pending-start');
-                }}
-
-                // Selected Ranges
-                let isSelected = false;
-                for(const r of ranges) {{
-                    if (globalIdx >= r[0] && globalIdx <= r[1]) {{
-                        isSelected = true;
-                        break;
-                    }}
-                }}
-                if (isSelected) cell.classList.add('selected');
-            }});
-        }}
-
-        function updateCommand() {{
-            document.getElementById('sel-count').innerText = ranges.length;
-            
-            if (ranges.length === 0) {{
-                document.getElementById('ffmpeg-cmd').value = "";
-                return;
-            }}
-
-            let cmds = "#!/bin/bash\\n\\n";
-            let mergeTxtContent = "";
-            let generatedFiles = [];
-
-            ranges.forEach((rng, idx) => {{
-                const startIdx = rng[0];
-                const endIdx = rng[1];
-                const count = endIdx - startIdx + 1;
-                
-                const startSec = startIdx * SECONDS_PER_CELL;
-                const durSec = count * SECONDS_PER_CELL;
-                
-                const outName = `${{videoId}}_part${{idx+1}}.mp4`;
-                generatedFiles.push(outName);
-                
-                cmds += `# Part ${{idx+1}}: ${{formatTime(startSec)}} (Duration: ${{durSec}}s)\\n`;
-                cmds += `ffmpeg -nostdin -ss ${{startSec}} -i "${{m3u8Url}}" -t ${{durSec}} -c copy "${{outName}}" -y\\n`;
-                
-                mergeTxtContent += `file '${{outName}}'\\n`;
-            }});
-            
-            if (generatedFiles.length > 1) {{
-                cmds += "\\n# Merge all parts\\n";
-                // We use printf to create the list file to avoid confusing quote escaping in JS strings
-                cmds += `cat <<EOF > merge_list.txt\\n${{mergeTxtContent}}EOF\\n`;
-                cmds += `ffmpeg -nostdin -f concat -safe 0 -i merge_list.txt -c copy "${{videoId}}_merged.mp4" -y\\n`;
-                cmds += `rm merge_list.txt\\n`;
-                // Optional: cleanup parts
-                // cmds += `rm ${{generatedFiles.join(' ')}}`; 
-            }}
-            
-            document.getElementById('ffmpeg-cmd').value = cmds;
-        }}
-
-        function copyCmd() {{
-            const el = document.getElementById('ffmpeg-cmd');
-            el.select();
-            document.execCommand('copy');
-        }}
-
-        function downloadCmd() {{
-             const content = document.getElementById('ffmpeg-cmd').value;
-             if (!content) return alert("Nothing to download.");
-             
-             const blob = new Blob([content], {{ type: 'text/x-shellscript' }});
-             const url = URL.createObjectURL(blob);
-             const a = document.createElement('a');
-             a.href = url;
-             a.download = 'download.sh';
-             document.body.appendChild(a);
-             a.click();
-             document.body.removeChild(a);
-             URL.revokeObjectURL(url);
-        }}
-
-        function prev() {{ currentIndex--; updateView(); activeSubIndex = null; }}
-        function next() {{ currentIndex++; updateView(); activeSubIndex = null; }}
-        function jumpTo(val) {{ currentIndex = parseInt(val); updateView(); activeSubIndex = null; }}
-
-        document.addEventListener('keydown', (e) => {{
-            // Ignore if in inputs
-            if (e.target.tagName === 'INPUT' || e.target.tagName === 'TEXTAREA') return;
-
-            if (e.key === 'ArrowLeft') prev();
-            if (e.key === 'ArrowRight') next();
-            if (e.key === '1') setStart();
-            if (e.key === '2') setEnd();
-        }});
-
-        updateView();
-    </script>
-</body>
-</html>
-"""
-                    with open("viewer.html", "w", encoding="utf-8") as f:
-                        f.write(html_content)
-                    print("Viewer generated: viewer.html")
-
+                    user_input = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                url = article_url(user_input, base_url)
+                started = time.perf_counter()
+                try:
+                    stream = await resolve_page(page, url, timeout_ms)
+                    error = None
                 except Exception as e:
-                    print(f"Failed to generate viewer: {e}")
+                    stream, error = None, str(e).splitlines()[0] if str(e) else type(e).__name__
+                    # A failed navigation can leave the tab unusable.
+                    await page.close()
+                    page = await new_tab()
+                on_result(user_input, url, stream, error, time.perf_counter() - started)
+            await page.close()
 
-        except Exception as e:
-            print(f"Error: {e}")
+        try:
+            await asyncio.gather(*(tab_worker() for _ in range(max(1, min(tabs, len(inputs))))))
         finally:
-            browser.close()
+            await browser.close()
+
+
+def viewer_context(video_id, source_url, stream, back_url=None):
+    # Shared with app.py, which renders the same template per article.
+    return {
+        "video_id": video_id,
+        "source_url": source_url,
+        "m3u8_url": stream["m3u8_url"],
+        "seek_base": stream["seek_base"],
+        "num_snapshots": stream["snapshots"] or 1,
+        "back_url": back_url,
+    }
+
+
+def render_viewer_html(video_id, source_url, stream):
+    from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=select_autoescape())
+    return env.get_template("viewer.html").render(viewer_context(video_id, source_url, stream))
+
+
+def write_viewer(user_input, url, stream, path="viewer.html"):
+    html_content = render_viewer_html(article_id_from_input(user_input), url, stream)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html_content)
+
+
+def pending_stream_ids(conn, limit, max_age):
+    rows = conn.execute(
+        """
+        SELECT a.id
+        FROM articles a
+        LEFT JOIN stream_metadata s ON s.article_id = a.id
+        WHERE a.downloaded = 1 AND COALESCE(a.dislike, 0) = 0
+          AND (s.article_id IS NULL OR s.resolved_at < ?)
+        ORDER BY a.id COLLATE NOCASE
+        LIMIT ?
+        """,
+        (time.time() - max_age, limit),
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+def stored_stream(conn, user_input, args):
+    if args.no_cache:
+        return None
+    return load_stream_metadata(conn, article_id_from_input(user_input), max_age=args.max_age * 86400)
+
+
+def store_stream(conn, user_input, stream, resolved_at=None):
+    save_stream_metadata(
+        conn,
+        article_id_from_input(user_input),
+        stream["uuid"],
+        stream["resolution"],
+        stream["m3u8_url"],
+        stream["duration_seconds"],
+        resolved_at,
+    )
+    # Article pages show the stream; let the web app re-render them.
+    bump_generation(conn)
+
+
+def stream_record(user_input, url, stream, error, elapsed):
+    record = {"id": article_id_from_input(user_input), "url": url}
+    for key in ("m3u8_url", "uuid", "resolution", "seek_base", "duration", "duration_seconds", "snapshots"):
+        record[key] = stream.get(key) if stream else None
+    record["resolved_at"] = time.time()
+    record["elapsed"] = round(elapsed, 3)
+    record["error"] = error
+    return record
+
+
+def run_single(user_input, args, conn):
+    url = article_url(user_input, args.base_url)
+    print(f"Target URL: {url}")
+    stream = stored_stream(conn, user_input, args)
+    if stream is not None:
+        resolved_on = time.strftime("%Y-%m-%d", time.localtime(stream["resolved_at"]))
+        print(f"[INFO] Using stored stream metadata from {resolved_on}")
+    else:
+        found = {}
+
+        def on_result(user_input, url, stream, error, elapsed):
+            found["stream"], found["error"] = stream, error
+
+        try:
+            asyncio.run(
+                resolve_streams([user_input], on_result, 1, int(args.timeout * 1000), args.base_url, args.headed)
+            )
+        except RuntimeError as e:
+            print(f"[ERROR] {e}")
+            sys.exit(1)
+
+        stream = found.get("stream")
+        if stream is None:
+            print(f"Stream URL: Not Found ({found.get('error')})")
+            sys.exit(1)
+        store_stream(conn, user_input, stream)
+        conn.commit()
+    print(f"Stream URL: {stream['m3u8_url']}")
+    print(f"Seek URL: {stream['seek_base']}/_0.jpg")
+    print(f"Duration: {stream['duration'] or 'Not Found'}")
+    if stream["duration_seconds"] is not None:
+        print(f"Total Seconds: {stream['duration_seconds']}, Snapshots: {stream['snapshots']}")
+        write_viewer(user_input, url, stream)
+        print("Viewer generated: viewer.html")
+
+
+def run_batch(inputs, args, conn):
+    jsonl = open(args.jsonl, "a", encoding="utf-8") if args.jsonl else None
+    batcher = CommitBatcher(conn, every=20)
+    counts = {"stored": 0, "resolved": 0, "failed": 0}
+
+    def emit(record):
+        if jsonl is not None:
+            jsonl.write(json.dumps(record, ensure_ascii=False) + "\n")
+            jsonl.flush()
+
+    def on_result(user_input, url, stream, error, elapsed):
+        record = stream_record(user_input, url, stream, error, elapsed)
+        if stream is None:
+            counts["failed"] += 1
+            print(f"[WARN] {record['id']}: {error} ({elapsed:.1f}s)")
+        else:
+            counts["resolved"] += 1
+            print(f"[DONE] {record['id']}: {stream['m3u8_url']} {stream['duration'] or '?'} ({elapsed:.1f}s)")
+            store_stream(conn, user_input, stream, record["resolved_at"])
+            batcher.note()
+        emit(record)
+
+    started = time.perf_counter()
+    to_resolve = []
+    for user_input in inputs:
+        stream = stored_stream(conn, user_input, args)
+        if stream is None:
+            to_resolve.append(user_input)
+            continue
+        counts["stored"] += 1
+        record = stream_record(user_input, article_url(user_input, args.base_url), stream, None, 0.0)
+        record["resolved_at"] = stream["resolved_at"]
+        emit(record)
+    if counts["stored"]:
+        print(f"[SKIP] {counts['stored']} ids already have stream metadata")
+
+    try:
+        if to_resolve:
+            print(f"[INFO] Resolving {len(to_resolve)} ids with {args.tabs} tabs")
+            asyncio.run(
+                resolve_streams(
+                    to_resolve, on_result, args.tabs, int(args.timeout * 1000), args.base_url, args.headed
+                )
+            )
+    finally:
+        batcher.commit()
+        if jsonl is not None:
+            jsonl.close()
+    elapsed = time.perf_counter() - started
+    print(
+        f"[DONE] {counts['stored']} stored, {counts['resolved']} resolved, {counts['failed']} failed "
+        f"in {elapsed:.1f}s ({len(to_resolve) / elapsed * 60:.0f} resolved ids/min with {args.tabs} tabs)"
+    )
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        description="Resolve MissAV stream URLs, seek-sprite bases and durations.",
+        epilog="With a single id and no batch options, also writes viewer.html.",
+    )
+    parser.add_argument("ids", nargs="*", help="Ids or article URLs")
+    parser.add_argument("--stdin", action="store_true", help="Also read ids from stdin, one per line")
+    parser.add_argument(
+        "--from-db",
+        action="store_true",
+        help="Also take downloaded, not disliked articles that have no stream metadata yet",
+    )
+    parser.add_argument("--limit", type=int, default=200, help="Maximum ids taken by --from-db (default: 200)")
+    parser.add_argument("--db", help="SQLite library (default: MISSAV_DB_PATH or missav_title.db)")
+    parser.add_argument("--tabs", type=int, default=4, help="Concurrent tabs in the shared browser (default: 4)")
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=15.0,
+        help="Seconds to wait for the stream string on one page (default: 15)",
+    )
+    parser.add_argument("--jsonl", help="Append one JSON result per id to this file")
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=STREAM_METADATA_TTL / 86400,
+        help=f"Days stored stream metadata stays valid (default: {STREAM_METADATA_TTL // 86400})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Resolve every id in the browser even if stream_metadata has it",
+    )
+    parser.add_argument(
+        "--base-url", default=DEFAULT_BASE_URL, help=f"Article URL prefix (default: {DEFAULT_BASE_URL})"
+    )
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    return parser
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    if args.tabs < 1:
+        print("[ERROR] --tabs must be >= 1")
+        sys.exit(1)
+    if args.timeout <= 0:
+        print("[ERROR] --timeout must be > 0")
+        sys.exit(1)
+
+    if args.max_age < 0:
+        print("[ERROR] --max-age must be >= 0")
+        sys.exit(1)
+
+    batch = args.stdin or args.from_db or args.jsonl or len(args.ids) > 1
+    if not batch and not args.ids:
+        print("Usage: python miss_thumb.py <url_or_id> | [--stdin] [--from-db] [--jsonl FILE] [ids...]")
+        sys.exit(1)
+
+    conn = connect_sqlite(args.db or get_sqlite_db_path(BASE_DIR))
+    ensure_schema(conn)
+    try:
+        if not batch:
+            run_single(args.ids[0], args, conn)
+            return
+        inputs = list(args.ids)
+        if args.stdin:
+            inputs += [line.strip() for line in sys.stdin if line.strip() and not line.startswith("#")]
+        if args.from_db:
+            inputs += pending_stream_ids(conn, args.limit, 0 if args.no_cache else args.max_age * 86400)
+        inputs = list(dict.fromkeys(inputs))
+        if not inputs:
+            print("[SKIP] No ids to resolve")
+            return
+        try:
+            run_batch(inputs, args, conn)
+        except RuntimeError as e:
+            print(f"[ERROR] {e}")
+            sys.exit(1)
+    finally:
+        conn.close()
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -3,9 +3,14 @@ CREATE TABLE IF NOT EXISTS articles (
     title TEXT NOT NULL,
     description TEXT,
     cover TEXT,
-    dislike INTEGER NOT NULL DEFAULT 0
+    dislike INTEGER NOT NULL DEFAULT 0,
+    -- 1 once the article page has been fetched; 0 for ref placeholders.
+    downloaded INTEGER NOT NULL DEFAULT 0
 );
 
+CREATE INDEX IF NOT EXISTS idx_articles_downloaded ON articles(downloaded, dislike);
+CREATE INDEX IF NOT EXISTS idx_articles_listing ON articles(downloaded, id COLLATE NOCASE, id);
+
 CREATE TABLE IF NOT EXISTS article_refs (
     from_article_id TEXT REFERENCES articles(id) ON DELETE CASCADE,
     to_article_id TEXT REFERENCES articles(id) ON DELETE CASCADE,
@@ -27,3 +32,98 @@ CREATE TABLE IF NOT EXISTS article_tags (
 
 CREATE INDEX IF NOT EXISTS idx_article_tags_article ON article_tags(article_id);
 CREATE INDEX IF NOT EXISTS idx_article_tags_tag ON article_tags(tag_id);
+
+-- Downloaded articles per tag (`visible` excludes disliked ones), kept
+-- current by the crawler's write path and the dislike toggle.
+CREATE TABLE IF NOT EXISTS tag_counts (
+    tag_id INTEGER PRIMARY KEY REFERENCES tags(id) ON DELETE CASCADE,
+    articles INTEGER NOT NULL DEFAULT 0,
+    visible INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS cover_queue (
+    article_id TEXT PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE,
+    url TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    queued_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS crawl_frontier (
+    article_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'pending',
+    depth INTEGER NOT NULL DEFAULT 0,
+    priority INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_crawl_frontier_next
+    ON crawl_frontier(status, priority DESC, depth, next_attempt_at);
+
+CREATE TABLE IF NOT EXISTS page_archive (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    article_id TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    content_hash TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    codec TEXT NOT NULL,
+    raw_size INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_page_archive_article ON page_archive(article_id, fetched_at DESC);
+
+CREATE TABLE IF NOT EXISTS fetch_state (
+    article_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT,
+    checked_at REAL NOT NULL,
+    changed_at REAL,
+    unchanged_count INTEGER NOT NULL DEFAULT 0,
+    next_check_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    PRIMARY KEY (article_id, kind)
+);
+
+CREATE INDEX IF NOT EXISTS idx_fetch_state_next ON fetch_state(kind, next_check_at);
+
+-- Search index for the web app. Trigram tokens match Japanese titles and
+-- tags by substring, case-insensitively. Rebuild with
+-- `python get_missav_titles.py reindex`.
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    article_id, title, description, tags, tokenize = 'trigram'
+);
+
+-- Applied migrations (see SCHEMA_MIGRATIONS in get_missav_titles.py).
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Bumped by every write the web app renders; keys its response cache.
+CREATE TABLE IF NOT EXISTS library_generation (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    generation INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO library_generation (id, generation) VALUES (1, 0);
+
+-- Resolved by miss_thumb.py: stream and seek-sprite location per video,
+-- reused until STREAM_METADATA_TTL.
+CREATE TABLE IF NOT EXISTS stream_metadata (
+    article_id VARCHAR(50) PRIMARY KEY,
+    uuid TEXT NOT NULL,
+    resolution TEXT,
+    m3u8_url TEXT NOT NULL,
+    duration_seconds INTEGER,
+    resolved_at REAL NOT NULL,
+    snapshot_count INTEGER
+);
@@ -0,0 +1,64 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+# app.py builds a module-level app from these at import; keep it away from
+# the real library next to the sources.
+SCRATCH_DIR = tempfile.mkdtemp(prefix="missav-tests-")
+for name, default in (("DB_PATH", "library.db"), ("COVERS_DIR", "covers"), ("SEEKS_DIR", "seeks")):
+    os.environ[f"MISSAV_{name}"] = os.path.join(SCRATCH_DIR, default)
+
+import get_missav_titles as crawler  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "library.db")
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = crawler.connect_sqlite(db_path)
+    crawler.ensure_schema(conn)
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def make_app(db_path, tmp_path):
+    import app as app_module
+
+    def make(**config):
+        return app_module.create_app(
+            db_path=db_path, covers_dir=str(tmp_path / "covers"), seeks_dir=str(tmp_path / "seeks"), **config
+        )
+
+    return make
+
+
+def add_article(conn, article_id, keywords=(), refs=(), title=None):
+    crawler.write_article(conn, article_id, title or article_id.upper(), "", None, list(keywords), list(refs))
+
+
+@pytest.fixture
+def fixture_site(monkeypatch):
+    """fixture_server on a free port; seek sheets are fetched from it too."""
+    import threading
+
+    import fixture_server
+
+    server = fixture_server.make_server(port=0)
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setattr(crawler, "seek_base_url", lambda uuid: f"{server.url}/{uuid}/seek")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,57 @@
+import sqlite3
+
+import pytest
+from werkzeug.test import Client, EnvironBuilder
+
+import app as app_module
+
+
+def start_request(wsgi_app, path="/"):
+    # Run a request up to the point where its body is still being sent.
+    statuses = []
+    body = wsgi_app(EnvironBuilder(path=path).get_environ(), lambda status, headers, *a: statuses.append(status))
+    return statuses[0], body
+
+
+def get_status(wsgi_app, path="/"):
+    # Closing the response is what a WSGI server does once it is sent.
+    response = Client(wsgi_app).get(path)
+    response.close()
+    return response.status_code
+
+
+def test_reload_closes_the_old_library(conn, make_app):
+    wsgi_app = app_module.ReloadableApp(make_app)
+    assert get_status(wsgi_app) == 200
+    old = wsgi_app.app.extensions["missav"]
+    read_conn = old.read_connection()
+    old.stream_resolver.request("abc-001")
+    resolver_thread = old.stream_resolver._thread
+    old.seek_cache.prefetch("uu-1", "http://127.0.0.1:9/seek", 0, 1)
+
+    wsgi_app.reload()
+
+    assert wsgi_app.app.extensions["missav"] is not old
+    resolver_thread.join(5)
+    assert not resolver_thread.is_alive()
+    assert old.seek_cache._executor is None
+    with pytest.raises(sqlite3.ProgrammingError):
+        read_conn.execute("SELECT 1")
+    assert get_status(wsgi_app) == 200
+
+
+def test_reload_waits_for_running_requests(conn, make_app):
+    wsgi_app = app_module.ReloadableApp(make_app)
+    status, body = start_request(wsgi_app)
+    assert status.startswith("200")
+    old = wsgi_app.app.extensions["missav"]
+
+    wsgi_app.reload()
+    assert old._read_conns, "closed while a request was still running"
+    new_status, new_body = start_request(wsgi_app)
+    new_body.close()
+
+    b"".join(body)
+    body.close()
+    assert old._read_conns == []
+    assert wsgi_app.app.extensions["missav"]._read_conns
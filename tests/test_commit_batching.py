@@ -0,0 +1,53 @@
+import sqlite3
+
+import get_missav_titles as crawler
+from conftest import add_article
+
+
+def visible_articles(db_path):
+    reader = sqlite3.connect(db_path)
+    try:
+        return reader.execute("SELECT COUNT(*) FROM articles WHERE downloaded = 1").fetchone()[0]
+    finally:
+        reader.close()
+
+
+def test_savepoints_stay_inside_the_batch(conn, db_path):
+    batcher = crawler.CommitBatcher(conn, every=20, interval=float("inf"))
+    for i in range(5):
+        with crawler.savepoint(conn):
+            add_article(conn, f"abc-{i:03d}")
+        batcher.note()
+        assert conn.in_transaction
+        assert visible_articles(db_path) == 0
+
+    batcher.commit()
+    assert visible_articles(db_path) == 5
+
+
+def test_batcher_commits_every_n_articles(conn, db_path):
+    batcher = crawler.CommitBatcher(conn, every=3, interval=float("inf"))
+    seen = []
+    for i in range(7):
+        with crawler.savepoint(conn):
+            add_article(conn, f"abc-{i:03d}")
+        batcher.note()
+        seen.append(visible_articles(db_path))
+    assert seen == [0, 0, 3, 3, 3, 6, 6]
+
+
+def test_failed_savepoint_keeps_the_rest_of_the_batch(conn, db_path):
+    batcher = crawler.CommitBatcher(conn, every=20, interval=float("inf"))
+    with crawler.savepoint(conn):
+        add_article(conn, "abc-001")
+    try:
+        with crawler.savepoint(conn):
+            add_article(conn, "abc-002")
+            raise RuntimeError("parse failed halfway")
+    except RuntimeError:
+        pass
+    assert conn.in_transaction
+    batcher.commit()
+
+    ids = [r[0] for r in conn.execute("SELECT id FROM articles WHERE downloaded = 1")]
+    assert ids == ["abc-001"]
@@ -0,0 +1,57 @@
+import os
+import stat
+from concurrent.futures import ProcessPoolExecutor
+
+import get_missav_titles as crawler
+
+
+def write_many(task):
+    path, marker = task
+    payload = bytes([marker]) * 200_000
+    for _ in range(30):
+        crawler.write_cover_file(path, payload)
+    return marker
+
+
+def test_concurrent_writers_from_several_processes(tmp_path):
+    path = str(tmp_path / "abc-001.jpg")
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        list(executor.map(write_many, [(path, marker) for marker in range(1, 5)]))
+
+    with open(path, "rb") as f:
+        data = f.read()
+    # One writer's whole file, never a mix or a truncated one.
+    assert len(data) == 200_000 and len(set(data)) == 1
+    assert os.listdir(tmp_path) == ["abc-001.jpg"]
+
+
+def test_cover_files_are_world_readable(tmp_path):
+    path = str(tmp_path / "abc-001.jpg")
+    crawler.write_cover_file(path, b"jpg")
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+
+
+def get_cover(client, path):
+    response = client.get(path)
+    response.get_data()
+    response.close()
+    return response
+
+
+def test_only_the_current_cover_version_is_immutable(make_app, tmp_path):
+    covers = tmp_path / "covers"
+    covers.mkdir()
+    crawler.write_cover_file(str(covers / "abc-001.jpg"), b"jpg")
+    version = f"{int(os.path.getmtime(covers / 'abc-001.jpg')):x}"
+    client = make_app().test_client()
+
+    current = get_cover(client, f"/covers/abc-001.jpg?v={version}")
+    assert current.status_code == 200
+    assert current.cache_control.immutable
+    assert current.cache_control.max_age == 365 * 86400
+
+    for path in ("/covers/abc-001.jpg?v=0", "/covers/abc-001.jpg"):
+        response = get_cover(client, path)
+        assert response.status_code == 200
+        assert not response.cache_control.immutable
+        assert response.cache_control.no_cache
@@ -0,0 +1,126 @@
+import time
+from urllib.error import HTTPError, URLError
+
+import pytest
+
+import get_missav_titles as crawler
+
+
+def http_error(code):
+    return HTTPError("https://missav.ai/ja/x", code, "status", {}, None)
+
+
+def frontier_row(conn, article_id):
+    return conn.execute(
+        "SELECT status, attempts FROM crawl_frontier WHERE article_id = ?", (article_id,)
+    ).fetchone()
+
+
+@pytest.mark.parametrize("code", [404, 410, 400])
+def test_missing_pages_fail_on_first_attempt(conn, code):
+    crawler.frontier_push(conn, ["gone-001"], 1)
+    assert crawler.frontier_fail(conn, "gone-001", http_error(code)) is None
+    assert frontier_row(conn, "gone-001") == (crawler.FRONTIER_FAILED, 1)
+
+
+@pytest.mark.parametrize(
+    "error",
+    [http_error(429), http_error(403), http_error(503), URLError("timed out"), ConnectionResetError()],
+)
+def test_throttling_and_transient_errors_back_off(conn, error):
+    crawler.frontier_push(conn, ["busy-001"], 1)
+    delay = crawler.frontier_fail(conn, "busy-001", error)
+    assert delay is not None and delay > 0
+    assert frontier_row(conn, "busy-001") == (crawler.FRONTIER_PENDING, 1)
+
+
+def test_transient_errors_give_up_after_max_attempts(conn):
+    crawler.frontier_push(conn, ["busy-001"], 1)
+    for _ in range(2):
+        crawler.frontier_fail(conn, "busy-001", http_error(503), max_attempts=3)
+    assert crawler.frontier_fail(conn, "busy-001", http_error(503), max_attempts=3) is None
+    assert frontier_row(conn, "busy-001") == (crawler.FRONTIER_FAILED, 3)
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+        self.status_text = "status"
+        self.headers = {"retry-after": "7"}
+
+
+class FakePage:
+    def __init__(self, status, content):
+        self.response = FakeResponse(status)
+        self.html = content
+
+    def goto(self, url, wait_until=None, timeout=None):
+        return self.response
+
+    def wait_for_load_state(self, state, timeout=None):
+        pass
+
+    def content(self):
+        return self.html
+
+
+ARTICLE_HTML = '<html><head><meta property="og:title" content="T"></head></html>'
+
+
+@pytest.mark.parametrize("status", [404, 429, 503])
+def test_browser_error_statuses_raise(status):
+    with pytest.raises(HTTPError) as raised:
+        crawler.load_page_content(FakePage(status, ARTICLE_HTML), "https://missav.ai/ja/x", 1000)
+    assert raised.value.code == status
+
+
+def test_browser_403_only_raises_when_the_challenge_stays():
+    url = "https://missav.ai/ja/x"
+    assert crawler.load_page_content(FakePage(403, ARTICLE_HTML), url, 1000) == ARTICLE_HTML
+    with pytest.raises(HTTPError):
+        crawler.load_page_content(FakePage(403, "<html>Just a moment...</html>"), url, 1000)
+
+
+def test_browser_throttling_reaches_the_rate_limiter():
+    limiter = crawler.HostRateLimiter(rate=4.0)
+    url = "https://missav.ai/ja/x"
+    with pytest.raises(HTTPError):
+        with crawler.rate_limited(limiter, url):
+            crawler.load_page_content(FakePage(429, ARTICLE_HTML), url, 1000)
+    state = limiter._hosts["missav.ai"]
+    assert state["throttled"] == 1
+    assert state["rate"] == 2.0
+
+
+def test_crawl_does_not_retry_missing_refs(tmp_path, db_path, fixture_site, monkeypatch):
+    monkeypatch.setenv("MISSAV_DB_PATH", db_path)
+    # Keep covers and the page archive out of the source tree.
+    monkeypatch.setattr(crawler, "__file__", str(tmp_path / "get_missav_titles.py"))
+
+    started = time.monotonic()
+    crawler.crawl_single(
+        "hunta-881",
+        limit_count=5,
+        debug_flag=False,
+        fetch_mode="http",
+        base_url=f"{fixture_site.url}/ja",
+        rate=200.0,
+        max_rate=200.0,
+        thumbnails=False,
+    )
+    elapsed = time.monotonic() - started
+
+    conn = crawler.connect_sqlite(db_path)
+    counts = crawler.frontier_counts(conn)
+    attempts = conn.execute(
+        "SELECT MAX(attempts) FROM crawl_frontier WHERE status = ?", (crawler.FRONTIER_FAILED,)
+    ).fetchone()[0]
+    conn.close()
+    # The fixture site only has a few saved pages; every ref of hunta-881
+    # that is not one of them is a 404 and is given up on at once.
+    assert counts.get(crawler.FRONTIER_DONE, 0) >= 1
+    assert counts.get(crawler.FRONTIER_FAILED, 0) >= 1
+    assert counts.get(crawler.FRONTIER_PENDING, 0) == 0
+    assert attempts == 1
+    assert elapsed < crawler.RETRY_WAIT_LIMIT
+    assert (tmp_path / "covers" / "hunta-881.jpg").exists()
@@ -0,0 +1,68 @@
+import get_missav_titles as crawler
+from conftest import add_article
+
+
+SEED_PRIORITY = crawler.FRONTIER_SEED_PRIORITY
+
+
+def claim(conn, limit=50):
+    return crawler.frontier_claim(conn, limit, now=float("inf"))
+
+
+def import_library(conn, articles=()):
+    # old-001 was crawled earlier and left two unrelated placeholders.
+    add_article(conn, "old-001", refs=["far-001", "far-002"])
+    for article_id, refs in articles:
+        add_article(conn, article_id, refs=refs)
+    crawler.frontier_bootstrap(conn)
+
+
+def test_seed_refs_are_claimed_before_imported_placeholders(conn):
+    import_library(conn)
+    crawler.frontier_add_seed(conn, "seed-001")
+    assert [c[0] for c in claim(conn, 1)] == ["seed-001"]
+
+    # crawl_single pushes a page's refs at the priority it was claimed with;
+    # far-002 was already pending and is promoted.
+    crawler.frontier_push(conn, ["near-001", "near-002", "far-002"], 1, SEED_PRIORITY)
+    claimed = claim(conn)
+    assert {c[0] for c in claimed[:3]} == {"near-001", "near-002", "far-002"}
+    assert all(c[1:] == (1, SEED_PRIORITY) for c in claimed[:3])
+    assert claimed[3] == ("far-001", 1, 0)
+
+
+def test_lower_priority_push_does_not_demote(conn):
+    import_library(conn)
+    crawler.frontier_push(conn, ["near-001"], 1, SEED_PRIORITY)
+    crawler.frontier_push(conn, ["near-001"], 3)
+    assert ("near-001", 1, SEED_PRIORITY) in claim(conn)
+
+
+def test_push_keeps_done_rows_done(conn):
+    import_library(conn)
+    crawler.frontier_push(conn, ["old-001"], 1, SEED_PRIORITY)
+    assert "old-001" not in [c[0] for c in claim(conn)]
+
+
+def test_downloaded_seed_requeues_its_refs_breadth_first(conn):
+    import_library(
+        conn,
+        [("seed-001", ["near-001", "mid-001"]), ("mid-001", ["near-002", "seed-001"])],
+    )
+
+    assert crawler.frontier_add_seed(conn, "seed-001") == 2
+
+    claimed = claim(conn)
+    assert claimed[:2] == [("near-001", 1, SEED_PRIORITY), ("near-002", 2, SEED_PRIORITY)]
+    assert {c[0] for c in claimed[2:]} == {"far-001", "far-002"}
+
+
+def test_failed_seed_gets_another_chance(conn):
+    import_library(conn)
+    crawler.frontier_push(conn, ["seed-001"], 1)
+    crawler.frontier_fail(conn, "seed-001", "boom", max_attempts=1)
+    assert "seed-001" not in [c[0] for c in claim(conn)]
+    crawler.frontier_release(conn)
+
+    crawler.frontier_add_seed(conn, "seed-001")
+    assert claim(conn, 1) == [("seed-001", 1, SEED_PRIORITY)]
@@ -0,0 +1,114 @@
+import html
+import re
+from urllib.parse import parse_qs, urlsplit
+
+from conftest import add_article
+
+
+def listing(client, path):
+    response = client.get(path)
+    body = response.get_data(as_text=True)
+    response.close()
+    assert response.status_code == 200
+    ids = re.findall(r'<p class="card-id">(.*?)</p>', body)
+    links = {}
+    for href, label in re.findall(r'<a href="([^"]*)">(Prev|Next|Last)</a>', body):
+        href = html.unescape(href)
+        links[label] = href
+    return ids, links
+
+
+def cursor(href, name):
+    return parse_qs(urlsplit(href).query)[name][0]
+
+
+def add_listing(conn, count=60):
+    # Alternate the case so the NOCASE order differs from the binary one.
+    ids = [f"{'abc' if n % 2 else 'ABC'}-{n:03d}" for n in range(count)]
+    for article_id in ids:
+        add_article(conn, article_id, title=f"Title {article_id}")
+    conn.commit()
+    return ids
+
+
+def test_next_pages_follow_the_nocase_order(conn, make_app):
+    ids = add_listing(conn)
+    client = make_app().test_client()
+
+    first, links = listing(client, "/")
+    assert first == ids[:24]
+    assert "Prev" not in links
+
+    second, links = listing(client, links["Next"])
+    assert second == ids[24:48]
+    assert cursor(links["Prev"], "before") == ids[24]
+
+    third, links = listing(client, links["Next"])
+    assert third == ids[48:]
+    assert "Next" not in links
+
+
+def test_prev_returns_to_the_previous_page(conn, make_app):
+    ids = add_listing(conn)
+    client = make_app().test_client()
+
+    _, links = listing(client, "/")
+    _, links = listing(client, links["Next"])
+    _, links = listing(client, links["Next"])
+
+    back, links = listing(client, links["Prev"])
+    assert back == ids[24:48]
+    assert cursor(links["Next"], "after") == ids[47]
+
+    back, links = listing(client, links["Prev"])
+    assert back == ids[:24]
+    assert "Prev" not in links
+
+
+def test_last_shows_the_final_page(conn, make_app):
+    ids = add_listing(conn)
+    client = make_app().test_client()
+
+    _, links = listing(client, "/")
+    last, links = listing(client, links["Last"])
+
+    # Read backwards from the end, so the last page is full rather than the
+    # 12-row remainder of forward paging.
+    assert last == ids[-24:]
+    assert "Next" not in links
+    earlier, _ = listing(client, links["Prev"])
+    assert earlier == ids[-48:-24]
+
+
+def test_disliked_articles_are_skipped_between_pages(conn, make_app):
+    ids = add_listing(conn, count=30)
+    conn.execute("UPDATE articles SET dislike = 1 WHERE id IN (?, ?)", (ids[23], ids[24]))
+    conn.commit()
+    visible = [article_id for article_id in ids if article_id not in (ids[23], ids[24])]
+    client = make_app().test_client()
+
+    first, links = listing(client, "/")
+    assert first == visible[:24]
+    second, links = listing(client, links["Next"])
+    assert second == visible[24:]
+    assert "Next" not in links
+
+
+def test_tags_differing_in_case_count_each_article_once(conn, make_app):
+    ids = [f"abc-{n:03d}" for n in range(30)]
+    for article_id in ids:
+        add_article(conn, article_id, ["Drama", "drama"])
+    add_article(conn, "abc-100", ["drama"])
+    conn.commit()
+    client = make_app().test_client()
+
+    response = client.get("/?tag=DRAMA")
+    body = response.get_data(as_text=True)
+    response.close()
+    assert "Total: <strong>31</strong> articles" in body
+
+    _, links = listing(client, "/?tag=DRAMA")
+    response = client.get(links["Last"])
+    body = response.get_data(as_text=True)
+    response.close()
+    assert '<span class="current">2</span>' in body
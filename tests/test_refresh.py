@@ -0,0 +1,43 @@
+import get_missav_titles as crawler
+
+
+def crawl_and_refresh(tmp_path, db_path, fixture_site, monkeypatch, capsys, due_now=False):
+    monkeypatch.setenv("MISSAV_DB_PATH", db_path)
+    monkeypatch.setattr(crawler, "__file__", str(tmp_path / "get_missav_titles.py"))
+    base_url = f"{fixture_site.url}/ja"
+    crawler.crawl_single(
+        "hunta-881",
+        limit_count=1,
+        debug_flag=False,
+        fetch_mode="http",
+        base_url=base_url,
+        rate=200.0,
+        max_rate=200.0,
+        thumbnails=False,
+    )
+    if due_now:
+        conn = crawler.connect_sqlite(db_path)
+        conn.execute("UPDATE fetch_state SET next_check_at = 0")
+        conn.commit()
+        conn.close()
+    capsys.readouterr()
+    crawler.refresh_library(10, "http", base_url=base_url, rate=200.0, max_rate=200.0)
+    return capsys.readouterr().out
+
+
+def test_crawl_records_the_first_fetch(tmp_path, db_path, fixture_site, monkeypatch, capsys):
+    out = crawl_and_refresh(tmp_path, db_path, fixture_site, monkeypatch, capsys)
+
+    assert "[INFO] 0 page(s) due for revalidation" in out
+    assert "[INFO] 0 cover(s) due for revalidation" in out
+    assert "downloaded 0 byte(s)" in out
+
+
+def test_first_revisit_is_conditional(tmp_path, db_path, fixture_site, monkeypatch, capsys):
+    out = crawl_and_refresh(tmp_path, db_path, fixture_site, monkeypatch, capsys, due_now=True)
+
+    assert "[INFO] 1 page(s) due for revalidation" in out
+    assert "[INFO] 1 cover(s) due for revalidation" in out
+    assert "[DONE] pages: 1 not modified (304), 0 unchanged, 0 changed" in out
+    assert "[DONE] covers: 1 not modified (304), 0 unchanged, 0 changed" in out
+    assert "downloaded 0 byte(s)" in out
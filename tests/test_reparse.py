@@ -0,0 +1,82 @@
+import os
+import shutil
+
+import get_missav_titles as crawler
+from conftest import SRC_DIR
+
+
+def traced_commits(monkeypatch):
+    statements = []
+    connect = crawler.connect_sqlite
+
+    def connect_traced(db_path):
+        conn = connect(db_path)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(crawler, "connect_sqlite", connect_traced)
+    return statements
+
+
+def reparse_commits(statements):
+    # Commits from the first article write onwards; schema setup comes before.
+    first = next(i for i, sql in enumerate(statements) if sql.startswith("SAVEPOINT"))
+    return sum(1 for sql in statements[first:] if sql.strip().upper() == "COMMIT")
+
+
+def copy_debug_pages(tmp_path):
+    pages = tmp_path / "pages"
+    pages.mkdir()
+    for name in os.listdir(os.path.join(SRC_DIR, "debug")):
+        if name.endswith(".html"):
+            shutil.copy(os.path.join(SRC_DIR, "debug", name), pages / name)
+    return str(pages)
+
+
+def test_reparse_commits_once_per_batch(tmp_path, db_path, monkeypatch):
+    monkeypatch.setenv("MISSAV_DB_PATH", db_path)
+    pages = copy_debug_pages(tmp_path)
+    statements = traced_commits(monkeypatch)
+
+    crawler.reparse_pages(pages, workers=1, commit_every=2)
+
+    conn = crawler.connect_sqlite(db_path)
+    written = conn.execute("SELECT COUNT(*) FROM articles WHERE downloaded = 1").fetchone()[0]
+    conn.close()
+    assert written >= 3
+    # One commit per two pages, plus the final one.
+    assert reparse_commits(statements) == written // 2 + 1
+
+
+def test_reparse_single_batch_commits_once(tmp_path, db_path, monkeypatch):
+    monkeypatch.setenv("MISSAV_DB_PATH", db_path)
+    pages = copy_debug_pages(tmp_path)
+    statements = traced_commits(monkeypatch)
+
+    crawler.reparse_pages(pages, workers=1, commit_every=200)
+
+    assert reparse_commits(statements) == 1
+
+
+def test_reparse_skips_a_page_that_fails_to_write(tmp_path, db_path, monkeypatch, capsys):
+    monkeypatch.setenv("MISSAV_DB_PATH", db_path)
+    pages = copy_debug_pages(tmp_path)
+    write_article = crawler.write_article
+
+    def failing_write_article(conn, article_id, *args):
+        write_article(conn, article_id, *args)
+        if article_id == "huntb-604":
+            raise ValueError("bad keyword")
+
+    monkeypatch.setattr(crawler, "write_article", failing_write_article)
+
+    crawler.reparse_pages(pages, workers=1, commit_every=200)
+
+    conn = crawler.connect_sqlite(db_path)
+    written = {row[0] for row in conn.execute("SELECT id FROM articles WHERE downloaded = 1")}
+    conn.close()
+    assert "huntb-604" not in written
+    assert {"hunta-881", "huntc-233-uncensored-leak"} <= written
+    out = capsys.readouterr().out
+    assert "[WARN] Failed to write huntb-604: bad keyword" in out
+    assert "[DONE] Reparsed 2 page(s)" in out
@@ -0,0 +1,143 @@
+import os
+
+import get_missav_titles as crawler
+from conftest import add_article
+
+
+def write_pack(path, sheets, close=True):
+    pack = crawler.SeekPack(str(path))
+    pack.open_append()
+    for sheet in sheets:
+        pack.append(sheet, f"sheet-{sheet}".encode() * 10)
+    if close:
+        pack.close()
+    else:
+        pack._handle.close()
+    return pack
+
+
+def test_closed_pack_is_read_through_its_trailer(tmp_path):
+    path = tmp_path / "uu-1.pack"
+    write_pack(path, [2, 0, 1])
+
+    with open(path, "rb") as f:
+        f.seek(-crawler.SeekPack.TRAILER.size, os.SEEK_END)
+        assert f.read()[-4:] == crawler.SeekPack.TRAILER_MAGIC
+    pack = crawler.SeekPack.load(str(path))
+    assert sorted(pack.index) == [0, 1, 2]
+    assert pack.read(1) == b"sheet-1" * 10
+
+
+def test_unclosed_pack_is_indexed_by_walking_records(tmp_path):
+    path = tmp_path / "uu-1.pack"
+    write_pack(path, [0, 1, 2], close=False)
+    pack = crawler.SeekPack.load(str(path))
+    assert sorted(pack.index) == [0, 1, 2]
+    assert pack.read(2) == b"sheet-2" * 10
+
+
+def test_torn_last_record_is_dropped_and_refilled(tmp_path):
+    path = tmp_path / "uu-1.pack"
+    full = write_pack(path, [0, 1, 2], close=False)
+    with open(path, "r+b") as f:
+        f.truncate(full.data_end - 5)
+
+    pack = crawler.SeekPack.load(str(path))
+    assert sorted(pack.index) == [0, 1]
+
+    pack.open_append()
+    pack.append(2, b"again")
+    pack.close()
+    pack = crawler.SeekPack.load(str(path))
+    assert sorted(pack.index) == [0, 1, 2]
+    assert pack.read(0) == b"sheet-0" * 10
+    assert pack.read(2) == b"again"
+
+
+def test_reopening_appends_after_the_old_index(tmp_path):
+    path = tmp_path / "uu-1.pack"
+    write_pack(path, [0])
+    pack = crawler.SeekPack.load(str(path))
+    pack.open_append()
+    assert not pack.append(0, b"duplicate")
+    pack.append(1, b"one")
+    pack.close()
+
+    pack = crawler.SeekPack.load(str(path))
+    assert pack.read(0) == b"sheet-0" * 10
+    assert pack.read(1) == b"one"
+    assert os.path.getsize(path) == pack.data_end + 2 * pack.ENTRY.size + pack.TRAILER.size
+
+
+def add_videos(conn, sheets_on_server):
+    # One sheet more than the server has: the estimate overshoots by one.
+    duration = sheets_on_server * crawler.SECONDS_PER_SHEET
+    videos = []
+    for i in range(2):
+        article_id, uuid = f"abc-{i:03d}", f"uu-{i}"
+        add_article(conn, article_id)
+        crawler.save_stream_metadata(conn, article_id, uuid, "720p", "https://example.com/v.m3u8", duration)
+        videos.append((article_id, uuid, crawler.snapshot_count(duration)))
+    conn.commit()
+    return videos
+
+
+def test_prefetch_counts_a_video_complete_only_when_every_sheet_is_packed(conn, fixture_site, tmp_path):
+    fixture_site.seek_sheets = 9
+    videos = add_videos(conn, 9)
+    seeks_dir = str(tmp_path / "seeks")
+    fixture_site.seek_errors = {4: 500, 6: 404}
+
+    counts = crawler.prefetch_seeks(videos, seeks_dir, workers=3, rate=500, max_rate=500)
+
+    assert counts["complete"] == 0
+    assert counts["incomplete"] == 2
+    assert counts["failed"] == 4
+    assert counts["missing"] == 2
+    pack = crawler.SeekPack.load(crawler.seek_pack_path(seeks_dir, "uu-0"))
+    assert sorted(pack.index) == [0, 1, 2, 3, 5, 7, 8, 9]
+    assert pack.read(9) == b""
+
+    # The 500 and the 404 in the middle were transient; a rerun fetches
+    # only those and leaves the past-the-end sheet alone.
+    fixture_site.seek_errors = {}
+    counts = crawler.prefetch_seeks(videos, seeks_dir, workers=3, rate=500, max_rate=500)
+    assert counts["complete"] == 2
+    assert counts["incomplete"] == 0
+    assert counts["sheets"] == 4
+    assert counts["skipped"] == 16
+    pack = crawler.SeekPack.load(crawler.seek_pack_path(seeks_dir, "uu-0"))
+    assert pack.read(6).endswith(b"uu-0/_6")
+
+    counts = crawler.prefetch_seeks(videos, seeks_dir, workers=3, rate=500, max_rate=500)
+    assert counts["complete"] == 2
+    assert counts["sheets"] == 0 and counts["missing"] == 0
+
+
+def test_app_serves_packed_sheets_without_the_seek_host(conn, fixture_site, make_app, tmp_path):
+    fixture_site.seek_sheets = 9
+    add_videos(conn, 9)
+    videos = crawler.select_seek_videos(conn, ids=["abc-000"])
+    crawler.prefetch_seeks(videos, str(tmp_path / "seeks"), workers=2, rate=500, max_rate=500)
+
+    fixture_site.seek_errors = {n: 503 for n in range(10)}
+    client = make_app().test_client()
+    response = client.get("/article/abc-000/seek/_5.jpg")
+    assert response.status_code == 200
+    assert response.data.endswith(b"uu-0/_5")
+    assert client.get("/article/abc-000/seek/_9.jpg").status_code == 404
+    assert not os.path.exists(tmp_path / "seeks" / "uu-0")
+
+
+def test_select_seek_videos_filters(conn):
+    add_article(conn, "abc-001", keywords=["drama"])
+    add_article(conn, "abc-002", keywords=["comedy"])
+    add_article(conn, "abc-003", keywords=["drama"])
+    conn.execute("UPDATE articles SET dislike = 1 WHERE id = 'abc-003'")
+    for i, article_id in enumerate(["abc-001", "abc-002", "abc-003"]):
+        crawler.save_stream_metadata(conn, article_id, f"uu-{i}", "720p", "https://e/v.m3u8", 600, 1000 + i)
+    add_article(conn, "abc-004")
+
+    assert [r[0] for r in crawler.select_seek_videos(conn)] == ["abc-002", "abc-001"]
+    assert [r[0] for r in crawler.select_seek_videos(conn, tags=["drama"])] == ["abc-001"]
+    assert [r[0] for r in crawler.select_seek_videos(conn, recent=1)] == ["abc-002"]
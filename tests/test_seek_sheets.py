@@ -0,0 +1,53 @@
+import os
+
+import get_missav_titles as crawler
+from conftest import add_article
+
+
+def add_video(conn, article_id, uuid, duration_seconds=600, dislike=0):
+    add_article(conn, article_id)
+    conn.execute("UPDATE articles SET dislike = ? WHERE id = ?", (dislike, article_id))
+    crawler.save_stream_metadata(conn, article_id, uuid, "720p", f"https://example.com/{uuid}.m3u8", duration_seconds)
+    conn.commit()
+
+
+def get(client, path):
+    response = client.get(path)
+    response.get_data()
+    response.close()
+    return response
+
+
+def test_seek_sheet_is_proxied_and_cached(conn, make_app, fixture_site, tmp_path):
+    add_video(conn, "abc-001", "uu-1")
+    client = make_app(SEEK_PREFETCH=0).test_client()
+
+    response = get(client, "/article/abc-001/seek/_3.jpg")
+
+    assert response.status_code == 200
+    assert response.data.endswith(b"uu-1/_3")
+    assert "immutable" in response.headers["Cache-Control"]
+    assert os.path.exists(tmp_path / "seeks" / "uu-1" / "_3.jpg")
+
+
+def test_seek_sheet_past_the_end_is_404(conn, make_app, fixture_site):
+    add_video(conn, "abc-001", "uu-1", duration_seconds=600)
+    client = make_app(SEEK_PREFETCH=0).test_client()
+    assert get(client, f"/article/abc-001/seek/_{crawler.snapshot_count(600)}.jpg").status_code == 404
+
+
+def test_disliked_article_sheets_are_hidden(conn, make_app, fixture_site, tmp_path):
+    add_video(conn, "bad-001", "uu-2", dislike=1)
+
+    client = make_app(SEEK_PREFETCH=0).test_client()
+    assert get(client, "/article/bad-001/seek/_0.jpg").status_code == 404
+    assert get(client, "/article/bad-001/viewer").status_code == 404
+    assert not os.path.exists(tmp_path / "seeks" / "uu-2")
+
+    shown = make_app(show_dislike=True, SEEK_PREFETCH=0).test_client()
+    assert get(shown, "/article/bad-001/seek/_0.jpg").status_code == 200
+
+
+def test_unknown_article_is_404(conn, make_app, fixture_site):
+    client = make_app().test_client()
+    assert get(client, "/article/nope-001/seek/_0.jpg").status_code == 404
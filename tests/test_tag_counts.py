@@ -0,0 +1,89 @@
+import re
+
+import get_missav_titles as crawler
+from conftest import add_article
+
+
+def tag_counts(conn):
+    rows = conn.execute(
+        """
+        SELECT t.name, tc.articles, tc.visible
+        FROM tag_counts tc
+        JOIN tags t ON t.id = tc.tag_id
+        WHERE tc.articles > 0
+        ORDER BY t.name
+        """
+    ).fetchall()
+    return [tuple(row) for row in rows]
+
+
+def rebuilt_tag_counts(conn):
+    crawler.rebuild_tag_counts(conn)
+    counts = tag_counts(conn)
+    conn.rollback()
+    return counts
+
+
+def set_dislike(client, article_id, on):
+    response = client.post(f"/article/{article_id}/dislike", data={"dislike": "on"} if on else {})
+    response.get_data()
+    response.close()
+    assert response.status_code == 302
+
+
+def add_tagged(conn):
+    add_article(conn, "abc-001", ["drama", "comedy"])
+    add_article(conn, "abc-002", ["drama"])
+    add_article(conn, "abc-003", ["comedy", "action"])
+    conn.commit()
+
+
+def test_write_article_keeps_counts_incremental(conn):
+    add_tagged(conn)
+    assert tag_counts(conn) == [("action", 1, 1), ("comedy", 2, 2), ("drama", 2, 2)]
+
+    # Rewriting an article moves its contribution to the new tags.
+    add_article(conn, "abc-002", ["action"])
+    conn.commit()
+    assert tag_counts(conn) == [("action", 2, 2), ("comedy", 2, 2), ("drama", 1, 1)]
+    assert tag_counts(conn) == rebuilt_tag_counts(conn)
+
+
+def test_dislike_toggle_moves_only_visible(conn, make_app):
+    add_tagged(conn)
+    client = make_app().test_client()
+
+    set_dislike(client, "abc-001", True)
+    assert tag_counts(conn) == [("action", 1, 1), ("comedy", 2, 1), ("drama", 2, 1)]
+    assert tag_counts(conn) == rebuilt_tag_counts(conn)
+
+    # Setting the same state again must not count twice.
+    set_dislike(client, "abc-001", True)
+    assert tag_counts(conn) == rebuilt_tag_counts(conn)
+
+    set_dislike(client, "abc-001", False)
+    assert tag_counts(conn) == [("action", 1, 1), ("comedy", 2, 2), ("drama", 2, 2)]
+    assert tag_counts(conn) == rebuilt_tag_counts(conn)
+
+
+def test_rewriting_a_disliked_article_keeps_it_hidden(conn, make_app):
+    add_tagged(conn)
+    client = make_app().test_client()
+    set_dislike(client, "abc-003", True)
+
+    add_article(conn, "abc-003", ["drama"])
+    conn.commit()
+
+    assert tag_counts(conn) == [("comedy", 1, 1), ("drama", 3, 2)]
+    assert tag_counts(conn) == rebuilt_tag_counts(conn)
+
+
+def test_hot_tags_follow_the_dislike_mode(conn, make_app):
+    add_tagged(conn)
+    set_dislike(make_app().test_client(), "abc-001", True)
+
+    for show_dislike, drama in ((False, 1), (True, 2)):
+        response = make_app(show_dislike=show_dislike).test_client().get("/")
+        body = response.get_data(as_text=True)
+        response.close()
+        assert re.search(rf"drama <span>{drama}</span>", body)
@@ -0,0 +1,37 @@
+from PIL import Image
+
+import get_missav_titles as crawler
+
+
+def write_jpeg(path, size):
+    Image.new("RGB", size, (200, 120, 40)).save(path, "JPEG", quality=80)
+
+
+def test_draft_decodes_large_covers_at_a_smaller_scale(tmp_path):
+    path = tmp_path / "big.jpg"
+    write_jpeg(path, (2000, 1340))
+
+    with Image.open(path) as source:
+        source.draft("RGB", crawler.thumbnail_draft_size(source.size, 480))
+        # 1/4 scale is the smallest that still covers 480px.
+        assert source.size == (500, 335)
+
+
+def test_draft_keeps_small_covers_at_full_size(tmp_path):
+    path = tmp_path / "cover.jpg"
+    write_jpeg(path, (800, 536))
+
+    with Image.open(path) as source:
+        source.draft("RGB", crawler.thumbnail_draft_size(source.size, 480))
+        assert source.size == (800, 536)
+
+
+def test_thumbnails_of_a_large_cover_have_the_requested_widths(tmp_path):
+    write_jpeg(tmp_path / "big.jpg", (2000, 1340))
+
+    written = crawler.make_thumbnails(str(tmp_path), "big.jpg", widths=(240, 480), formats={"jpg": ("JPEG", {})})
+
+    assert written == 2
+    for width in (240, 480):
+        with Image.open(tmp_path / "thumbs" / f"big-{width}.jpg") as thumb:
+            assert thumb.size == (width, round(1340 * width / 2000))